@@ -0,0 +1,21 @@
+#!/usr/bin/env bash
+#
+# Run the performance benchmarks over the committed fixture boards.
+#
+# Usage:
+#   ./bench.sh                 # every benchmark
+#   ./bench.sh resample        # only the named benchmark(s)
+#
+# Needs numpy and Pillow (pip install -r requirements-dev.txt). Benchmarks
+# print reports rather than pass/fail; see tests/benchmarks.py.
+
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PYTHON="${PYTHON:-python3}"
+
+if [ -f "$SCRIPT_DIR/venv/bin/python3" ]; then
+    PYTHON="$SCRIPT_DIR/venv/bin/python3"
+fi
+
+exec "$PYTHON" "$SCRIPT_DIR/tests/benchmarks.py" "$@"
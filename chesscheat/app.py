@@ -3,33 +3,63 @@
 The ``run`` loop is programmed entirely against the interfaces in
 ``chesscheat.interfaces``: it asks a ``SetupProvider`` for the side and box,
 builds a ``FrameSource`` for that box, calibrates a ``BoardRecognizer`` from the
-first frame (the starting position) and then reports every subsequent frame.
+first frame (the starting position) and then reports every subsequent frame,
+optionally skipping recognition of frames a ``FrameGate`` reports unchanged.
+With a ``CalibrationStore``, a saved calibration replaces the calibration step
+whenever it still suits the board, and is looked up again when the board's
+theme changes mid-session.
 ``main`` wires the real GUI/screen/numpy implementations; tests wire mocks.
 """
 
+import os
 import time
 
 from chesscheat import board
 
+# Where ``main`` keeps calibrations between runs, one file per board theme.
+CALIBRATION_DIR = os.path.join(os.path.expanduser("~"), ".chesscheat",
+                               "themes")
+
 
 def run(setup, make_frame_source, recognizer, *, on_board,
-        before_calibrate=lambda: None, interval=0.0, sleeper=time.sleep):
+        before_calibrate=lambda: None, interval=0.0, sleeper=time.sleep,
+        gate=None, store=None, on_restore=lambda: None):
     """Drive the read loop using injected interface implementations.
 
     Asks ``setup`` for the side and box, builds a frame source, calibrates the
     recognizer from the first frame (the starting position) and then reports
     every subsequent frame until the source is exhausted or interrupted.
 
+    With a ``gate``, a frame it reports unchanged is not read at all (neither
+    the recognizer nor anything it wraps runs) and the last board read is
+    reported again instead. After a read the recognizer has not ``settled``
+    on (see ``LegalMoveFilter``), the gate is reset, so the next frame is
+    read even if it is unchanged.
+
+    With a ``store``, the first frame is offered to ``store.load``; if that
+    restores the recognizer, calibration (and ``before_calibrate``) is
+    skipped, and otherwise the calibration made is saved to the store.
+    Later, a frame the recognizer does not accept in full (not ``in_sync``,
+    see ``LegalMoveFilter``) whose board theme has changed (see
+    ``TemplateBoardRecognizer.theme_changed``) is offered to ``store.load``
+    again, so switching themes mid-session picks up that theme's saved
+    calibration, if there is one, and tracking resumes from the position
+    on screen.
+
     Args:
         setup: A ``SetupProvider`` for the side and bounding box.
         make_frame_source: A ``box -> FrameSource`` factory.
         recognizer: A ``BoardRecognizer`` to calibrate and read with.
         on_board: Callback invoked as ``(board_map, playing_white)`` for each
-            read frame.
+            read frame, with the recognizer's current ``playing_white`` if
+            it has one (it can turn the board for a new game).
         before_calibrate: Side-effect hook run just before calibration, e.g.
             to wait for the user to set up the starting position.
         interval: Seconds to sleep between frames; 0 disables sleeping.
         sleeper: Sleep function, injectable for testing.
+        gate: Optional ``FrameGate`` consulted before reading each frame.
+        store: Optional ``CalibrationStore`` to restore from and save to.
+        on_restore: Hook run when ``store`` restored the recognizer.
 
     Returns:
         The ``playing_white`` boolean chosen via ``setup``.
@@ -38,16 +68,37 @@ def run(setup, make_frame_source, recognizer, *, on_board,
     box = setup.select_box()
     frames = make_frame_source(box)
 
-    before_calibrate()
-    recognizer.calibrate(frames.grab(), playing_white)
-
+    if store is not None and store.load(recognizer, frames.grab(),
+                                        playing_white, box):
+        on_restore()
+    else:
+        before_calibrate()
+        image = frames.grab()
+        recognizer.calibrate(image, playing_white)
+        if store is not None:
+            store.save(recognizer, image, box)
+
+    last = None
     try:
         while True:
             try:
                 image = frames.grab()
             except StopIteration:
                 break
-            on_board(recognizer.read(image), playing_white)
+            changed = gate is None or gate.changed(image)
+            if changed or last is None:
+                last = recognizer.read(image)
+                if (store is not None
+                        and not getattr(recognizer, "in_sync", True)
+                        and _theme_changed(recognizer, image)
+                        and store.load(recognizer, image, playing_white, box)):
+                    on_restore()
+                    last = recognizer.read(image)
+                if gate is not None and not getattr(recognizer, "settled",
+                                                    True):
+                    gate.reset()
+            on_board(last, getattr(recognizer, "playing_white",
+                                   playing_white))
             if interval:
                 sleeper(interval)
     except KeyboardInterrupt:
@@ -55,6 +106,20 @@ def run(setup, make_frame_source, recognizer, *, on_board,
     return playing_white
 
 
+def _theme_changed(recognizer, image):
+    """Return whether ``recognizer`` reports ``image``'s theme has changed.
+
+    Args:
+        recognizer: A ``BoardRecognizer``, with or without ``theme_changed``.
+        image: A board image.
+
+    Returns:
+        The recognizer's ``theme_changed(image)``, or False if it has none.
+    """
+    theme_changed = getattr(recognizer, "theme_changed", None)
+    return theme_changed is not None and theme_changed(image)
+
+
 def _console_printer():
     """Build a de-duplicating ``on_board`` callback that prints board + FEN.
 
@@ -79,21 +144,42 @@ def main():
     from chesscheat.providers import (GuiSetupProvider, PromptSetupProvider,
                                       FallbackSetupProvider, ScreenFrameSource)
     from chesscheat.recognition import (TemplateBoardRecognizer,
-                                        NumpyImageBackend, LegalMoveFilter)
+                                        NumpyImageBackend, LegalMoveFilter,
+                                        FrameChangeGate, TemplateLibrary)
 
     print("=== Live Chessboard Reader ===")
-    print("Make sure the board is in the standard starting position.\n")
+    print("Make sure the board is in the standard starting position, unless "
+          "this board theme was calibrated on an earlier run.\n")
 
     setup = FallbackSetupProvider(GuiSetupProvider(), PromptSetupProvider())
-    recognizer = LegalMoveFilter(TemplateBoardRecognizer(NumpyImageBackend()))
-
-    def gate():
+    recognizer = LegalMoveFilter(TemplateBoardRecognizer(
+        NumpyImageBackend(), coarse_size=12, occupancy=True))
+    gate = FrameChangeGate()
+    store = TemplateLibrary(CALIBRATION_DIR)
+
+    def wait_for_start():
+        if store.last_miss == "position":
+            print("\nThe board's theme is known, but the position could not "
+                  "be read.")
         input("\nPosition the board in the starting position, then press Enter "
               "to calibrate...")
         print("Calibrated. Reading board... (press Ctrl+C to stop)\n")
 
+    def restored():
+        print(f"Recognised the board theme ({len(store)} known). Reading "
+              f"board... (press Ctrl+C to stop)\n")
+
     run(setup, ScreenFrameSource, recognizer,
-        on_board=_console_printer(), before_calibrate=gate, interval=0.3)
+        on_board=_console_printer(), before_calibrate=wait_for_start,
+        interval=0.3, gate=gate, store=store, on_restore=restored)
+    print(f"\nSkipped {gate.skipped} of {gate.frames} unchanged frames "
+          f"({gate.skip_rate:.0%}).")
+    if recognizer.games_played:
+        print(f"Tracked {recognizer.games_played} finished game(s) before "
+              f"this one.")
+    if recognizer.resyncs:
+        print(f"Resynced {recognizer.resyncs} time(s) after "
+              f"{recognizer.desync_seconds:.1f}s out of sync in total.")
 
 
 if __name__ == "__main__":
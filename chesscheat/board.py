@@ -6,8 +6,16 @@ screen grid cells are ``(row, col)`` with row 0 at the top, while chess
 coordinates are ``(file_idx, rank)`` with file_idx 0=a..7=h and rank 1..8.
 """
 
+import functools
+import re
+from collections.abc import Mapping
+
 BACK_RANK = ["R", "N", "B", "Q", "K", "B", "N", "R"]
 
+# Every square label: empty, then white and black pieces. Fixes the label
+# index used wherever per-label values are stored in arrays.
+LABELS = ".PNBRQKpnbrqk"
+
 
 def square_coord(row, col, playing_white):
     """Convert a screen grid cell to chess coordinates.
@@ -27,6 +35,19 @@ def square_coord(row, col, playing_white):
     return 7 - col, row + 1
 
 
+def square_index(file_idx, rank):
+    """Return a square's index in a1..h8 order (python-chess numbering).
+
+    Args:
+        file_idx: File index, 0=a..7=h.
+        rank: Rank, 1..8.
+
+    Returns:
+        An int in ``[0, 63]``: a1=0, b1=1, ..., h8=63.
+    """
+    return (rank - 1) * 8 + file_idx
+
+
 def start_label(file_idx, rank):
     """Return the piece on a square in the starting position.
 
@@ -72,12 +93,151 @@ def starting_board():
             for f in range(8) for rank in range(1, 9)}
 
 
+class CompactBoard(Mapping):
+    """An immutable board map stored as 64 label bytes.
+
+    Behaves as a read-only ``{(file_idx, rank): label}`` map of all 64
+    squares, so code written for board dicts works unchanged, but is backed
+    by one ``bytes`` object in a1..h8 order (``square_index``). That makes
+    equality between two ``CompactBoard`` a memcmp, hashing a cached hash of
+    the bytes, and finding the squares two boards differ on a few integer
+    operations. Its placement FEN is computed once and cached.
+
+    A ``CompactBoard`` compares equal to a dict holding the same 64 labels.
+
+    Attributes:
+        squares: The 64 labels as ASCII bytes, a1 first.
+    """
+
+    __slots__ = ("squares", "_hash", "_fen")
+
+    def __init__(self, squares):
+        """Wrap 64 label bytes.
+
+        Args:
+            squares: 64 ASCII labels (``bytes``, or a ``str``) in a1..h8
+                order.
+
+        Raises:
+            ValueError: If ``squares`` is not 64 long.
+        """
+        if isinstance(squares, str):
+            squares = squares.encode("ascii")
+        if len(squares) != 64:
+            raise ValueError(f"expected 64 squares, got {len(squares)}")
+        self.squares = bytes(squares)
+        self._hash = None
+        self._fen = None
+
+    @classmethod
+    def from_map(cls, board_map):
+        """Build a ``CompactBoard`` from any board map.
+
+        Args:
+            board_map: A ``{(file_idx, rank): label}`` map; missing squares
+                are empty. A ``CompactBoard`` is returned as is.
+
+        Returns:
+            A ``CompactBoard``.
+        """
+        if isinstance(board_map, cls):
+            return board_map
+        squares = bytearray(b"." * 64)
+        for (file_idx, rank), label in board_map.items():
+            squares[square_index(file_idx, rank)] = ord(label)
+        return cls(squares)
+
+    def __getitem__(self, file_rank):
+        file_idx, rank = file_rank
+        if not (0 <= file_idx < 8 and 1 <= rank <= 8):
+            raise KeyError(file_rank)
+        return chr(self.squares[(rank - 1) * 8 + file_idx])
+
+    def get(self, file_rank, default=None):
+        try:
+            return self[file_rank]
+        except (KeyError, TypeError, ValueError):
+            return default
+
+    def __iter__(self):
+        return iter(_SQUARE_KEYS)
+
+    def __len__(self):
+        return 64
+
+    def __contains__(self, file_rank):
+        return file_rank in _SQUARE_SET
+
+    def __eq__(self, other):
+        if isinstance(other, CompactBoard):
+            return self.squares == other.squares
+        return Mapping.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(self.squares)
+        return self._hash
+
+    def __repr__(self):
+        return f"CompactBoard({self.fen!r})"
+
+    @property
+    def fen(self):
+        """The board's piece-placement FEN field, cached."""
+        if self._fen is None:
+            self._fen = _encode(self.squares)
+        return self._fen
+
+    def diff(self, other):
+        """Return the squares where ``other`` differs, with its labels there.
+
+        Args:
+            other: Another ``CompactBoard``.
+
+        Returns:
+            A ``{square_index: label}`` dict of ``other``'s labels on the
+            squares where the two boards differ.
+        """
+        theirs = other.squares
+        changed = (int.from_bytes(self.squares, "little")
+                   ^ int.from_bytes(theirs, "little"))
+        diff = {}
+        while changed:
+            square = ((changed & -changed).bit_length() - 1) >> 3
+            diff[square] = chr(theirs[square])
+            changed &= ~(0xFF << (square << 3))
+        return diff
+
+    def replace(self, changes):
+        """Return a copy with some squares relabelled.
+
+        Args:
+            changes: A ``{square_index: label}`` dict.
+
+        Returns:
+            A new ``CompactBoard``.
+        """
+        squares = bytearray(self.squares)
+        for square, label in changes.items():
+            squares[square] = ord(label)
+        return CompactBoard(squares)
+
+
+# CompactBoard's keys, in its a1..h8 storage order.
+_SQUARE_KEYS = tuple((file_idx, rank)
+                     for rank in range(1, 9) for file_idx in range(8))
+_SQUARE_SET = frozenset(_SQUARE_KEYS)
+
+
 def render(board, playing_white):
     """Render a board as text from the player's perspective.
 
     Args:
-        board: A ``{(file_idx, rank): label}`` map; missing squares render as
-            ``'.'``.
+        board: A ``{(file_idx, rank): label}`` map (or ``CompactBoard``);
+            missing squares render as ``'.'``.
         playing_white: True to orient the output from white's perspective,
             False for black's.
 
@@ -87,8 +247,16 @@ def render(board, playing_white):
     ranks = range(8, 0, -1) if playing_white else range(1, 9)
     files = range(8) if playing_white else range(7, -1, -1)
     header = "   " + "  ".join(chr(ord("a") + f) for f in files)
-    rows = (f"{rank}  " + "  ".join(board.get((f, rank), ".") for f in files)
-            + f"  {rank}" for rank in ranks)
+    if isinstance(board, CompactBoard):
+        text = board.squares.decode("ascii")
+        lines = (text[(rank - 1) * 8:rank * 8] for rank in ranks)
+        if not playing_white:
+            lines = (line[::-1] for line in lines)
+        rows = (f"{rank}  " + "  ".join(line) + f"  {rank}"
+                for rank, line in zip(ranks, lines))
+    else:
+        rows = (f"{rank}  " + "  ".join(board.get((f, rank), ".") for f in files)
+                + f"  {rank}" for rank in ranks)
     return "\n".join([header, *rows, header])
 
 
@@ -100,24 +268,62 @@ def to_fen(board):
 
     Args:
         board: A ``{(file_idx, rank): label}`` map; missing squares are empty.
+            A ``CompactBoard`` answers from its cached FEN.
 
     Returns:
         The piece-placement field of a FEN string (the part before the first
         space), e.g. ``"rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR"``.
     """
-    def rank_to_fen(rank):
-        run, parts = 0, []
-        for file_idx in range(8):
-            label = board.get((file_idx, rank), ".")
-            if label == ".":
-                run += 1
-            else:
-                if run:
-                    parts.append(str(run))
-                    run = 0
-                parts.append(label)
-        if run:
-            parts.append(str(run))
-        return "".join(parts)
-
-    return "/".join(rank_to_fen(rank) for rank in range(8, 0, -1))
+    if isinstance(board, CompactBoard):
+        return board.fen
+    return _encode(CompactBoard.from_map(board).squares)
+
+
+def from_fen(fen):
+    """Parse a FEN's piece placement into a board.
+
+    Args:
+        fen: A piece-placement field, or a full FEN (only the placement is
+            read).
+
+    Returns:
+        A ``CompactBoard``.
+
+    Raises:
+        ValueError: If the placement does not describe 8 ranks of 8 squares
+            of known labels.
+    """
+    ranks = fen.split(" ", 1)[0].split("/")
+    if len(ranks) != 8:
+        raise ValueError(f"expected 8 ranks in FEN placement: {fen!r}")
+    return CompactBoard(b"".join(map(_decode_rank, reversed(ranks))))
+
+
+def _encode(squares):
+    """Build the placement FEN of 64 label bytes (a1..h8 order)."""
+    return "/".join([_encode_rank(squares[56:64]), _encode_rank(squares[48:56]),
+                     _encode_rank(squares[40:48]), _encode_rank(squares[32:40]),
+                     _encode_rank(squares[24:32]), _encode_rank(squares[16:24]),
+                     _encode_rank(squares[8:16]), _encode_rank(squares[0:8])])
+
+
+# A game shows a few hundred distinct ranks, so both per-rank codecs are
+# memoised on the rank itself; the bound only matters for pathological input.
+@functools.lru_cache(maxsize=4096)
+def _encode_rank(rank_bytes):
+    """Run-length encode one rank's 8 label bytes, a-file first."""
+    return _EMPTY_RUN.sub(lambda run: str(len(run.group())),
+                          rank_bytes.decode("ascii"))
+
+
+@functools.lru_cache(maxsize=4096)
+def _decode_rank(rank_fen):
+    """Expand one rank of a FEN placement into 8 label bytes."""
+    squares = _DIGIT.sub(lambda digit: "." * int(digit.group()), rank_fen)
+    if len(squares) != 8 or squares.strip(LABELS):
+        raise ValueError(f"bad FEN rank: {rank_fen!r}")
+    return squares.encode("ascii")
+
+
+_EMPTY_RUN = re.compile(r"\.+")
+_DIGIT = re.compile(r"[1-8]")
@@ -8,7 +8,10 @@ combination of real and mock parts can be wired together.
 
 from chesscheat.interfaces.setup_provider import SetupProvider
 from chesscheat.interfaces.frame_source import FrameSource
+from chesscheat.interfaces.frame_gate import FrameGate
 from chesscheat.interfaces.image_backend import ImageBackend
 from chesscheat.interfaces.board_recognizer import BoardRecognizer
+from chesscheat.interfaces.calibration_store import CalibrationStore
 
-__all__ = ["SetupProvider", "FrameSource", "ImageBackend", "BoardRecognizer"]
+__all__ = ["SetupProvider", "FrameSource", "FrameGate", "ImageBackend",
+           "BoardRecognizer", "CalibrationStore"]
@@ -0,0 +1,45 @@
+"""The ``CalibrationStore`` interface."""
+
+from abc import ABC, abstractmethod
+
+
+class CalibrationStore(ABC):
+    """Keeps a recognizer's calibration from one run to the next.
+
+    The ``run`` loop asks the store to ``load`` a calibration before
+    calibrating; only when that fails does it wait for the starting position,
+    calibrate, and ``save`` the result. Recognizers that support this offer
+    ``snapshot``, ``restore`` and ``theme`` (see ``TemplateBoardRecognizer``).
+    """
+
+    @abstractmethod
+    def load(self, recognizer, image, playing_white, box):
+        """Restore a saved calibration into ``recognizer``, if it still fits.
+
+        A saved calibration that no longer suits the board (another theme,
+        size or backend configuration) is invalidated.
+
+        Args:
+            recognizer: The ``BoardRecognizer`` to restore into.
+            image: The current board image, in any position.
+            playing_white: True if the board is shown from white's
+                perspective, False for black's.
+            box: The capture box, an ``(x1, y1, x2, y2)`` tuple.
+
+        Returns:
+            True if the recognizer was restored and need not be calibrated.
+        """
+
+    @abstractmethod
+    def save(self, recognizer, image, box):
+        """Save ``recognizer``'s calibration.
+
+        Args:
+            recognizer: A calibrated ``BoardRecognizer``.
+            image: The image it was calibrated from.
+            box: The capture box, an ``(x1, y1, x2, y2)`` tuple.
+        """
+
+    @abstractmethod
+    def invalidate(self):
+        """Discard the saved calibration, if any."""
@@ -0,0 +1,36 @@
+"""The ``FrameGate`` interface."""
+
+from abc import ABC, abstractmethod
+
+
+class FrameGate(ABC):
+    """Decides cheaply whether a frame is worth recognising at all.
+
+    The ``run`` loop consults a gate before reading each frame; when the gate
+    reports no material change since the last frame it let through, the
+    recognizer is not called and the previous board is reported again.
+    A recognizer that has not yet settled on what a frame shows (see
+    ``LegalMoveFilter.settled``) has the gate ``reset`` after reading it.
+    """
+
+    @abstractmethod
+    def changed(self, frame):
+        """Report whether ``frame`` differs from the last frame let through.
+
+        The first frame seen is always reported as changed. A frame reported
+        as changed becomes the reference for the next comparison.
+
+        Args:
+            frame: A board image, as produced by the ``FrameSource``.
+
+        Returns:
+            True if the frame should be recognised, False to skip it.
+        """
+
+    @abstractmethod
+    def reset(self):
+        """Forget the reference frame, so the next frame is let through.
+
+        The ``run`` loop calls this when the recognizer has not ``settled``
+        on a frame, so an unchanged frame is read again.
+        """
@@ -8,6 +8,10 @@ class ImageBackend(ABC):
 
     Splitting these out lets the recognition *algorithm* be shared between a
     real numpy/array backend and a pure-Python mock backend.
+
+    A backend may additionally offer batched whole-frame entry points (see
+    ``NumpyImageBackend.features_all``); recognizers use them when present
+    and fall back to these per-square methods otherwise.
     """
 
     @abstractmethod
@@ -10,12 +10,16 @@ pipeline be exercised on positions evolving over time.
 
 from chesscheat.mocks.mock_setup_provider import MockSetupProvider
 from chesscheat.mocks.mock_frame_source import MockFrameSource
+from chesscheat.mocks.mock_frame_gate import MockFrameGate
+from chesscheat.mocks.mock_calibration_store import MockCalibrationStore
 from chesscheat.mocks.mock_image_backend import MockImageBackend
 from chesscheat.mocks.synthetic_image import render_mock_image, LABELS
 
 __all__ = [
     "MockSetupProvider",
     "MockFrameSource",
+    "MockFrameGate",
+    "MockCalibrationStore",
     "MockImageBackend",
     "render_mock_image",
     "LABELS",
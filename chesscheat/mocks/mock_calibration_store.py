@@ -0,0 +1,66 @@
+"""The ``MockCalibrationStore`` calibration store."""
+
+from chesscheat.interfaces import CalibrationStore
+
+
+class MockCalibrationStore(CalibrationStore):
+    """Keeps a calibration snapshot in memory.
+
+    A snapshot is reused when the capture box has the same size; themes are
+    not compared.
+
+    Attributes:
+        saved: The saved ``(snapshot, box)``, or None.
+        loads: Number of calibrations restored.
+        saves: Number of calibrations saved.
+    """
+
+    def __init__(self):
+        """Initialise the store empty."""
+        self.saved = None
+        self.loads = 0
+        self.saves = 0
+
+    def load(self, recognizer, image, playing_white, box):
+        """Restore the saved snapshot if the box size matches.
+
+        Args:
+            recognizer: A recognizer with ``restore``.
+            image: The current board image.
+            playing_white: True if white is at the bottom of the image.
+            box: The capture box, an ``(x1, y1, x2, y2)`` tuple.
+
+        Returns:
+            True if the recognizer was restored.
+        """
+        if self.saved is None:
+            return False
+        snapshot, saved_box = self.saved
+        if _size(saved_box) != _size(box):
+            self.invalidate()
+            return False
+        if not recognizer.restore(snapshot, image, playing_white):
+            return False
+        self.loads += 1
+        return True
+
+    def save(self, recognizer, image, box):
+        """Keep ``recognizer.snapshot()`` and the box.
+
+        Args:
+            recognizer: A calibrated recognizer with ``snapshot``.
+            image: The image it was calibrated from (unused).
+            box: The capture box, an ``(x1, y1, x2, y2)`` tuple.
+        """
+        self.saved = (recognizer.snapshot(), box)
+        self.saves += 1
+
+    def invalidate(self):
+        """Forget the saved snapshot."""
+        self.saved = None
+
+
+def _size(box):
+    """Return the ``(width, height)`` of an ``(x1, y1, x2, y2)`` box."""
+    x1, y1, x2, y2 = box
+    return x2 - x1, y2 - y1
@@ -0,0 +1,38 @@
+"""The ``MockFrameGate`` frame gate."""
+
+from chesscheat.interfaces import FrameGate
+
+
+class MockFrameGate(FrameGate):
+    """Lets a frame through only when it is not equal to the last one.
+
+    Attributes:
+        frames: Number of frames seen.
+        skipped: Number of frames reported as unchanged.
+    """
+
+    def __init__(self):
+        """Initialise the gate with no reference frame."""
+        self.frames = 0
+        self.skipped = 0
+        self._reference = None
+
+    def changed(self, frame):
+        """Report whether ``frame`` differs from the last frame let through.
+
+        Args:
+            frame: A board image (any value supporting ``==``).
+
+        Returns:
+            True unless ``frame`` equals the reference frame.
+        """
+        self.frames += 1
+        if self._reference is not None and frame == self._reference:
+            self.skipped += 1
+            return False
+        self._reference = frame
+        return True
+
+    def reset(self):
+        """Forget the reference frame, so the next frame passes."""
+        self._reference = None
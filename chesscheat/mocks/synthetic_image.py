@@ -2,7 +2,7 @@
 
 from chesscheat import board
 
-LABELS = ".PNBRQKpnbrqk"
+LABELS = board.LABELS
 
 
 def _pattern_value(label_index, i, j):
@@ -3,10 +3,20 @@
 The recognition algorithm (``TemplateBoardRecognizer``) is decoupled from the
 image representation (``ImageBackend``); ``NumpyImageBackend`` is the real
 backend, and ``chesscheat.mocks`` provides a pure-Python one.
+``FrameChangeGate`` lets the app loop skip recognition of unchanged frames,
+and ``NpzCalibrationStore`` keeps a calibration on disk between runs;
+``TemplateLibrary`` keeps one per board theme and picks the one on screen.
 """
 
-from chesscheat.recognition.template_board_recognizer import TemplateBoardRecognizer
+from chesscheat.recognition.template_board_recognizer import (
+    TemplateBoardRecognizer, ScoredBoard, MISSING_SCORE)
 from chesscheat.recognition.numpy_image_backend import NumpyImageBackend
-from chesscheat.recognition.legal_move_filter import LegalMoveFilter
+from chesscheat.recognition.legal_move_filter import (LegalMoveFilter,
+                                                      FinishedGame)
+from chesscheat.recognition.frame_change_gate import FrameChangeGate
+from chesscheat.recognition.npz_calibration_store import NpzCalibrationStore
+from chesscheat.recognition.template_library import TemplateLibrary
 
-__all__ = ["TemplateBoardRecognizer", "NumpyImageBackend", "LegalMoveFilter"]
+__all__ = ["TemplateBoardRecognizer", "ScoredBoard", "MISSING_SCORE",
+           "NumpyImageBackend", "LegalMoveFilter", "FinishedGame",
+           "FrameChangeGate", "NpzCalibrationStore", "TemplateLibrary"]
@@ -0,0 +1,93 @@
+"""The ``FrameChangeGate`` frame gate."""
+
+from chesscheat.interfaces import FrameGate
+
+
+class FrameChangeGate(FrameGate):
+    """Skips frames whose decimated thumbnail matches the last accepted one.
+
+    Each frame is point-sampled down to a roughly ``size`` x ``size`` grey
+    thumbnail (a strided view, so the cost does not grow with the capture
+    resolution) and compared with the thumbnail of the last frame let through.
+    The frame counts as changed when more than ``min_pixels`` thumbnail pixels
+    moved by more than ``tolerance`` grey levels. At the default size every
+    square contributes about 64 samples, so a piece arriving or leaving is
+    always seen, while an idle board costs one tiny comparison per frame.
+
+    The reference only advances on a change, so a slow drift still adds up to
+    one eventually.
+
+    Attributes:
+        size: Approximate thumbnail side, in samples.
+        tolerance: Per-sample grey-level difference that counts as a change.
+        min_pixels: Number of changed samples tolerated as noise.
+        frames: Number of frames seen.
+        skipped: Number of frames reported as unchanged.
+    """
+
+    def __init__(self, size=64, tolerance=12, min_pixels=0):
+        """Initialise the gate with no reference frame.
+
+        Args:
+            size: Approximate thumbnail side, in samples.
+            tolerance: Per-sample grey-level difference that counts as a
+                change.
+            min_pixels: Number of changed samples tolerated as noise.
+        """
+        self.size = size
+        self.tolerance = tolerance
+        self.min_pixels = min_pixels
+        self.frames = 0
+        self.skipped = 0
+        self._reference = None
+
+    @property
+    def skip_rate(self):
+        """Fraction of frames skipped so far (0.0 before any frame)."""
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def changed(self, frame):
+        """Report whether ``frame`` differs from the last frame let through.
+
+        Args:
+            frame: An ``(H, W)`` grayscale or ``(H, W, C)`` colour image
+                (e.g. BGRA from ``capture.screenshot``), or anything
+                ``numpy.asarray`` accepts as one.
+
+        Returns:
+            True if the frame should be recognised, False to skip it.
+        """
+        import numpy as np
+        self.frames += 1
+        thumb = self._thumbnail(frame)
+        reference = self._reference
+        if reference is not None and reference.shape == thumb.shape:
+            moved = np.count_nonzero(np.abs(thumb - reference) > self.tolerance)
+            if moved <= self.min_pixels:
+                self.skipped += 1
+                return False
+        self._reference = thumb
+        return True
+
+    def reset(self):
+        """Forget the reference frame, so the next frame passes."""
+        self._reference = None
+
+    def _thumbnail(self, frame):
+        """Point-sample ``frame`` to a small grey thumbnail.
+
+        Args:
+            frame: A board image (see ``changed``).
+
+        Returns:
+            A 2-D float32 array of grey levels.
+        """
+        import numpy as np
+        arr = np.asarray(frame)
+        h, w = arr.shape[:2]
+        step_y = max(1, h // self.size)
+        step_x = max(1, w // self.size)
+        thumb = arr[step_y // 2::step_y, step_x // 2::step_x]
+        if thumb.ndim == 3:
+            return thumb[..., :3].astype(np.float32).mean(axis=2)
+        return thumb.astype(np.float32)
@@ -1,8 +1,38 @@
 """The ``LegalMoveFilter`` board-recognizer decorator."""
 
+import time
+from array import array
+from collections import deque, namedtuple
+
 from chesscheat import board
 from chesscheat.interfaces import BoardRecognizer
 
+_ALL_SQUARES = (1 << 64) - 1  # bitboard of every square
+_START = board.CompactBoard.from_map(board.starting_board())
+_START_PLACEMENT = _START.fen
+# The starting position as read with the board's orientation the wrong way
+# round: a new game shown from the other side.
+_TURNED_START = board.CompactBoard.from_map(
+    {(7 - file_idx, 9 - rank): label
+     for (file_idx, rank), label in board.starting_board().items()})
+
+
+class FinishedGame(namedtuple("FinishedGame", "start_fen log")):
+    """An archived game: where it started and its moves.
+
+    Attributes:
+        start_fen: Full FEN of the game's first position (the standard start
+            unless the game began at a resync).
+        log: The moves, packed two bytes each in an ``array('H')``.
+    """
+
+    __slots__ = ()
+
+    @property
+    def moves(self):
+        """The game's moves, as a list of ``chess.Move``."""
+        return [_unpack(packed) for packed in self.log]
+
 
 class LegalMoveFilter(BoardRecognizer):
     """Wraps a ``BoardRecognizer``; accepts new readings only on legal moves.
@@ -11,15 +41,85 @@ class LegalMoveFilter(BoardRecognizer):
 
     1. The inner recognizer classifies all 64 squares from the raw image.
     2. If the reading is identical to the current state, return it immediately.
-    3. Otherwise check whether the piece-placement FEN of the candidate matches
-       the result of pushing any one legal move from the current position.
-    4. On a match, advance the internal game clock and accept the new board.
+    3. Otherwise check whether the squares where the candidate differs from
+       the current state, and their new contents, are exactly what some legal
+       move from the current position changes.
+    4. Failing that, if the candidate is the starting position, a new game
+       has begun: the current one is archived (``games``) and tracking
+       starts afresh, without recalibrating. A game shorter than
+       ``min_game_plies`` that began there is rewound instead (step 5):
+       its first moves were only taken back. A new game shown from the
+       other side first reads as the starting position turned around; the
+       inner recognizer is then turned to that side (its calibration
+       restored with the other orientation) and the frame read again.
+    5. Failing that, if the candidate is a position the game has already
+       been through, rewind to it: a takeback, or stepping back through the
+       moves. Every ply's position is kept in a placement-to-ply index, so
+       this is a single lookup; the plies after it are dropped.
+    6. Failing that, search for a short sequence of legal moves (up to
+       ``max_catch_up`` plies) that produces the candidate exactly, in case
+       frames were missed while several plies were played, and accept all of
+       its moves.
+    7. Failing an exact match, if the inner recognizer can ``read_scored``,
+       rank every legal successor by the summed log-likelihood of its
+       placement under the per-square template scores, and accept the best
+       one when it is more likely than both "no move" and the runner-up
+       successor by at least ``margin``.
+    8. On a match, advance the internal game clock and accept the new board.
        If no legal move explains the diff — the frame was corrupted by a mouse
        cursor, a highlight, a drag animation, or any other transient artifact —
        discard the frame and return the last accepted state unchanged.
 
     This makes the reader resilient to transient visual noise: a corrupted
-    frame is silently ignored and the position does not change.
+    frame is silently ignored and the position does not change, while a move
+    whose frame is partly obscured (a cursor over one square, say) can still
+    be accepted on that frame instead of waiting for a clean one.
+
+    Scores become per-square log-likelihoods through a softmax over labels
+    at ``temperature``. Two placements' log-likelihoods then differ only on
+    the squares where they differ, by the score differences over
+    ``temperature`` (the softmax normaliser cancels), so each successor is
+    ranked by that sum over the squares its move changes.
+
+    The python-chess board used for legality probing keeps no move stack, so
+    a frame costs the same at ply 300 as at ply 1; the game's moves are
+    recorded separately in a compact log (``moves``).
+
+    The legal successors of the accepted position are enumerated at most
+    once. The first changed frame at a position only tries the moves touching
+    the changed squares; if that finds nothing, an index from each
+    successor's placement (keyed by its diff from the accepted position) to
+    its move is built, and every later frame, however noisy, is a single
+    lookup. The index is dropped when the next move is accepted.
+
+    When the game on screen leaves the filter's game for good (a takeback,
+    a position set up by hand, a move missed beyond catching up), the filter
+    resyncs: once the inner recognizer has returned the same confident but
+    unexplained reading for ``resync_after`` frames in a row, that position
+    is adopted as the new state. The side to move is ``resync_turn`` if
+    given, otherwise inferred (see ``_resync``). A reading is confident when
+    every square read as a piece beats its runner-up label by
+    ``resync_confidence`` nats; empty squares are exempt, as a flat square
+    is scored on brightness alone and never wins by much. Readings without
+    scores count as confident.
+
+    After each ``read``, ``in_sync`` tells whether the returned position is
+    the one the inner recognizer read, and ``settled`` whether reading the
+    same frame again could not change that. The filter is unsettled only
+    when a frame advanced the game but not all the way to the reading (some
+    of the plies it shows, or a move accepted on likelihood), or while a
+    resync streak is counting up. A frame gate in front of the filter should
+    let the next frame through while it is unsettled (see
+    ``chesscheat.app.run``), and may skip it otherwise: a reading rejected
+    outright, such as a cursor parked on the board, reads the same again.
+
+    A calibration restored with ``restore`` (see ``NpzCalibrationStore``)
+    starts tracking from whatever position is on screen at the time.
+
+    If the inner recognizer reports ``needs_recalibration`` (the board was
+    resized and its templates no longer fit), it is recalibrated from the
+    frame with the accepted position, on the assumption that no move was
+    made while the board was being resized, and the frame is read again.
 
     The legality check uses *python-chess* (``chess`` package), which is
     imported lazily so the rest of the package remains dependency-free when
@@ -27,17 +127,103 @@ class LegalMoveFilter(BoardRecognizer):
 
     Attributes:
         inner: The wrapped ``BoardRecognizer``.
+        temperature: Score units per nat of log-likelihood.
+        margin: Log-likelihood lead, in nats, a move needs to be accepted
+            from scores.
+        index_hits: Changed frames some successor matched exactly.
+        index_misses: Changed frames no successor matched exactly.
+        exact_accepts: Moves accepted because the reading matched exactly.
+        likely_accepts: Moves accepted on likelihood alone.
+        max_catch_up: Most plies a single frame may advance the game by.
+        catch_ups: Frames accepted as several plies at once.
+        rejected: Frames whose changed reading was discarded.
+        in_sync: Whether the last reading was accepted in full.
+        settled: Whether reading the last frame again would return the
+            same position.
+        resync_after: Identical unexplained readings before a resync.
+        resync_confidence: Per-piece lead, in nats, for a reading to count
+            towards a resync.
+        resync_turn: Side to move after a resync (True for white), or None
+            to infer it.
+        resyncs: Number of resyncs.
+        desync_seconds: Total time spent rejecting frames before resyncs.
+        last_resync: ``(placement_fen, seconds_desynced)`` of the latest
+            resync, or None.
+        rewinds: Readings accepted as a return to an earlier position.
+        plies_rewound: Plies taken back over those rewinds.
+        games: The most recent finished games, oldest first, as a bounded
+            ``deque`` of ``FinishedGame``.
+        games_played: Games finished since calibration, including those
+            no longer in ``games``.
+        min_game_plies: Shortest game a return to the start archives.
+        turns: New games for which the board was turned to the other side.
+        recalibrations: Times the inner recognizer was recalibrated from
+            the accepted position after a resize.
     """
 
-    def __init__(self, inner):
+    def __init__(self, inner, temperature=0.1, margin=2.0, max_catch_up=3,
+                 resync_after=10, resync_confidence=2.0, resync_turn=None,
+                 clock=time.monotonic, archive_size=100, min_game_plies=3):
         """Initialise the filter around an inner recognizer.
 
         Args:
             inner: A ``BoardRecognizer`` whose raw output this class filters.
+            temperature: Softmax temperature turning template scores into
+                per-square log-likelihoods.
+            margin: Log-likelihood lead, in nats, the best successor needs
+                over both "no move" and the runner-up successor.
+            max_catch_up: Deepest move sequence (in plies) searched for when
+                no single move explains a reading; below 2 disables the
+                search.
+            resync_after: Consecutive identical, confident, unexplained
+                readings after which the filter adopts the reading; 0
+                disables resyncing.
+            resync_confidence: Lead, in nats, every square read as a piece
+                needs over its runner-up label for a reading to be confident.
+            resync_turn: Side to move after a resync (True for white, False
+                for black), or None to infer it.
+            clock: Monotonic time source, injectable for testing.
+            archive_size: Most finished games kept in ``games``.
+            min_game_plies: Plies a game from the starting position needs
+                before a return to the start archives it as finished rather
+                than rewinding it.
         """
         self.inner = inner
-        self._state = None        # last accepted {(file_idx, rank): label}
-        self._chess_board = None  # python-chess Board for legality checks
+        self.temperature = temperature
+        self.margin = margin
+        self.max_catch_up = max_catch_up
+        self.resync_after = resync_after
+        self.resync_confidence = resync_confidence
+        self.resync_turn = resync_turn
+        self._clock = clock
+        self.resyncs = 0
+        self.desync_seconds = 0.0
+        self.last_resync = None
+        self.rewinds = 0
+        self.plies_rewound = 0
+        self.games = deque(maxlen=archive_size)
+        self.games_played = 0
+        self.min_game_plies = min_game_plies
+        self.turns = 0
+        self.recalibrations = 0
+        self.in_sync = self.settled = True
+        self._pending = None      # the repeated unexplained reading, if any
+        self._pending_count = 0
+        self._desynced_since = None  # clock time of the first rejection
+        self.index_hits = 0
+        self.index_misses = 0
+        self.exact_accepts = 0
+        self.likely_accepts = 0
+        self.catch_ups = 0
+        self.rejected = 0
+        self._successors = None   # [(move, effects)] of the accepted position
+        self._index = None        # frozenset(effects.items()) -> move
+        self._unexplained = set()  # diffs _catch_up failed on at this position
+        self._state = None        # last accepted board, a CompactBoard
+        self._chess_board = None  # stackless python-chess Board for legality
+        self._log = array("H")    # accepted moves, packed by _pack
+        self._history = []        # ply -> full FEN after that many plies
+        self._plies = {}          # placement FEN -> plies showing it, ascending
 
     def calibrate(self, image, playing_white):
         """Calibrate the inner recognizer and reset game state to start.
@@ -49,10 +235,74 @@ class LegalMoveFilter(BoardRecognizer):
             image: A board image showing the standard starting position.
             playing_white: True if white is at the bottom of the image.
         """
-        import chess  # lazy: only required when the filter is actually used
         self.inner.calibrate(image, playing_white)
-        self._state = board.starting_board()
-        self._chess_board = chess.Board()
+        self._reset()
+
+    def theme(self, image):
+        """Return the inner recognizer's ``theme`` of ``image``."""
+        return self.inner.theme(image)
+
+    def fingerprint(self, image):
+        """Return the inner recognizer's ``fingerprint`` of ``image``."""
+        return self.inner.fingerprint(image)
+
+    def theme_changed(self, image):
+        """Return the inner recognizer's ``theme_changed`` for ``image``."""
+        return self.inner.theme_changed(image)
+
+    def snapshot(self):
+        """Return the inner recognizer's calibration ``snapshot``."""
+        return self.inner.snapshot()
+
+    def restore(self, snapshot, image, playing_white):
+        """Restore the inner recognizer and adopt the position on screen.
+
+        The inner recognizer is restored from ``snapshot`` and reads
+        ``image``; that reading becomes the starting point of tracking, with
+        the side to move inferred as on a resync (compared with the standard
+        start, or ``resync_turn``).
+
+        Args:
+            snapshot: A calibration from ``snapshot``.
+            image: The current board image, in any position.
+            playing_white: True if white is at the bottom of the image.
+
+        Returns:
+            True if restored; False if the inner recognizer could not be,
+            or its reading of ``image`` is not a valid position.
+        """
+        if not self.inner.restore(snapshot, image, playing_white):
+            return False
+        self._reset()
+        candidate = board.CompactBoard.from_map(self.inner.read(image))
+        if candidate != _START:
+            chess_board = self._position(candidate)
+            if chess_board is None:
+                return False
+            self._begin(chess_board, candidate)
+        return True
+
+    def _reset(self):
+        """Start tracking from the standard start; zero every counter."""
+        import chess  # lazy: only required when the filter is actually used
+        self._begin(chess.Board(), _START)
+        self.index_hits = self.index_misses = 0
+        self.exact_accepts = self.likely_accepts = self.rejected = 0
+        self.catch_ups = 0
+        self.resyncs = 0
+        self.desync_seconds = 0.0
+        self.last_resync = None
+        self.rewinds = self.plies_rewound = 0
+        self.games.clear()
+        self.games_played = 0
+        self.turns = 0
+        self.recalibrations = 0
+        self.in_sync = self.settled = True
+
+    @property
+    def playing_white(self):
+        """The inner recognizer's ``playing_white`` orientation."""
+        return self.inner.playing_white
 
     def read(self, image):
         """Read the board, accepting only a reading that is a legal move away.
@@ -61,37 +311,471 @@ class LegalMoveFilter(BoardRecognizer):
             image: A board image to recognise.
 
         Returns:
-            The last accepted ``{(file_idx, rank): label}`` board map.
-            Returns the previous state unchanged when the inner reading does
-            not correspond to a legal chess move from the current position.
+            The last accepted board, a ``board.CompactBoard``: the previous
+            state unchanged when the inner reading does not correspond to a
+            legal chess move from the current position.
+        """
+        read_scored = getattr(self.inner, "read_scored", None)
+        scored = read_scored(image) if read_scored is not None else None
+        if getattr(self.inner, "needs_recalibration", False):
+            self.recalibrations += 1
+            self.inner.recalibrate(image, self._state)
+            scored = read_scored(image) if read_scored is not None else None
+        candidate = board.CompactBoard.from_map(
+            scored.board if scored is not None else self.inner.read(image))
+        if candidate == _TURNED_START and self._turn(image):
+            scored = read_scored(image) if read_scored is not None else None
+            candidate = board.CompactBoard.from_map(
+                scored.board if scored is not None else self.inner.read(image))
+        before = self._state
+        self._accept(candidate, scored)
+        self.in_sync = candidate == self._state
+        self.settled = (self.in_sync or self._state == before) and not (
+            0 < self._pending_count < self.resync_after)
+        return self._state
+
+    def _accept(self, candidate, scored):
+        """Update the state from a reading, as described on the class.
+
+        Args:
+            candidate: The inner recognizer's reading, a
+                ``board.CompactBoard``.
+            scored: Its ``ScoredBoard``, or None if the inner recognizer has
+                no scores.
         """
-        candidate = self.inner.read(image)
         if candidate == self._state:
-            return self._state
+            self._pending = self._desynced_since = None
+            self._pending_count = 0
+            return
         move = self._matching_legal_move(candidate)
         if move is not None:
-            self._chess_board.push(move)
-            self._state = candidate
-        return self._state
+            self.exact_accepts += 1
+            self._push(move)
+            return
+        placement = candidate.fen
+        earlier = self._plies.get(placement)
+        if placement == _START_PLACEMENT and not (
+                earlier and len(self._log) < self.min_game_plies):
+            self._new_game()
+            return
+        if earlier:
+            self.rewinds += 1
+            self.plies_rewound += len(self._history) - 1 - earlier[-1]
+            self._rewind(earlier[-1])
+            return
+        moves = self._catch_up(candidate)
+        if moves:
+            self.catch_ups += 1
+            for move in moves:
+                self._push(move)
+            return
+        if scored is not None:
+            move = self._likeliest_legal_move(scored)
+            if move is not None:
+                self.likely_accepts += 1
+                self._push(move)
+                return
+        self.rejected += 1
+        self._disagree(candidate, scored)
+
+    def _turn(self, image):
+        """Turn the inner recognizer to the other side of the board.
+
+        Args:
+            image: The frame showing the starting position from that side.
+
+        Returns:
+            True if the inner recognizer's calibration was restored with the
+            other orientation; False if it cannot be (no ``restore``, or
+            its templates do not fit ``image``), leaving it as it was.
+        """
+        restore = getattr(self.inner, "restore", None)
+        if restore is None:
+            return False
+        playing_white = self.inner.playing_white
+        snapshot = self.inner.snapshot()
+        if not restore(snapshot, image, not playing_white):
+            restore(snapshot, image, playing_white)
+            return False
+        self.turns += 1
+        return True
+
+    def _disagree(self, candidate, scored):
+        """Track a rejected reading; resync once it has persisted.
+
+        Args:
+            candidate: The rejected reading, a ``board.CompactBoard``.
+            scored: Its ``ScoredBoard``, or None if the inner recognizer has
+                no scores.
+        """
+        if self._desynced_since is None:
+            self._desynced_since = self._clock()
+        if not self.resync_after or not self._confident(scored):
+            self._pending, self._pending_count = None, 0
+            return
+        if candidate == self._pending:
+            self._pending_count += 1
+        else:
+            self._pending, self._pending_count = candidate, 1
+        if self._pending_count >= self.resync_after:
+            self._resync(candidate)
+
+    def _confident(self, scored):
+        """Return whether every piece in ``scored`` clearly beat its runner-up.
+
+        Args:
+            scored: A ``ScoredBoard``, or None.
+
+        Returns:
+            True if every square read as a piece leads by at least
+            ``resync_confidence`` nats (always True without scores).
+        """
+        if scored is None:
+            return True
+        threshold = self.resync_confidence * self.temperature
+        return all(margin >= threshold
+                   for label, margin in zip(scored.labels, scored.margin)
+                   if label != ".")
+
+    def _resync(self, candidate):
+        """Adopt ``candidate`` as the position, if some side to move fits it.
+
+        Args:
+            candidate: The reading to adopt, a ``board.CompactBoard``.
+        """
+        chess_board = self._position(candidate)
+        if chess_board is None:
+            return
+        now = self._clock()
+        seconds = now - self._desynced_since
+        self.resyncs += 1
+        self.desync_seconds += seconds
+        self.last_resync = (chess_board.board_fen(), seconds)
+        self._begin(chess_board, candidate)
+
+    def _position(self, candidate):
+        """Build a python-chess position for a reading no move explains.
+
+        Without ``resync_turn``, the side to move is inferred from arrivals:
+        the colour with more pieces newly standing on squares (compared with
+        the current state) is taken to have just moved. With no arrivals, the
+        current side to move is kept. If the position is not valid with that
+        side to move (the other side in check, say), the other side is tried.
+        Castling rights are those the position still allows; there is no en
+        passant square.
+
+        Args:
+            candidate: The reading, a ``board.CompactBoard``.
+
+        Returns:
+            A stackless ``chess.Board``, or None if the reading is not a
+            valid position with either side to move.
+        """
+        import chess
+        arrivals = {True: 0, False: 0}
+        for label in self._state.diff(candidate).values():
+            if label != ".":
+                arrivals[label.isupper()] += 1
+        if self.resync_turn is not None:
+            turns = [self.resync_turn]
+        elif arrivals[True] != arrivals[False]:
+            turns = [arrivals[True] < arrivals[False]]
+            turns.append(not turns[0])
+        else:
+            turns = [self._chess_board.turn, not self._chess_board.turn]
+        for turn in turns:
+            chess_board = chess.Board(None)
+            chess_board.set_board_fen(candidate.fen)
+            chess_board.turn = turn
+            chess_board.castling_rights = chess.BB_CORNERS
+            chess_board.castling_rights = chess_board.clean_castling_rights()
+            if chess_board.is_valid():
+                return chess_board
+        return None
+
+    def _push(self, move):
+        """Accept ``move``: update the state, the board and the move log.
+
+        Args:
+            move: A legal ``chess.Move`` from the current position.
+        """
+        state = self._state.replace(self._effects(move))
+        self._chess_board.push(move)
+        self._chess_board.clear_stack()
+        self._log.append(_pack(move))
+        self._record()
+        self._state = state
+        self._left_position()
+
+    def _begin(self, chess_board, state):
+        """Start a fresh history at ``chess_board``, showing ``state``.
+
+        Args:
+            chess_board: A stackless ``chess.Board`` to continue from.
+            state: Its placement, a ``board.CompactBoard``.
+        """
+        self._chess_board = chess_board
+        self._state = state
+        self._log = array("H")
+        self._history = []
+        self._plies = {}
+        self._record()
+        self._left_position()
+
+    def _new_game(self):
+        """Archive the current game and start tracking a new one."""
+        import chess
+        if self._log:
+            self.games.append(FinishedGame(self._history[0], self._log))
+            self.games_played += 1
+        self._begin(chess.Board(), _START)
+
+    def _record(self):
+        """Append the probing board's position to the history index."""
+        self._plies.setdefault(self._chess_board.board_fen(), []).append(
+            len(self._history))
+        self._history.append(self._chess_board.fen())
+
+    def _rewind(self, ply):
+        """Go back to the position after ``ply`` plies, dropping later ones.
+
+        Args:
+            ply: A ply index earlier than the current one.
+        """
+        import chess
+        for dropped in range(len(self._history) - 1, ply, -1):
+            placement = self._history[dropped].split(" ", 1)[0]
+            plies = self._plies[placement]
+            plies.pop()
+            if not plies:
+                del self._plies[placement]
+        del self._history[ply + 1:]
+        del self._log[ply:]
+        self._chess_board = chess.Board(self._history[ply])
+        self._state = board.from_fen(self._history[ply])
+        self._left_position()
+
+    def _left_position(self):
+        """Drop what was cached about the previous accepted position."""
+        self._successors = self._index = None
+        self._unexplained = set()
+        self._pending = self._desynced_since = None
+        self._pending_count = 0
+
+    @property
+    def moves(self):
+        """The moves leading to the current position.
+
+        These are the moves since calibration (or the last resync), less any
+        taken back.
+
+        Returns:
+            A list of ``chess.Move``.
+        """
+        return [_unpack(packed) for packed in self._log]
 
     def _matching_legal_move(self, candidate):
         """Return the legal move whose result matches ``candidate``, or ``None``.
 
-        Converts ``candidate`` to a piece-placement FEN and tests it against
-        every legal continuation from the current position.
+        Collects the squares where ``candidate`` differs from the current
+        state, with their new labels, and looks that diff up in the successor
+        index. Before the index exists, only the legal moves leaving from and
+        landing on changed squares are tried; a miss then builds the index
+        for the frames that follow. No board is copied or serialised.
 
         Args:
-            candidate: A ``{(file_idx, rank): label}`` board map from the
-                inner recognizer.
+            candidate: The inner recognizer's reading, a
+                ``board.CompactBoard``.
 
         Returns:
             A ``chess.Move`` if one legal move produces a board matching
             ``candidate``; ``None`` if no legal move does.
         """
-        candidate_fen = board.to_fen(candidate)
-        for move in self._chess_board.legal_moves:
-            test = self._chess_board.copy()
-            test.push(move)
-            if test.board_fen() == candidate_fen:
-                return move
+        diff = self._state.diff(candidate)
+        if self._index is not None:
+            move = self._index.get(frozenset(diff.items()))
+        else:
+            # First changed frame here: usually the move itself, which the
+            # moves touching the diff find without enumerating the rest.
+            mask = 0
+            for square in diff:
+                mask |= 1 << square
+            move = next((move for move in
+                         self._chess_board.generate_legal_moves(mask, mask)
+                         if self._effects(move) == diff), None)
+        if move is None:
+            self.index_misses += 1
+            self._successor_index()
+        else:
+            self.index_hits += 1
+        return move
+
+    def _successor_index(self):
+        """Return the accepted position's successor index, building it once.
+
+        Returns:
+            A dict mapping each legal move's ``_effects``, as a frozenset of
+            ``(square_index, label)`` pairs, to the move.
+        """
+        if self._index is None:
+            self._successors = [(move, self._effects(move))
+                                for move in self._chess_board.legal_moves]
+            self._index = {frozenset(effects.items()): move
+                           for move, effects in self._successors}
+        return self._index
+
+    def _catch_up(self, candidate):
+        """Find the shortest move sequence of 2+ plies producing ``candidate``.
+
+        An iterative-deepening search on the probing board (pushing and
+        popping, never copying). Every move must touch a square that still
+        differs from ``candidate``, and a branch is abandoned once more
+        squares differ than the remaining plies could change (four each, the
+        most a move changes). Readings the search fails on are remembered
+        until the next accepted move, so a repeated noisy frame is not
+        searched again.
+
+        Args:
+            candidate: The reading, a ``board.CompactBoard``.
+
+        Returns:
+            The list of ``chess.Move`` to push, or ``None``.
+        """
+        target = candidate.squares.decode("ascii")
+        mismatched = self._state.diff(candidate)
+        key = frozenset(mismatched.items())
+        if key in self._unexplained:
+            return None
+        for depth in range(2, self.max_catch_up + 1):
+            if len(mismatched) > 4 * depth:
+                continue
+            path = self._catch_up_from(target, mismatched, depth)
+            if path is not None:
+                return path
+        self._unexplained.add(key)
+        return None
+
+    def _catch_up_from(self, target, mismatched, depth):
+        """Depth-limited step of ``_catch_up`` from the probing board.
+
+        Args:
+            target: The 64 target labels as a string, a1 first.
+            mismatched: The squares still differing from ``target``, with
+                their target labels.
+            depth: Plies left.
+
+        Returns:
+            The list of moves reaching ``target`` in exactly ``depth`` plies,
+            or ``None``.
+        """
+        chess_board = self._chess_board
+        touching = 0
+        for square in mismatched:
+            touching |= 1 << square
+        if depth == 1:
+            # The last move changes every square left, and nothing else.
+            for move in chess_board.generate_legal_moves(touching, touching):
+                if self._effects(move) == mismatched:
+                    return [move]
+            return None
+        moves = [*chess_board.generate_legal_moves(touching, _ALL_SQUARES),
+                 *chess_board.generate_legal_moves(_ALL_SQUARES & ~touching,
+                                                   touching)]
+        for move in moves:
+            remaining = dict(mismatched)
+            for square, label in self._effects(move).items():
+                if label == target[square]:
+                    remaining.pop(square, None)
+                else:
+                    remaining[square] = target[square]
+            if not remaining or len(remaining) > 4 * (depth - 1):
+                continue
+            chess_board.push(move)
+            try:
+                path = self._catch_up_from(target, remaining, depth - 1)
+            finally:
+                chess_board.pop()
+            if path is not None:
+                return [move] + path
         return None
+
+    def _effects(self, move):
+        """Return the squares a legal move changes, with their new labels.
+
+        Covers the from and to squares, the castling rook's two squares and
+        the square of a pawn captured en passant, so comparing the result
+        with a reading's diff is an exact placement comparison.
+
+        Args:
+            move: A legal ``chess.Move`` from the current position.
+
+        Returns:
+            A ``{square_index: label}`` dict.
+        """
+        import chess
+        chess_board = self._chess_board
+        piece = chess_board.piece_at(move.from_square)
+        white = piece.color == chess.WHITE
+        if move.promotion:
+            placed = chess.Piece(move.promotion, piece.color).symbol()
+        else:
+            placed = piece.symbol()
+        effects = {move.from_square: ".", move.to_square: placed}
+        if chess_board.is_en_passant(move):
+            effects[move.to_square - 8 if white else move.to_square + 8] = "."
+        elif chess_board.is_castling(move):
+            back_rank = move.from_square - move.from_square % 8
+            if chess_board.is_kingside_castling(move):
+                rook_from, rook_to = back_rank + 7, back_rank + 5
+            else:
+                rook_from, rook_to = back_rank, back_rank + 3
+            effects[rook_from] = "."
+            effects[rook_to] = "R" if white else "r"
+        return effects
+
+    def _likeliest_legal_move(self, scored):
+        """Return the legal move the scores clearly favour, or ``None``.
+
+        Args:
+            scored: A ``ScoredBoard`` (see ``TemplateBoardRecognizer``) for
+                the frame.
+
+        Returns:
+            The ``chess.Move`` whose successor is the likeliest placement,
+            if its log-likelihood beats both the current placement's and the
+            runner-up successor's by ``margin``; otherwise ``None``.
+        """
+        chess_board = self._chess_board
+        self._successor_index()
+        ranked = []
+        for move, effects in self._successors:
+            gain = 0.0
+            for square, label in effects.items():
+                gain += (scored.score(square, label)
+                         - scored.score(square,
+                                        _symbol(chess_board.piece_at(square))))
+            ranked.append((gain / self.temperature, move))
+        if not ranked:
+            return None
+        ranked.sort(key=lambda gain_move: gain_move[0], reverse=True)
+        best, move = ranked[0]
+        runner_up = ranked[1][0] if len(ranked) > 1 else 0.0
+        if best - max(runner_up, 0.0) >= self.margin:
+            return move
+        return None
+
+
+def _pack(move):
+    """Pack a ``chess.Move`` into 16 bits: from, to and promotion piece."""
+    return move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+
+
+def _unpack(packed):
+    """Invert ``_pack``."""
+    import chess
+    return chess.Move(packed & 63, packed >> 6 & 63, packed >> 12 or None)
+
+
+def _symbol(piece):
+    """Return the board label of a python-chess piece (``'.'`` for None)."""
+    return piece.symbol() if piece else "."
@@ -0,0 +1,190 @@
+"""The ``NpzCalibrationStore`` calibration store."""
+
+import json
+import os
+import zipfile
+
+from chesscheat.interfaces import CalibrationStore
+
+
+class NpzCalibrationStore(CalibrationStore):
+    """Saves a ``TemplateBoardRecognizer`` calibration to a versioned ``.npz``.
+
+    The file holds the templates (as stacked shape vectors and means, so
+    templates must be ``NumpyImageBackend`` ``(shape, mean)`` features), the
+    backend's ``params``, the calibration frame's ``theme``, ``fingerprint``
+    and piece ``margin``, and the capture box and frame size, under a
+    ``version`` of ``FORMAT_VERSION``.
+
+    ``load`` reuses the file only when all of these still hold: same format
+    version, same backend settings, and a current frame whose ``theme`` is
+    within ``theme_tolerance`` of the saved one on every colour channel.
+    Since ``theme`` looks only at the squares' colours, this check works
+    whatever the position on screen. A file failing any check (or
+    unreadable) is deleted, so the next run calibrates afresh. A file that
+    passes is restored with ``recognizer.restore``. With a
+    ``LegalMoveFilter`` that also adopts the position on screen, and a
+    position it cannot adopt is a miss that keeps the file.
+
+    The board may have changed size since (the browser zoomed, say): the
+    templates do not depend on it, and ``restore`` verifies that they still
+    fit against the saved ``margin``. A resized board they do not fit, or
+    a file without a ``margin`` to check against, is a ``"size"`` miss.
+
+    Attributes:
+        path: The ``.npz`` file.
+        theme_tolerance: Largest per-channel colour difference, in grey
+            levels, between the saved and current ``theme``.
+        last_miss: Why the last ``load`` did not restore (``"missing"``,
+            ``"unreadable"``, ``"version"``, ``"backend"``, ``"size"``,
+            ``"theme"`` or ``"position"``), or None after a restore.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path, theme_tolerance=12.0):
+        """Initialise the store.
+
+        Args:
+            path: Where the calibration is kept; parent directories are
+                created on ``save``.
+            theme_tolerance: Largest per-channel colour difference, in grey
+                levels, between the saved and current ``theme``.
+        """
+        self.path = path
+        self.theme_tolerance = theme_tolerance
+        self.last_miss = None
+
+    def load(self, recognizer, image, playing_white, box):
+        """Restore the saved calibration if it still fits the board.
+
+        Args:
+            recognizer: A recognizer with ``snapshot``, ``theme`` and
+                ``restore``.
+            image: The current board image, in any position.
+            playing_white: True if white is at the bottom of the image.
+            box: The capture box, an ``(x1, y1, x2, y2)`` tuple.
+
+        Returns:
+            True if the recognizer was restored.
+        """
+        import numpy as np
+        try:
+            saved = self.read()
+        except ValueError:
+            return self._miss("unreadable")
+        if saved is None:
+            self.last_miss = "missing"
+            return False
+        if saved["version"] != self.FORMAT_VERSION:
+            return self._miss("version")
+        snapshot = saved["snapshot"]
+        if snapshot["backend"] != recognizer.snapshot()["backend"]:
+            return self._miss("backend")
+        x1, y1, x2, y2 = box
+        resized = (saved["frame_shape"] != np.asarray(image).shape[:2]
+                   or saved["box_size"] != (x2 - x1, y2 - y1))
+        if resized and snapshot.get("margin") is None:
+            return self._miss("size")
+        theme = recognizer.theme(image)
+        if (theme is None or snapshot["theme"].shape != np.shape(theme)
+                or np.abs(snapshot["theme"] - theme).max()
+                > self.theme_tolerance):
+            return self._miss("theme")
+        if not recognizer.restore(snapshot, image, playing_white):
+            if resized:
+                return self._miss("size")
+            self.last_miss = "position"
+            return False
+        self.last_miss = None
+        return True
+
+    def read(self):
+        """Read the saved calibration without checking it against anything.
+
+        Returns:
+            None if there is no file; otherwise a dict with the file's
+            ``version``, ``frame_shape`` and ``box_size`` (tuples) and a
+            ``snapshot`` for ``restore`` (with ``templates``, ``theme``,
+            ``fingerprint``, ``backend`` and ``margin``).
+
+        Raises:
+            ValueError: If the file exists but cannot be read as one.
+        """
+        import numpy as np
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                saved = {key: data[key] for key in data.files}
+            version = int(saved["version"])
+            if version != self.FORMAT_VERSION:
+                return {"version": version}
+            templates = {(label, bool(light)): (shape, float(mean))
+                         for label, light, shape, mean
+                         in zip(str(saved["labels"]), saved["lights"],
+                                saved["shapes"], saved["means"])}
+            return {"version": version,
+                    "frame_shape": tuple(saved["frame_shape"].tolist()),
+                    "box_size": tuple(saved["box_size"].tolist()),
+                    "snapshot": {
+                        "templates": templates, "theme": saved["theme"],
+                        "fingerprint": saved.get("fingerprint"),
+                        "backend": json.loads(str(saved["backend"])),
+                        "margin": (float(saved["margin"]) if "margin" in saved
+                                   else None)}}
+        except (OSError, EOFError, KeyError, zipfile.BadZipFile) as e:
+            raise ValueError(f"unreadable calibration {self.path!r}") from e
+
+    def save(self, recognizer, image, box):
+        """Write ``recognizer``'s calibration to ``path``, atomically.
+
+        Args:
+            recognizer: A calibrated recognizer with ``snapshot``.
+            image: The image it was calibrated from.
+            box: The capture box, an ``(x1, y1, x2, y2)`` tuple.
+        """
+        import numpy as np
+        snapshot = recognizer.snapshot()
+        keys = list(snapshot["templates"])
+        features = [snapshot["templates"][key] for key in keys]
+        x1, y1, x2, y2 = box
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        partial = self.path + ".partial"
+        with open(partial, "wb") as f:
+            np.savez(f, version=self.FORMAT_VERSION,
+                     labels="".join(label for label, _ in keys),
+                     lights=np.array([light for _, light in keys], dtype=bool),
+                     shapes=np.stack([shape for shape, _ in features]),
+                     means=np.array([mean for _, mean in features]),
+                     theme=np.asarray(snapshot["theme"], dtype=np.float32),
+                     **({} if snapshot.get("fingerprint") is None else
+                        {"fingerprint": snapshot["fingerprint"]}),
+                     **({} if snapshot.get("margin") is None else
+                        {"margin": snapshot["margin"]}),
+                     backend=json.dumps(snapshot["backend"], sort_keys=True),
+                     frame_shape=np.asarray(image).shape[:2],
+                     box=np.array(box), box_size=(x2 - x1, y2 - y1))
+        os.replace(partial, self.path)
+
+    def invalidate(self):
+        """Delete the saved calibration, if any."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _miss(self, reason):
+        """Record a stale calibration: invalidate it and report a miss.
+
+        Args:
+            reason: The ``last_miss`` to record.
+
+        Returns:
+            False, for ``load`` to return.
+        """
+        self.last_miss = reason
+        self.invalidate()
+        return False
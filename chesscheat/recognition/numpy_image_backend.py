@@ -1,8 +1,28 @@
 """The ``NumpyImageBackend`` image backend."""
 
+from functools import lru_cache
+
 from chesscheat.interfaces import ImageBackend
 
 
+@lru_cache(maxsize=64)
+def _nearest_steps(n, size):
+    """Return the source indices nearest-neighbour resizing samples.
+
+    Args:
+        n: Source length, in pixels.
+        size: Target length, in pixels.
+
+    Returns:
+        A read-only ``(size,)`` integer numpy array of indices into ``n``.
+    """
+    import numpy as np
+
+    steps = (np.arange(size) * n) // size
+    steps.flags.writeable = False
+    return steps
+
+
 def _resize_nearest(arr, size):
     """Resize a 2-D array to a square via nearest-neighbour sampling.
 
@@ -13,12 +33,301 @@ def _resize_nearest(arr, size):
     Returns:
         A ``size`` x ``size`` numpy array sampled from ``arr``.
     """
+    h, w = arr.shape[:2]
+    return arr[_nearest_steps(h, size)][:, _nearest_steps(w, size)]
+
+
+def _area_bins(starts_from, n, size):
+    """Split ``n`` pixels into ``size`` contiguous, non-empty bins.
+
+    Bin ``i`` covers ``[i*n // size, (i+1)*n // size)``, widened to one pixel
+    when ``n < size`` would leave it empty.
+
+    Args:
+        starts_from: Offset added to every bin edge (scalar or column array).
+        n: Number of pixels to split (scalar or column array).
+        size: Number of bins.
+
+    Returns:
+        A ``(starts, ends)`` pair of integer numpy arrays of bin edges.
+    """
     import numpy as np
 
+    steps = np.arange(size)
+    starts = (steps * n) // size
+    ends = np.maximum(((steps + 1) * n) // size, starts + 1)
+    return starts_from + starts, starts_from + ends
+
+
+def _integral(arr):
+    """Return the zero-padded summed-area table of a 2-D array.
+
+    Args:
+        arr: A 2-D numpy array.
+
+    Returns:
+        An ``(h+1, w+1)`` array whose ``[y, x]`` entry is the sum of
+        ``arr[:y, :x]``: int64 (so exact) for integer input, else float64.
+    """
+    import numpy as np
+
+    dtype = np.int64 if np.issubdtype(arr.dtype, np.integer) else np.float64
+    table = np.zeros((arr.shape[0] + 1, arr.shape[1] + 1), dtype=dtype)
+    np.cumsum(arr, axis=0, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+    return table
+
+
+def _reduceat_plan(starts, lengths, size, n):
+    """Lay out one axis's area bins as ``np.add.reduceat`` segments.
+
+    Each of the 8 cells along the axis contributes its ``size`` bin starts
+    followed by its last bin's end, so the segment after a cell's last bin
+    (the margin up to the next cell) is summed separately and ignored.
+
+    Args:
+        starts: ``(8,)`` first pixel of each cell's crop along the axis.
+        lengths: ``(8,)`` crop lengths, each at least ``size``.
+        size: Number of bins per cell.
+        n: Frame length along the axis.
+
+    Returns:
+        ``((indices, positions), bin_lengths)``: the reduceat indices, the
+        ``(8, size)`` positions of each cell's bins in the reduced output, and
+        the ``(8, size)`` pixel length of each bin.
+    """
+    import numpy as np
+
+    bin_starts, bin_ends = _area_bins(starts[:, None], lengths[:, None], size)
+    indices = np.concatenate([bin_starts, bin_ends[:, -1:]], axis=1).ravel()
+    if indices[-1] == n:
+        indices = indices[:-1]  # the last bin simply runs to the end
+    positions = np.arange(8)[:, None] * (size + 1) + np.arange(size)
+    return (indices, positions), bin_ends - bin_starts
+
+
+def _resize_area(arr, size):
+    """Resize a 2-D array to a square by averaging each output pixel's area.
+
+    Every source pixel contributes, so the result does not jump when the crop
+    shifts by a pixel the way nearest-neighbour sampling does. Uses a plain
+    reshape-and-mean when both sides are multiples of ``size``, and
+    summed-area-table box sums otherwise.
+
+    Args:
+        arr: A 2-D numpy array.
+        size: Target side length, in pixels.
+
+    Returns:
+        A ``size`` x ``size`` float64 numpy array of area averages.
+    """
     h, w = arr.shape[:2]
-    ys = (np.arange(size) * h) // size
-    xs = (np.arange(size) * w) // size
-    return arr[ys][:, xs]
+    if h % size == 0 and w % size == 0:
+        return arr.reshape(size, h // size, size, w // size).mean(axis=(1, 3))
+    y0, y1 = _area_bins(0, h, size)
+    x0, x1 = _area_bins(0, w, size)
+    table = _integral(arr)
+    sums = (table[y1][:, x1] - table[y0][:, x1]
+            - table[y1][:, x0] + table[y0][:, x0])
+    return sums / ((y1 - y0)[:, None] * (x1 - x0)[None, :])
+
+
+_FLAT_NORM = 1e-3  # grey levels
+
+
+def _quantize(shapes):
+    """Quantize unit shape vectors to int8 with one scale factor per row.
+
+    Args:
+        shapes: An ``(N, D)`` float array.
+
+    Returns:
+        ``(q, scales)``: an ``(N, D)`` int8 array and ``(N,)`` float64 scales
+        such that ``q * scales[:, None]`` approximates ``shapes``.
+    """
+    import numpy as np
+
+    peaks = np.abs(shapes).max(axis=1).astype(np.float64)
+    scales = np.where(peaks > 0, peaks / 127.0, 1.0)
+    q = np.rint(shapes / scales[:, None].astype(shapes.dtype))
+    return q.astype(np.int8), scales
+
+
+@lru_cache(maxsize=16)
+def _cell_probes(h, w, fractions):
+    """Return sample points at the same fractions of every cell of a frame.
+
+    Args:
+        h: Frame height.
+        w: Frame width.
+        fractions: Tuple of offsets within a cell, as fractions of its side,
+            used along both axes.
+
+    Returns:
+        ``(ys, xs, dark)``: row indices as a column and column indices as a
+        row (so ``image[ys, xs]`` is the grid of samples), and a boolean
+        grid, True where the sample lies on a dark square (screen cell
+        ``(row, col)`` with ``row + col`` odd).
+    """
+    import numpy as np
+
+    n = len(fractions)
+    insets = (np.arange(8)[:, None] + np.array(fractions)).ravel()
+    ys = (insets * h / 8).astype(np.intp)
+    xs = (insets * w / 8).astype(np.intp)
+    cells = np.arange(8 * n) // n
+    dark = np.add.outer(cells, cells) % 2 == 1
+    return ys[:, None], xs[None, :], dark
+
+
+def _normalise(vecs, dtype):
+    """Turn rows of resized grayscale pixels into ``(shape, mean)`` features.
+
+    Args:
+        vecs: An ``(N, size*size)`` float array, one resized square per row.
+        dtype: Float dtype the shape vectors are computed and returned in.
+
+    Returns:
+        A ``(shapes, means)`` tuple: ``(N, size*size)`` unit-normalised,
+        mean-subtracted rows (zero rows for flat squares) and the ``(N,)``
+        row means scaled to ``[0, 1]``.
+    """
+    import numpy as np
+
+    vecs = vecs.astype(dtype, copy=False)
+    means = vecs.mean(axis=1, dtype=np.float64)
+    centered = vecs - means.astype(dtype)[:, None]
+    norms = np.linalg.norm(centered, axis=1)
+    # Below _FLAT_NORM the "texture" is floating-point residue (e.g. from
+    # summed-area differences), not pixels; normalising it would turn a flat
+    # square into a random unit vector.
+    flat = norms < _FLAT_NORM
+    shapes = centered / np.where(flat, 1.0, norms)[:, None]
+    shapes[flat] = 0.0
+    return shapes, means / 255.0
+
+
+class _SquareGeometry:
+    """Crop boxes and gather indices of all 64 squares for one frame shape.
+
+    Attributes:
+        key: The ``(H, W, size, margin)`` tuple this geometry was built for.
+        boxes: 64 ``(top, left, height, width)`` crop boxes, one per screen
+            cell in row-major order, with margins already trimmed.
+        gather: A ``(64, size*size)`` integer array of flat frame indices of
+            each square's nearest-neighbour resized pixels.
+    """
+
+    __slots__ = ("key", "boxes", "gather", "_top", "_left", "_height",
+                 "_width", "_area")
+
+    def __init__(self, h, w, size, margin):
+        """Compute the geometry of a ``h`` x ``w`` frame.
+
+        Args:
+            h: Frame height, in pixels.
+            w: Frame width, in pixels.
+            size: Side length each square is resized to.
+            margin: Fraction trimmed from each side of a square.
+        """
+        import numpy as np
+
+        cells = np.arange(9)
+        ys = (cells * h / 8).astype(np.int64)
+        xs = (cells * w / 8).astype(np.int64)
+        ch, cw = np.diff(ys), np.diff(xs)
+        my = (ch * margin).astype(np.int64)
+        mx = (cw * margin).astype(np.int64)
+
+        # Per-square inner box; a square trimmed to nothing keeps its cell.
+        trim_y = np.broadcast_to(my[:, None], (8, 8))
+        trim_x = np.broadcast_to(mx[None, :], (8, 8))
+        empty = ((ch - 2 * my)[:, None] <= 0) | ((cw - 2 * mx)[None, :] <= 0)
+        trim_y = np.where(empty, 0, trim_y).ravel()
+        trim_x = np.where(empty, 0, trim_x).ravel()
+        rows, cols = np.divmod(np.arange(64), 8)
+        top, left = ys[rows] + trim_y, xs[cols] + trim_x
+        height, width = ch[rows] - 2 * trim_y, cw[cols] - 2 * trim_x
+
+        steps = np.arange(size)
+        sample_y = top[:, None] + (steps * height[:, None]) // size
+        sample_x = left[:, None] + (steps * width[:, None]) // size
+        gather = (sample_y[:, :, None] * w + sample_x[:, None, :]).reshape(64, -1)
+        gather.flags.writeable = False
+
+        self.key = (h, w, size, margin)
+        self.boxes = list(zip(top.tolist(), left.tolist(),
+                              height.tolist(), width.tolist()))
+        self.gather = gather
+        self._top, self._left = top, left
+        self._height, self._width = height, width
+        self._area = None
+
+    def area(self):
+        """Return (building on first use) the area-resampling plan.
+
+        Returns:
+            One of, from cheapest to most general:
+
+            - ``("grid", (top, left, pitch_y, pitch_x, height, width))`` when
+              every square's crop is the same whole multiple of ``size`` on a
+              regular grid, so a strided view plus reshape-and-mean does it;
+            - ``("bins", (rows, cols, areas))`` when the crops share row and
+              column bounds and every bin is non-empty, so two separable
+              ``np.add.reduceat`` passes sum every bin: ``rows`` and ``cols``
+              are ``(indices, positions)`` pairs (the reduceat indices, and
+              where each square's ``size`` bins land in its output);
+            - ``("table", (corners, areas))``: the flat summed-area-table
+              indices of each output pixel's four box corners.
+
+            ``areas`` is the ``(64, size*size)`` pixel count of every bin.
+        """
+        import numpy as np
+
+        if self._area is not None:
+            return self._area
+        h, w, size, _ = self.key
+        top, left = self._top, self._left
+        height, width = self._height, self._width
+        pitch_y = np.diff(top.reshape(8, 8)[:, 0])
+        pitch_x = np.diff(left.reshape(8, 8)[0])
+        if ((height == height[0]).all() and (width == width[0]).all()
+                and height[0] % size == 0 and width[0] % size == 0
+                and (pitch_y == pitch_y[0]).all()
+                and (pitch_x == pitch_x[0]).all()
+                and (top.reshape(8, 8) == top[::8, None]).all()
+                and (left.reshape(8, 8) == left[None, :8]).all()):
+            self._area = ("grid", (int(top[0]), int(left[0]), int(pitch_y[0]),
+                                   int(pitch_x[0]), int(height[0]),
+                                   int(width[0])))
+            return self._area
+
+        rows_top, rows_height = top[::8], height[::8]
+        cols_left, cols_width = left[:8], width[:8]
+        if ((top.reshape(8, 8) == rows_top[:, None]).all()
+                and (height.reshape(8, 8) == rows_height[:, None]).all()
+                and (left.reshape(8, 8) == cols_left[None, :]).all()
+                and (width.reshape(8, 8) == cols_width[None, :]).all()
+                and rows_height.min() >= size and cols_width.min() >= size):
+            rows, bin_heights = _reduceat_plan(rows_top, rows_height, size, h)
+            cols, bin_widths = _reduceat_plan(cols_left, cols_width, size, w)
+            areas = bin_heights[:, :, None, None] * bin_widths[None, None]
+            areas = areas.transpose(0, 2, 1, 3).reshape(64, -1)
+            self._area = ("bins", (rows, cols, areas))
+            return self._area
+
+        y0, y1 = _area_bins(top[:, None], height[:, None], size)
+        x0, x1 = _area_bins(left[:, None], width[:, None], size)
+        stride = w + 1
+
+        def corner(ys, xs):
+            return (ys[:, :, None] * stride + xs[:, None, :]).reshape(64, -1)
+
+        corners = (corner(y1, x1), corner(y0, x1), corner(y1, x0),
+                   corner(y0, x0))
+        areas = ((y1 - y0)[:, :, None] * (x1 - x0)[:, None, :]).reshape(64, -1)
+        self._area = ("table", (corners, areas))
+        return self._area
 
 
 class NumpyImageBackend(ImageBackend):
@@ -38,14 +347,41 @@ class NumpyImageBackend(ImageBackend):
     ``similarity`` combines the two: correlation plus ``brightness_weight``
     times brightness closeness.
 
+    ``features_all`` is the batched form of ``get_square`` + ``feature``: it
+    turns a whole frame into all 64 features with a few array operations
+    instead of 64 rounds of small numpy calls. ``stack`` and
+    ``similarity_matrix`` are the matching batched forms of ``similarity``:
+    templates are stacked once into a contiguous bank, then a whole set of
+    squares is scored against it with one matrix multiply. The crop boxes and
+    gather indices behind both ``get_square`` and ``features_all`` are cached
+    per frame shape, so a frame costs one fancy index rather than 64 rounds
+    of bound arithmetic. ``fingerprints`` and ``changed`` let a recognizer
+    skip squares that have not changed since they were last classified.
+    ``features_all`` can also extract at a smaller ``size``, and ``coarsen``
+    reduces a template to match, for a coarse first pass over the squares.
+    ``fit_projection`` and ``project`` map features into a few principal
+    components, where ``similarity_matrix`` scores them just the same.
+    ``theme`` summarises a frame's board colours whatever the position, so a
+    saved calibration can be checked against the board on screen;
+    ``fingerprint`` adds the piece set's fill tones, to pick a calibration
+    for the board on screen out of many.
+
     Attributes:
         size: Side length each square is normalised to before matching.
         margin: Fraction trimmed from each side of a square.
         brightness_weight: Weight of the brightness term in ``similarity``.
+        resample: ``"nearest"`` or ``"area"`` square downsampling.
+        precision: ``"float64"``, ``"float32"`` or ``"int8"`` matching.
+        change_threshold: Grey-level difference ``changed`` treats as a change.
     """
 
+    RESAMPLE_MODES = ("nearest", "area")
+    PRECISIONS = ("float64", "float32", "int8")
+    FINGERPRINT_SIZE = 8
+
     def __init__(self, size=48, margin=0.12, brightness_weight=0.5,
-                 recolor_tol=40):
+                 recolor_tol=40, resample="nearest", precision="float64",
+                 change_threshold=1.0):
         """Initialise the backend.
 
         Args:
@@ -56,11 +392,52 @@ class NumpyImageBackend(ImageBackend):
                 to the shape-correlation term in ``similarity``.
             recolor_tol: Max per-pixel colour distance to ``from_empty`` for a
                 pixel to count as background in ``recolor``.
+            resample: How a square is reduced to ``size`` x ``size``:
+                ``"nearest"`` samples one pixel per output pixel;
+                ``"area"`` averages every pixel under it (a box filter), which
+                is steadier when the capture box shifts by a pixel.
+            precision: Numeric precision of shape vectors and matching:
+                ``"float64"``; ``"float32"``, which halves the memory each
+                correlation touches; or ``"int8"``, which stores float32
+                features but quantizes template banks (once, in ``stack``)
+                and frame features to int8 and correlates them with integer
+                dot products.
+            change_threshold: Mean absolute grey-level difference between
+                two fingerprints above which ``changed`` reports a square.
+
+        Raises:
+            ValueError: If ``resample`` is not one of ``RESAMPLE_MODES`` or
+                ``precision`` not one of ``PRECISIONS``.
         """
+        if resample not in self.RESAMPLE_MODES:
+            raise ValueError(f"unknown resample mode {resample!r}; expected "
+                             f"one of {self.RESAMPLE_MODES}")
+        if precision not in self.PRECISIONS:
+            raise ValueError(f"unknown precision {precision!r}; expected "
+                             f"one of {self.PRECISIONS}")
         self.size = size
         self.margin = margin
         self.brightness_weight = brightness_weight
         self.recolor_tol = recolor_tol
+        self.resample = resample
+        self.precision = precision
+        self.change_threshold = change_threshold
+        self._geometries = {}  # (H, W, size, margin) -> _SquareGeometry
+
+    @property
+    def params(self):
+        """The settings templates depend on, as a dict of constructor args."""
+        return {"size": self.size, "margin": self.margin,
+                "brightness_weight": self.brightness_weight,
+                "recolor_tol": self.recolor_tol, "resample": self.resample,
+                "precision": self.precision}
+
+    @property
+    def _dtype(self):
+        """The numpy float dtype shape vectors are computed in."""
+        import numpy as np
+
+        return np.float64 if self.precision == "float64" else np.float32
 
     def get_square(self, image, row, col):
         """Crop the inner region of one square from a numpy board image.
@@ -73,14 +450,260 @@ class NumpyImageBackend(ImageBackend):
         Returns:
             The cropped, margin-trimmed square as a numpy array.
         """
-        h, w = image.shape[:2]
-        sy, ey = int(row * h / 8), int((row + 1) * h / 8)
-        sx, ex = int(col * w / 8), int((col + 1) * w / 8)
-        cell = image[sy:ey, sx:ex]
-        ch, cw = cell.shape[:2]
-        my, mx = int(ch * self.margin), int(cw * self.margin)
-        inner = cell[my:ch - my, mx:cw - mx]
-        return inner if inner.size else cell
+        top, left, height, width = self._geometry(
+            *image.shape[:2]).boxes[row * 8 + col]
+        return image[top:top + height, left:left + width]
+
+    def features_all(self, image, cells=None, size=None):
+        """Extract the features of all 64 squares of a frame at once.
+
+        Equivalent to calling ``feature(get_square(image, row, col))`` for
+        every cell, but every square's resized pixels are gathered with a
+        single fancy index (or, for ``"area"`` resampling, a few
+        summed-area-table lookups on a once-per-frame grayscale image).
+
+        Colour ``uint8`` frames -- what ``capture.screenshot`` returns (BGRA)
+        -- take an integer fast path: pixels are gathered straight from the
+        capture buffer, alpha is dropped through a view, and the three colour
+        channels are summed in ``uint16``, so no float64 copy of the frame is
+        ever made. Other inputs are converted to float64 grayscale first.
+
+        Args:
+            image: A full board image as an ``(H, W, ...)`` numpy array.
+            cells: Optional sequence of screen cells (``row * 8 + col``) to
+                extract; all 64 when omitted.
+            size: Side length to reduce squares to instead of ``size`` (for
+                features to compare with ``coarsen``-ed templates).
+
+        Returns:
+            A ``(shapes, means)`` tuple: ``shapes`` is an ``(N, size*size)``
+            array of unit-normalised, mean-subtracted vectors and ``means`` an
+            ``(N,)`` array of average intensities scaled to ``[0, 1]``, one
+            row per requested cell (row ``row * 8 + col`` for all 64).
+        """
+        import numpy as np
+
+        image = np.asarray(image)
+        geometry = self._geometry(*image.shape[:2], size)
+        if self.resample == "area":
+            vecs = self._area_all(self._gray(image), geometry)
+            if cells is not None:
+                vecs = vecs[cells]
+        else:
+            gather = geometry.gather if cells is None else geometry.gather[cells]
+            vecs = self._sample(image, gather)
+        return _normalise(vecs, self._dtype)
+
+    def fingerprints(self, image):
+        """Take a cheap per-square thumbnail of a frame for change detection.
+
+        Args:
+            image: A full board image as an ``(H, W, ...)`` numpy array.
+
+        Returns:
+            A ``(64, FINGERPRINT_SIZE**2)`` float32 array of grayscale
+            samples, one row per screen cell; compare two with ``changed``.
+        """
+        import numpy as np
+
+        image = np.asarray(image)
+        geometry = self._geometry(*image.shape[:2], self.FINGERPRINT_SIZE)
+        return self._sample(image, geometry.gather).astype(np.float32)
+
+    def changed(self, old, new):
+        """List the squares whose fingerprints differ materially.
+
+        Args:
+            old: Fingerprints from ``fingerprints``.
+            new: Fingerprints of a later frame of the same shape.
+
+        Returns:
+            The screen cells (``row * 8 + col``) whose mean absolute sample
+            difference exceeds ``change_threshold`` grey levels.
+        """
+        import numpy as np
+
+        diff = np.abs(new - old).mean(axis=1)
+        return np.flatnonzero(diff > self.change_threshold).tolist()
+
+    def theme(self, image):
+        """Estimate the light and dark square colours of a frame.
+
+        Samples every cell one eighth of a cell in from each of its corners,
+        where pieces rarely reach, and takes the median of each colour's 128
+        samples, so coordinate labels, highlights and the odd piece do not
+        move it. Screen cell ``(row, col)`` is light when ``row + col`` is
+        even, from either side, so the result does not depend on the
+        position or orientation.
+
+        Args:
+            image: A full board image as an ``(H, W, ...)`` numpy array.
+
+        Returns:
+            A ``(2, C)`` float32 array: the light then the dark square
+            colour, with ``C`` colour channels (alpha dropped; 1 for
+            grayscale).
+        """
+        import numpy as np
+
+        image = np.asarray(image)
+        ys, xs, dark = _cell_probes(*image.shape[:2], (0.125, 0.875))
+        pixels = image[ys, xs]
+        if pixels.ndim == 2:
+            pixels = pixels[..., None]
+        pixels = pixels[..., :3]
+        return np.stack([np.median(pixels[~dark], axis=0),
+                         np.median(pixels[dark], axis=0)]).astype(np.float32)
+
+    def fingerprint(self, image, contrast=24):
+        """Summarise a frame's board theme and piece set in a few numbers.
+
+        The board part is ``theme``. The piece part samples a 5 x 5 grid over
+        the middle of every cell, keeps the samples more than ``contrast``
+        grey levels from their square's colour (so, on piece bodies), and
+        takes their 90th and 10th percentile grey levels: roughly the white
+        and black pieces' fill tones. Like ``theme``, neither depends much on
+        the position.
+
+        Args:
+            image: A full board image as an ``(H, W, ...)`` numpy array.
+            contrast: Grey-level distance from the square colour for a sample
+                to count as a piece.
+
+        Returns:
+            A 1-D float32 array: ``theme(image)`` flattened (light then dark
+            square colour), then the light and dark piece tones (both -1
+            when no square shows a piece).
+        """
+        import numpy as np
+
+        image = np.asarray(image)
+        theme = self.theme(image)
+        ys, xs, dark = _cell_probes(*image.shape[:2],
+                                    (0.3, 0.4, 0.5, 0.6, 0.7))
+        pixels = image[ys, xs]
+        if pixels.ndim == 3:
+            gray = pixels[..., :3].sum(axis=2, dtype=np.float32) / 3
+        else:
+            gray = pixels.astype(np.float32)
+        background = np.where(dark, theme[1].mean(), theme[0].mean())
+        pieces = gray[np.abs(gray - background) > contrast]
+        if pieces.size:
+            last = pieces.size - 1
+            high, low = int(0.9 * last), int(0.1 * last)
+            tones = np.partition(pieces, (low, high))[[high, low]]
+        else:
+            tones = np.full(2, -1.0)
+        return np.concatenate([theme.ravel(), tones]).astype(np.float32)
+
+    def _gray(self, image):
+        """Convert a whole frame to grayscale for area resampling.
+
+        Args:
+            image: A board image as a numpy array.
+
+        Returns:
+            A 2-D array: ``uint16`` sums of the three colour channels for
+            colour ``uint8`` frames (alpha ignored), else float64 intensity
+            scaled the same way (three times the channel mean).
+        """
+        import numpy as np
+
+        if image.dtype == np.uint8 and image.ndim == 3 and image.shape[2] >= 3:
+            gray = image[..., 0].astype(np.uint16)
+            gray += image[..., 1]
+            gray += image[..., 2]
+            return gray
+        gray = image.astype(np.float64)
+        return gray[..., :3].sum(axis=2) if gray.ndim == 3 else gray * 3.0
+
+    def _sample(self, image, gather):
+        """Gather grayscale pixels at flat frame indices.
+
+        Args:
+            image: A board image as a numpy array.
+            gather: An integer array of flat ``H*W`` pixel indices.
+
+        Returns:
+            A float array shaped like ``gather`` of pixel intensities (the
+            mean of the colour channels), in the configured float precision.
+        """
+        import numpy as np
+
+        channels = image.shape[2] if image.ndim == 3 else 0
+        if image.dtype == np.uint8 and channels >= 3:
+            pixels = image.reshape(-1, channels)[gather]
+            sums = pixels[..., :3].sum(axis=-1, dtype=np.uint16)
+            return sums / self._dtype(3.0)
+        gray = image.astype(np.float64)
+        if gray.ndim == 3:
+            gray = gray[..., :3].mean(axis=2)
+        return gray.ravel()[gather]
+
+    def _area_all(self, gray, geometry):
+        """Area-average every square of a grayscale frame down to ``size``.
+
+        Args:
+            gray: A 2-D frame of colour-channel sums from ``_gray``.
+            geometry: The frame's ``_SquareGeometry``.
+
+        Returns:
+            A ``(64, size*size)`` float64 array of mean intensities, one row
+            per square.
+        """
+        import numpy as np
+
+        kind, plan = geometry.area()
+        size = geometry.key[2]
+        if kind == "grid":
+            top, left, pitch_y, pitch_x, height, width = plan
+            gray = np.ascontiguousarray(gray)
+            row_stride, col_stride = gray.strides
+            cells = np.lib.stride_tricks.as_strided(
+                gray[top:, left:],
+                shape=(8, size, height // size, 8, size, width // size),
+                strides=(pitch_y * row_stride, height // size * row_stride,
+                         row_stride, pitch_x * col_stride,
+                         width // size * col_stride, col_stride),
+                writeable=False)
+            means = cells.mean(axis=(2, 5))
+            return means.transpose(0, 2, 1, 3).reshape(64, -1) / 3.0
+        if kind == "bins":
+            (row_idx, row_pos), (col_idx, col_pos), areas = plan
+            dtype = (np.int64 if np.issubdtype(gray.dtype, np.integer)
+                     else np.float64)
+            sums = np.add.reduceat(gray, row_idx, axis=0, dtype=dtype)
+            sums = np.add.reduceat(sums, col_idx, axis=1)
+            picked = sums[row_pos[:, :, None, None], col_pos[None, None]]
+            return picked.transpose(0, 2, 1, 3).reshape(64, -1) / (3.0 * areas)
+        corners, areas = plan
+        table = _integral(gray).ravel()
+        sums = (table[corners[0]] - table[corners[1]]
+                - table[corners[2]] + table[corners[3]])
+        return sums / (3.0 * areas)
+
+    def _geometry(self, h, w, size=None):
+        """Return the cached square geometry for a frame shape.
+
+        Geometries are cached by ``(H, W, size, margin)``; the cache is
+        dropped as soon as a frame of a different shape arrives, so a resized
+        capture box rebuilds it once and stale entries never accumulate.
+
+        Args:
+            h: Frame height, in pixels.
+            w: Frame width, in pixels.
+            size: Side length to resize squares to; defaults to ``size``.
+
+        Returns:
+            The ``_SquareGeometry`` for that frame shape.
+        """
+        key = (h, w, self.size if size is None else size, self.margin)
+        geometry = self._geometries.get(key)
+        if geometry is None:
+            if any(k[:2] != (h, w) for k in self._geometries):
+                self._geometries.clear()
+            geometry = self._geometries[key] = _SquareGeometry(*key)
+        return geometry
 
     def feature(self, patch):
         """Reduce a square to a ``(shape, mean)`` feature.
@@ -98,12 +721,76 @@ class NumpyImageBackend(ImageBackend):
         arr = np.asarray(patch, dtype=np.float64)
         if arr.ndim == 3:
             arr = arr[..., :3].mean(axis=2)
-        arr = _resize_nearest(arr, self.size)
-        vec = arr.ravel()
-        centered = vec - vec.mean()
-        norm = np.linalg.norm(centered)
-        shape = centered / norm if norm else centered
-        return shape, vec.mean() / 255.0
+        if self.resample == "area":
+            arr = _resize_area(arr, self.size)
+        else:
+            arr = _resize_nearest(arr, self.size)
+        shapes, means = _normalise(arr.reshape(1, -1), self._dtype)
+        return shapes[0], float(means[0])
+
+    def coarsen(self, feature, size):
+        """Reduce a feature to what ``features_all`` extracts at ``size``.
+
+        The shape vector is area-averaged down to ``size`` x ``size`` and
+        normalised again; the mean is unchanged. For ``"nearest"``
+        resampling this only approximates sampling the square at ``size``
+        directly, which is close enough to rank labels by.
+
+        Args:
+            feature: A ``(shape, mean)`` tuple from ``feature``.
+            size: Side length of the coarse feature.
+
+        Returns:
+            A ``(shape, mean)`` tuple with a ``size * size`` shape vector.
+        """
+        import numpy as np
+
+        shape, mean = feature
+        side = int(round(len(shape) ** 0.5))
+        arr = np.asarray(shape, dtype=np.float64).reshape(side, side)
+        shapes, _ = _normalise(_resize_area(arr, size).reshape(1, -1),
+                               self._dtype)
+        return shapes[0], mean
+
+    def fit_projection(self, features, components):
+        """Learn the subspace that best keeps ``features``' shape vectors.
+
+        The basis is the top right singular vectors of the stacked shape
+        vectors, not centred first: dot products, which matching relies on,
+        are kept exactly for vectors in the subspace.
+
+        Args:
+            features: A ``(shapes, means)`` tuple of stacked features, as
+                ``features_all`` returns.
+            components: Number of basis vectors (at most the number of
+                features).
+
+        Returns:
+            A ``(size*size, components)`` array with orthonormal columns,
+            in the configured float precision.
+        """
+        import numpy as np
+
+        shapes, _ = features
+        _, _, vt = np.linalg.svd(np.asarray(shapes, dtype=np.float64),
+                                 full_matrices=False)
+        return np.ascontiguousarray(vt[:components].T, dtype=self._dtype)
+
+    def project(self, features, basis):
+        """Express features in a ``fit_projection`` basis.
+
+        Args:
+            features: A ``(shape, mean)`` feature, or a ``(shapes, means)``
+                tuple of stacked ones.
+            basis: A basis from ``fit_projection``.
+
+        Returns:
+            The same kind of tuple, with shape vectors of ``components``
+            coordinates and means unchanged. ``similarity`` and
+            ``similarity_matrix`` accept projected features like any others.
+        """
+        shapes, means = features
+        return shapes @ basis, means
 
     def similarity(self, feature_a, feature_b):
         """Score two features by shape correlation plus brightness closeness.
@@ -123,6 +810,60 @@ class NumpyImageBackend(ImageBackend):
         corr = float(np.dot(shape_a, shape_b))
         return corr + self.brightness_weight * (1.0 - abs(mean_a - mean_b))
 
+    def stack(self, features):
+        """Stack features into a contiguous bank for ``similarity_matrix``.
+
+        Args:
+            features: A sequence of ``(shape, mean)`` tuples from ``feature``.
+
+        Returns:
+            A ``(shapes, means, scales)`` tuple: a ``(K, size*size)``
+            C-contiguous array of shape vectors in the configured precision,
+            a ``(K,)`` array of means, and ``None``. For ``"int8"``
+            precision the shapes are quantized here, once, and kept
+            transposed and widened for the integer matrix multiply, as a
+            ``(size*size, K)`` int32 array, with ``(K,)`` per-template
+            dequantization scales in place of ``None``.
+        """
+        import numpy as np
+
+        shapes = np.ascontiguousarray([shape for shape, _ in features],
+                                      dtype=self._dtype)
+        means = np.array([mean for _, mean in features], dtype=np.float64)
+        if self.precision == "int8":
+            shapes, scales = _quantize(shapes)
+            return (np.ascontiguousarray(shapes.T, dtype=np.int32), means,
+                    scales)
+        return shapes, means, None
+
+    def similarity_matrix(self, features, bank):
+        """Score many features against a stacked bank in one matrix multiply.
+
+        Args:
+            features: A ``(shapes, means)`` tuple of ``(N, size*size)`` and
+                ``(N,)`` arrays, as returned by ``features_all``.
+            bank: A ``(shapes, means, scales)`` bank from ``stack``.
+
+        Returns:
+            An ``(N, K)`` array whose ``[i, j]`` entry equals
+            ``similarity(features[i], bank[j])`` -- up to rounding for
+            ``"float32"`` precision, and quantization error for ``"int8"``,
+            where the features are quantized too and correlated with integer
+            dot products rescaled by both scale factors.
+        """
+        import numpy as np
+
+        shapes, means = features
+        bank_shapes, bank_means, bank_scales = bank
+        if bank_scales is None:
+            corr = shapes @ bank_shapes.T
+        else:
+            q, scales = _quantize(shapes)
+            dots = q.astype(np.int32) @ bank_shapes
+            corr = dots * scales[:, None] * bank_scales[None, :]
+        closeness = 1.0 - np.abs(means[:, None] - bank_means[None, :])
+        return corr + self.brightness_weight * closeness
+
     def recolor(self, patch, from_empty, to_empty):
         """Repaint background pixels from one empty colour to another.
 
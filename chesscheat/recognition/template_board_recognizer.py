@@ -1,8 +1,47 @@
 """The ``TemplateBoardRecognizer`` board recognizer."""
 
+import statistics
+from array import array
+from collections import namedtuple
+
 from chesscheat import board
 from chesscheat.interfaces import BoardRecognizer
 
+# Score given to a label that has no template on a square's colour; below any
+# similarity a backend returns, so it never wins and sums stay finite.
+MISSING_SCORE = -2.0
+
+# Where between the calibration frame's flattest empty square and least flat
+# piece square (by fingerprint spread) the occupancy test's limit is drawn.
+_FLAT_SPLIT = 0.25
+
+
+class ScoredBoard(namedtuple("ScoredBoard", "board labels best runner_up "
+                                            "margin scores")):
+    """A board reading with per-square match scores.
+
+    Every per-square field is indexed by square in a1..h8 order
+    (``board.square_index``), and label indices follow ``board.LABELS``.
+
+    Attributes:
+        board: The ``board.CompactBoard`` ``read`` would return.
+        labels: 64-character string of the best label per square.
+        best: ``array('d')`` of the best label's score per square.
+        runner_up: 64-character string of the second-best label per square.
+        margin: ``array('d')`` of best minus runner-up score per square.
+        scores: Flat ``array('d')`` of every label's score per square, row
+            major: square ``sq``'s score for ``board.LABELS[k]`` is at
+            ``sq * len(board.LABELS) + k`` (``MISSING_SCORE`` for a label
+            with no template on that colour, or for every piece on a square
+            the occupancy test found empty).
+    """
+
+    __slots__ = ()
+
+    def score(self, square, label):
+        """Return the score of ``label`` on square index ``square``."""
+        return self.scores[square * len(board.LABELS) + board.LABELS.index(label)]
+
 
 class TemplateBoardRecognizer(BoardRecognizer):
     """Recognise a board by matching squares against calibrated templates.
@@ -23,23 +62,183 @@ class TemplateBoardRecognizer(BoardRecognizer):
     from the calibration image (repainting the background via the backend's
     ``recolor``), so every piece can be recognised on either colour.
 
+    When the backend offers the batched ``features_all``, ``stack`` and
+    ``similarity_matrix`` (as ``NumpyImageBackend`` does), each colour's
+    templates are stacked into one bank at calibration and ``read`` scores
+    all squares of that colour with a single matrix multiply; otherwise it
+    crops, reduces and compares square by square. If the backend can also
+    ``fingerprints`` a frame, only squares whose fingerprint ``changed`` since
+    they were last classified are re-extracted and re-matched; the rest keep
+    their previous labels (and scores).
+
+    ``read_scored`` returns the same reading together with each square's best
+    and runner-up scores; on the batched path these fall out of the same
+    similarity matrices ``read`` computes.
+
+    With a ``coarse_size`` (and a backend that can ``coarsen``), the batched
+    path is a two-level pyramid. Every square to classify is first matched
+    at ``coarse_size`` x ``coarse_size`` against templates reduced to that
+    size, which is far cheaper to extract; only squares whose coarse margin
+    is low are extracted and matched again at full size. "Low" is per
+    label: below ``escalate_ratio`` of the median coarse margin of that
+    label on the frame the templates were learned on, since an empty square,
+    scored on brightness alone, never wins by as much as a piece. Labels
+    that frame did not show are always escalated. The scores of squares
+    not escalated are coarse ones.
+
+    With ``occupancy`` (and a backend that ``fingerprints`` frames), the
+    batched path starts with an empty-or-occupied test of all 64 squares
+    from their fingerprints' mean and spread, which change tracking
+    computes anyway. A square is empty when it is flat (spread below a
+    limit learned per square colour, a quarter of the way from the flattest
+    empty to the least flat piece square on the calibration frame) and the
+    colour of that frame's empty squares (mean within
+    ``occupancy_tolerance`` grey levels of theirs). Only the other squares
+    are matched against templates; an empty one is scored as a perfect
+    match of the empty template and ``MISSING_SCORE`` for every piece. If
+    a colour's empty and piece squares overlap in spread (a textured
+    board), the test is off for that colour.
+
+    With ``components`` (and a backend that can ``fit_projection``), full
+    size matching runs in a subspace of that many principal components,
+    learned from the templates and the squares of the frame they were
+    learned on: each frame's features are projected with one matrix
+    multiply and scored against projected templates. With
+    ``project_fallback``, squares whose projected margin is low (per label,
+    as for the coarse pass) are scored again in full dimension, from the
+    features already extracted.
+
+    A calibration can be kept and reused: ``snapshot`` returns the templates
+    with what they depend on, and ``restore`` installs them again instead
+    of calibrating (see ``NpzCalibrationStore``), provided they still fit
+    the board (see below).
+
+    Templates do not depend on the board's size on screen (a backend such as
+    ``NumpyImageBackend`` reduces every square to a fixed-size feature), so a
+    frame of a new size (the browser zoomed, the window resized) is read
+    with the same templates; only the backend's crop geometry is rebuilt.
+    That first frame is verified: its median piece-square margin is compared
+    with the one measured when the templates were learned, and if it falls
+    below ``verify_ratio`` of it the templates no longer fit and
+    ``needs_recalibration`` is raised. ``recalibrate`` then relearns them
+    from any known position (``LegalMoveFilter`` does so with the position
+    it is tracking), so even then no return to the start position is needed.
+    ``restore`` runs the same check against the margin saved with the
+    templates, so a calibration also carries over to a new board size.
+
     Attributes:
         backend: The ``ImageBackend`` used for cropping, matching and recolour.
         playing_white: Perspective captured at calibration time.
         templates: Dict mapping ``(label, is_light)`` to a feature.
+        board_theme: The calibration frame's ``theme``, or None.
+        board_fingerprint: The calibration frame's ``fingerprint``, or None.
+        track_changes: Whether to reclassify only changed squares.
+        reclassified: Number of squares classified by the last ``read``.
+        reads: Number of ``read`` calls since calibration.
+        reclassified_total: Squares classified over those reads.
+        verify_ratio: Fraction of ``calibrated_margin`` a resized frame's
+            median piece margin must keep for the templates to still fit.
+        calibrated_margin: Median piece-square margin of the frame the
+            templates were learned or restored on, or None.
+        resizes: Frame size changes seen since calibration.
+        needs_recalibration: True once a resized frame failed verification,
+            until the next ``calibrate``, ``restore`` or ``recalibrate``.
+        coarse_size: Side length of the coarse pyramid level, or None to
+            match at full size only.
+        escalate_ratio: Fraction of a label's calibration coarse margin
+            below which a square is matched again at full size.
+        escalated: Number of squares the last ``read`` matched at full size
+            after a coarse pass.
+        escalated_total: Squares escalated over the reads since calibration.
+        occupancy: Whether to rule out empty squares before matching.
+        occupancy_tolerance: Grey levels a flat square's mean may differ
+            from the calibration frame's empty squares by and still be empty.
+        matched: Number of squares the last ``read`` matched against
+            templates.
+        matched_total: Squares matched over the reads since calibration.
+        components: Number of principal components to match in, or None to
+            match in full dimension.
+        project_fallback: Whether to rescore low-margin squares in full
+            dimension after projected matching.
+        fallbacks: Number of squares the last ``read`` rescored in full
+            dimension after projected matching.
+        fallbacks_total: Squares rescored over the reads since calibration.
     """
 
-    def __init__(self, backend):
+    def __init__(self, backend, track_changes=True, verify_ratio=0.5,
+                 coarse_size=None, escalate_ratio=0.5, occupancy=False,
+                 occupancy_tolerance=12.0, components=None,
+                 project_fallback=True):
         """Initialise the recognizer.
 
         Args:
             backend: An ``ImageBackend`` implementation used to crop squares,
                 score template similarity and synthesise opposite-colour
                 templates.
+            track_changes: Reuse the previous labels of squares whose pixels
+                have not changed, when the backend supports fingerprints.
+            verify_ratio: Fraction of the calibration frame's median piece
+                margin a resized frame must keep for the templates to be
+                trusted.
+            coarse_size: Side length to match squares at first, escalating
+                low-margin squares to the backend's full size; None matches
+                at full size only.
+            escalate_ratio: Fraction of a label's median coarse margin on
+                the calibration frame below which a square is escalated.
+            occupancy: Rule out empty squares with a variance and mean test
+                before matching the rest, when the backend supports
+                fingerprints.
+            occupancy_tolerance: Grey levels a flat square's mean may differ
+                from the calibration frame's empty squares by and still
+                count as empty.
+            components: Number of principal components to match squares
+                in at full size, when the backend supports projections;
+                None matches in full dimension.
+            project_fallback: Rescore squares whose projected margin is low
+                in full dimension.
         """
         self.backend = backend
         self.playing_white = True
         self.templates = {}  # (label, is_light) -> feature
+        self.board_theme = None
+        self.board_fingerprint = None
+        self.track_changes = track_changes
+        self.reclassified = 0
+        self.reads = 0
+        self.reclassified_total = 0
+        self.verify_ratio = verify_ratio
+        self.calibrated_margin = None
+        self.resizes = 0
+        self.needs_recalibration = False
+        self.coarse_size = coarse_size
+        self.escalate_ratio = escalate_ratio
+        self.escalated = 0
+        self.escalated_total = 0
+        self.occupancy = occupancy
+        self.occupancy_tolerance = occupancy_tolerance
+        self.matched = 0
+        self.matched_total = 0
+        self.components = components
+        self.project_fallback = project_fallback
+        self.fallbacks = 0
+        self.fallbacks_total = 0
+        self._coords = []    # row * 8 + col -> (file_idx, rank)
+        self._lights = []    # row * 8 + col -> is_light
+        self._order = []     # square_index -> row * 8 + col
+        self._banks = {}     # is_light -> (labels, stacked templates, columns)
+        self._coarse_banks = {}  # the same, for coarsened templates
+        self._escalate_below = {}  # LABELS index -> coarse margin threshold
+        self._flat = None    # (spread limit, mean, mean tolerance) per cell
+        self._basis = None   # fit_projection basis, when projecting
+        self._projected_banks = {}  # banks of projected templates
+        self._fallback_below = {}  # LABELS index -> projected margin threshold
+        self._empty_rows = None  # (64, len(LABELS)) scores of empty cells
+        self._labels = [None] * 64  # row * 8 + col -> last label read
+        self._scores = None  # batched: (64, len(LABELS)) scores, screen order
+        self._top = None     # batched: (best, runner_up) LABELS indices
+        self._prints = None  # fingerprints as of each square's last read
+        self._frame_shape = None
+        self._size = None    # (H, W) of the last frame read
 
     def calibrate(self, image, playing_white):
         """Learn how each piece and empty square looks from the start position.
@@ -55,13 +254,55 @@ class TemplateBoardRecognizer(BoardRecognizer):
                 perspective, False for black's.
         """
         self.playing_white = playing_white
+        self.templates = self._learn(image, board.starting_board())
+        self.board_theme = self.theme(image)
+        self.board_fingerprint = self.fingerprint(image)
+        self._prepare()
+        self._settle(image)
+
+    def recalibrate(self, image, position):
+        """Relearn the templates from an image of a known position.
+
+        Like ``calibrate``, but from any position: every ``(label, square
+        colour)`` shown, and every piece-on-opposite-colour template that
+        can be synthesised from those, is relearned. Templates for pieces
+        not on the board (captured ones, say) are kept from before.
+
+        Args:
+            image: A board image, from the calibrated perspective.
+            position: The position ``image`` shows, a mapping from
+                ``(file_idx, rank)`` to a label (e.g. a
+                ``board.CompactBoard``).
+        """
+        templates = dict(self.templates)
+        templates.update(self._learn(image, position))
+        self.templates = templates
+        self.board_theme = self.theme(image)
+        self.board_fingerprint = self.fingerprint(image)
+        self._prepare()
+        self._settle(image)
 
+    def _learn(self, image, position):
+        """Learn the templates ``image`` shows, synthesising what it can.
+
+        Captures one template per ``(label, square colour)`` seen, then
+        synthesises each piece on the colour it was not seen on by
+        repainting the background to the other empty colour.
+
+        Args:
+            image: A board image.
+            position: The position it shows, a mapping from ``(file_idx,
+                rank)`` to a label.
+
+        Returns:
+            A dict mapping ``(label, is_light)`` to a feature.
+        """
         patches = {}   # (label, is_light) -> patch
         empties = {}   # is_light -> empty-square patch
         for row in range(8):
             for col in range(8):
-                file_rank = board.square_coord(row, col, playing_white)
-                label = board.start_label(*file_rank)
+                file_rank = board.square_coord(row, col, self.playing_white)
+                label = position[file_rank]
                 light = board.is_light(*file_rank)
                 patch = self.backend.get_square(image, row, col)
                 patches.setdefault((label, light), patch)
@@ -80,8 +321,245 @@ class TemplateBoardRecognizer(BoardRecognizer):
                 synthesised = self.backend.recolor(patch, empties[light],
                                                    empties[other])
                 templates[(label, other)] = self.backend.feature(synthesised)
+        return templates
 
-        self.templates = templates
+    def theme(self, image):
+        """Summarise how the board in ``image`` looks, whatever the position.
+
+        Args:
+            image: A board image.
+
+        Returns:
+            The backend's ``theme`` of the image (for ``NumpyImageBackend``,
+            the light and dark square colours), or None if the backend has
+            no ``theme``.
+        """
+        theme = getattr(self.backend, "theme", None)
+        return theme(image) if theme is not None else None
+
+    def fingerprint(self, image):
+        """Summarise the board theme and piece set in ``image``.
+
+        Args:
+            image: A board image.
+
+        Returns:
+            The backend's ``fingerprint`` of the image (a short vector), or
+            None if the backend has no ``fingerprint``.
+        """
+        fingerprint = getattr(self.backend, "fingerprint", None)
+        return fingerprint(image) if fingerprint is not None else None
+
+    def theme_changed(self, image, tolerance=12.0):
+        """Report whether ``image`` shows another theme than the calibration.
+
+        Args:
+            image: A board image.
+            tolerance: Largest per-value ``fingerprint`` difference, in grey
+                levels, for the theme to count as the same (as for
+                ``TemplateLibrary``).
+
+        Returns:
+            True if ``image``'s fingerprint differs from
+            ``board_fingerprint`` by more than ``tolerance`` anywhere;
+            False if they agree, or either is unknown.
+        """
+        if self.board_fingerprint is None:
+            return False
+        fingerprint = self.fingerprint(image)
+        if fingerprint is None or len(fingerprint) != len(
+                self.board_fingerprint):
+            return False
+        return any(abs(float(a) - float(b)) > tolerance
+                   for a, b in zip(fingerprint, self.board_fingerprint))
+
+    def snapshot(self):
+        """Return the calibration, for a later ``restore``.
+
+        Returns:
+            A dict with the ``templates``, the calibration frame's
+            ``theme`` and ``fingerprint``, the backend's ``params`` (None
+            for what the backend does not offer) and the ``calibrated_margin``
+            as ``margin``.
+        """
+        return {"templates": dict(self.templates), "theme": self.board_theme,
+                "fingerprint": self.board_fingerprint,
+                "backend": getattr(self.backend, "params", None),
+                "margin": self.calibrated_margin}
+
+    def restore(self, snapshot, image, playing_white):
+        """Install a calibration from ``snapshot`` instead of calibrating.
+
+        The caller is responsible for the snapshot suiting the board on
+        screen (same theme and backend settings). The board may be a
+        different size: if the snapshot has a ``margin``, ``image`` is
+        verified against it as a resized frame would be.
+
+        Args:
+            snapshot: A dict from ``snapshot``.
+            image: The current board image, in any position.
+            playing_white: True if the board is shown from white's
+                perspective, False for black's.
+
+        Returns:
+            True, unless ``image``'s median piece margin is below
+            ``verify_ratio`` of the snapshot's ``margin`` (the templates
+            do not fit it).
+        """
+        self.playing_white = playing_white
+        self.templates = dict(snapshot["templates"])
+        self.board_theme = snapshot["theme"]
+        self.board_fingerprint = snapshot.get("fingerprint")
+        self._prepare()
+        self._settle(image)
+        margin = snapshot.get("margin")
+        if margin is None:
+            return True
+        measured, self.calibrated_margin = self.calibrated_margin, margin
+        return measured >= self.verify_ratio * margin
+
+    def _prepare(self):
+        """Derive the square layout and template banks; forget past reads."""
+        playing_white = self.playing_white
+        self._coords = [board.square_coord(row, col, playing_white)
+                        for row in range(8) for col in range(8)]
+        self._lights = [board.is_light(*file_rank) for file_rank in self._coords]
+        self._order = sorted(range(64),
+                             key=lambda cell: board.square_index(*self._coords[cell]))
+        self._banks = self._build_banks()
+        self._coarse_banks = (self._build_banks(self.coarse_size)
+                              if self.coarse_size is not None else {})
+        self._escalate_below = {}
+        self._flat = self._empty_rows = None
+        self._basis = None
+        self._projected_banks = {}
+        self._fallback_below = {}
+        self._prints = self._scores = self._top = None
+        self.reclassified = self.reads = self.reclassified_total = 0
+        self.escalated = self.escalated_total = 0
+        self.matched = self.matched_total = 0
+        self.fallbacks = self.fallbacks_total = 0
+
+    @property
+    def escalated_fraction(self):
+        """Fraction of the squares classified that were escalated (0.0 if none)."""
+        if not self.reclassified_total:
+            return 0.0
+        return self.escalated_total / self.reclassified_total
+
+    @property
+    def matched_fraction(self):
+        """Fraction of the squares classified that were matched (1.0 if none).
+
+        Below 1.0 only when ``occupancy`` rules squares out; one minus it is
+        the reduction in squares matched against templates.
+        """
+        if not self.reclassified_total:
+            return 1.0
+        return self.matched_total / self.reclassified_total
+
+    @property
+    def fallback_fraction(self):
+        """Fraction of the squares classified rescored in full dimension."""
+        if not self.reclassified_total:
+            return 0.0
+        return self.fallbacks_total / self.reclassified_total
+
+    def _settle(self, image):
+        """Measure the verification baseline on the frame just learned from.
+
+        Args:
+            image: The frame the templates were learned or restored on.
+        """
+        self.calibrated_margin = _piece_margin(self._read_scored(image,
+                                                                 full=True))
+        if self.occupancy:
+            self._learn_occupancy(image)
+        if self.components is not None:
+            self._learn_projection(image)
+        if self._coarse_banks:
+            self._escalate_below = self._thresholds(
+                *self._coarse_pass(image, list(range(64))))
+        self._size = _frame_size(image)
+        self.resizes = 0
+        self.needs_recalibration = False
+        self._prints = self._scores = self._top = None
+        self.reclassified = self.reclassified_total = 0
+        self.escalated = self.escalated_total = 0
+        self.matched = self.matched_total = 0
+        self.fallbacks = self.fallbacks_total = 0
+
+    def _thresholds(self, best, margin):
+        """Set each label's escalation margin from a pass over a frame.
+
+        Args:
+            best: Per-square ``board.LABELS`` index of the best label.
+            margin: Per-square lead of the best label over the runner-up.
+
+        Returns:
+            A dict mapping each label index in ``best`` to
+            ``escalate_ratio`` times its median margin.
+        """
+        import numpy as np
+        return {label: self.escalate_ratio * float(np.median(margin[best == label]))
+                for label in set(best.tolist())}
+
+    def _learn_projection(self, image):
+        """Learn the principal components to match in from the frame just read.
+
+        Args:
+            image: The frame the templates were learned or restored on.
+        """
+        import numpy as np
+        if not all(hasattr(self.backend, name)
+                   for name in ("fit_projection", "project")) or not self._banks:
+            return
+        shapes, means = self.backend.features_all(image)
+        keys = list(self.templates)
+        shapes = np.concatenate(
+            [np.stack([self.templates[key][0] for key in keys]), shapes])
+        means = np.concatenate(
+            [[self.templates[key][1] for key in keys], means])
+        self._basis = self.backend.fit_projection((shapes, means),
+                                                  self.components)
+        self._projected_banks = self._build_banks(basis=self._basis)
+        self._score_full(image, list(range(64)))
+        self._fallback_below = self._thresholds(*self._rank(list(range(64))))
+
+    def _learn_occupancy(self, image):
+        """Learn the empty-square test from the frame just read.
+
+        Args:
+            image: The frame the templates were learned or restored on,
+                already classified (so ``_labels`` holds its reading).
+        """
+        import numpy as np
+        fingerprints = getattr(self.backend, "fingerprints", None)
+        if fingerprints is None or not self._banks:
+            return
+        prints = fingerprints(image)
+        means, spreads = prints.mean(axis=1), prints.std(axis=1)
+        empty = np.array([label == "." for label in self._labels])
+        lights = np.array(self._lights)
+        limit = np.full(64, -np.inf)
+        centre = np.zeros(64)
+        tolerance = np.zeros(64)
+        rows = np.full((64, len(board.LABELS)), MISSING_SCORE)
+        for light in (True, False):
+            template = self.templates.get((".", light))
+            ours = lights == light
+            flat, busy = spreads[ours & empty], spreads[ours & ~empty]
+            if (template is None or not flat.size or not busy.size
+                    or busy.min() <= flat.max()):
+                continue
+            mean = float(np.median(means[ours & empty]))
+            limit[ours] = flat.max() + _FLAT_SPLIT * (busy.min() - flat.max())
+            centre[ours] = mean
+            tolerance[ours] = (np.abs(means[ours & empty] - mean).max()
+                               + self.occupancy_tolerance)
+            rows[ours, 0] = self.backend.similarity(template, template)
+        self._flat = (limit, centre, tolerance)
+        self._empty_rows = rows
 
     def read(self, image):
         """Classify every square against same-colour templates.
@@ -90,20 +568,399 @@ class TemplateBoardRecognizer(BoardRecognizer):
             image: A board image to recognise.
 
         Returns:
-            A ``{(file_idx, rank): label}`` map of all 64 squares.
+            A ``board.CompactBoard`` of all 64 squares.
+        """
+        self.reads += 1
+        if self._resized(image):
+            return self._verify(image).board
+        if self._banks:
+            labels = self._classify_batched(image)
+        else:
+            labels = [board.LABELS[max(range(len(row)), key=row.__getitem__)]
+                      for row in self._score_each(image)]
+        return board.CompactBoard("".join(labels[cell] for cell in self._order))
+
+    def read_scored(self, image):
+        """Classify every square and report how confident each call was.
+
+        Args:
+            image: A board image to recognise.
+
+        Returns:
+            A ``ScoredBoard`` for the image.
         """
-        def classify(row, col):
-            file_rank = board.square_coord(row, col, self.playing_white)
-            light = board.is_light(*file_rank)
-            feat = self.backend.feature(self.backend.get_square(image, row, col))
-            candidates = ((label, feature)
-                          for (label, tint), feature in self.templates.items()
-                          if tint == light)
-            label, _ = max(
-                candidates,
-                key=lambda lf: self.backend.similarity(feat, lf[1]),
-            )
-            return file_rank, label
+        self.reads += 1
+        if self._resized(image):
+            return self._verify(image)
+        return self._read_scored(image)
+
+    def _read_scored(self, image, full=False):
+        """``read_scored`` without counting the read or checking its size.
 
-        return dict(classify(row, col)
-                    for row in range(8) for col in range(8))
+        Args:
+            image: A board image to recognise.
+            full: Match every square at full size, skipping the coarse pass.
+        """
+        if self._banks:
+            self._classify_batched(image, full)
+            order = self._order
+            best, runner_up = self._top
+            return self._scored(array("d", self._scores[order].tobytes()),
+                                best[order].tolist(), runner_up[order].tolist())
+        rows = self._score_each(image)
+        scores, best, runner_up = array("d"), [], []
+        for cell in self._order:
+            row = rows[cell]
+            first, second = sorted(range(len(row)), key=row.__getitem__)[:-3:-1]
+            scores.extend(row)
+            best.append(first)
+            runner_up.append(second)
+        return self._scored(scores, best, runner_up)
+
+    def _resized(self, image):
+        """Report whether ``image`` differs in size from the last frame read.
+
+        Args:
+            image: A board image about to be read.
+
+        Returns:
+            True if the board has changed size since a calibrated read.
+        """
+        size = _frame_size(image)
+        if size == self._size:
+            return False
+        resized = self._size is not None and self.calibrated_margin is not None
+        self._size = size
+        return resized
+
+    def _verify(self, image):
+        """Read a resized frame and check the templates still fit it.
+
+        Every square is reclassified at full size (the backend rebuilds its
+        crop geometry for the new size), and ``needs_recalibration`` is
+        raised if the median piece margin has dropped below ``verify_ratio``
+        of ``calibrated_margin``.
+
+        Args:
+            image: A board image of a new size.
+
+        Returns:
+            A ``ScoredBoard`` for the image.
+        """
+        self.resizes += 1
+        scored = self._read_scored(image, full=True)
+        if (_piece_margin(scored)
+                < self.verify_ratio * self.calibrated_margin):
+            self.needs_recalibration = True
+        return scored
+
+    def _scored(self, scores, best, runner_up):
+        """Assemble a ``ScoredBoard`` from square-ordered scores.
+
+        Args:
+            scores: Flat ``array('d')`` of label scores, as in ``ScoredBoard``.
+            best: Per-square ``board.LABELS`` index of the best label.
+            runner_up: Per-square ``board.LABELS`` index of the second best.
+
+        Returns:
+            A ``ScoredBoard``.
+        """
+        n = len(board.LABELS)
+        top = array("d", (scores[sq * n + k] for sq, k in enumerate(best)))
+        margin = array("d", (score - scores[sq * n + k] for sq, (score, k)
+                             in enumerate(zip(top, runner_up))))
+        labels = "".join(board.LABELS[k] for k in best)
+        return ScoredBoard(board=board.CompactBoard(labels), labels=labels, best=top,
+                           runner_up="".join(board.LABELS[k] for k in runner_up),
+                           margin=margin, scores=scores)
+
+    def _score_each(self, image):
+        """Score all 64 squares against every label, square by square.
+
+        Args:
+            image: A board image to recognise.
+
+        Returns:
+            A list of 64 score lists in screen row-major order, each indexed
+            like ``board.LABELS``.
+        """
+        self.reclassified = 64
+        self.reclassified_total += 64
+        features = self._features(image)
+        rows = []
+        for cell, feat in enumerate(features):
+            light = self._lights[cell]
+            rows.append([
+                self.backend.similarity(feat, self.templates[(label, light)])
+                if (label, light) in self.templates else MISSING_SCORE
+                for label in board.LABELS])
+        return rows
+
+    def _build_banks(self, size=None, basis=None):
+        """Stack each colour's templates into a bank for batched scoring.
+
+        Args:
+            size: Side length to ``coarsen`` the templates to first, or None
+                for the templates as learned.
+            basis: A ``fit_projection`` basis to ``project`` the templates
+                into, or None.
+
+        Returns:
+            A dict mapping ``is_light`` to ``(labels, bank, columns)``: the
+            template labels in bank order, the backend's stacked templates and
+            each template's ``board.LABELS`` index. Empty when the backend has
+            no batched API (or, with a ``size``, cannot ``coarsen``).
+        """
+        names = ("features_all", "stack", "similarity_matrix")
+        if size is not None:
+            names += ("coarsen",)
+        if not all(hasattr(self.backend, name) for name in names):
+            return {}
+        banks = {}
+        for light in (True, False):
+            keys = [key for key in self.templates if key[1] == light]
+            if not keys:
+                continue
+            features = [self.templates[key] for key in keys]
+            if size is not None:
+                features = [self.backend.coarsen(feature, size)
+                            for feature in features]
+            if basis is not None:
+                features = [self.backend.project(feature, basis)
+                            for feature in features]
+            bank = self.backend.stack(features)
+            labels = tuple(label for label, _ in keys)
+            banks[light] = (labels, bank,
+                            [board.LABELS.index(label) for label in labels])
+        return banks
+
+    def _classify_batched(self, image, full=False):
+        """Label the squares with one similarity matrix per square colour.
+
+        Only squares reported by ``_dirty_cells`` are extracted and scored;
+        the others keep the labels and scores they were last given. With
+        the occupancy test learned, squares it finds empty are not matched
+        at all. With coarse banks, they are scored coarsely first and only
+        those with a low margin are scored again at full size. Scores land in
+        ``_scores`` (every label, screen order) and the best and runner-up
+        label indices in ``_top``.
+
+        Args:
+            image: A board image to recognise.
+            full: Match every square to classify at full size, with no
+                occupancy test or coarse pass.
+
+        Returns:
+            A list of 64 labels in screen row-major order.
+        """
+        import numpy as np
+        cells, prints = self._dirty_cells(image)
+        self.reclassified = len(cells)
+        self.reclassified_total += len(cells)
+        if self._scores is None:
+            self._scores = np.full((64, len(board.LABELS)), MISSING_SCORE)
+            self._top = (np.zeros(64, dtype=np.intp),
+                         np.zeros(64, dtype=np.intp))
+        self.escalated = 0
+        self.matched = 0
+        self.fallbacks = 0
+        if not cells:
+            return list(self._labels)
+        occupied = cells
+        if self._flat is not None and not full:
+            if prints is None:
+                prints = self.backend.fingerprints(image)
+            limit, centre, tolerance = self._flat
+            flat = ((prints.std(axis=1) < limit)
+                    & (np.abs(prints.mean(axis=1) - centre) <= tolerance))
+            occupied = [cell for cell in cells if not flat[cell]]
+            empty = [cell for cell in cells if flat[cell]]
+            if empty:
+                self._scores[empty] = self._empty_rows[empty]
+        self.matched = len(occupied)
+        self.matched_total += len(occupied)
+        fine = occupied
+        if self._coarse_banks and not full and occupied:
+            best, margin = self._coarse_pass(image, occupied)
+            below = self._escalate_below
+            fine = [cell for cell, label, lead
+                    in zip(occupied, best.tolist(), margin.tolist())
+                    if lead < below.get(label, np.inf)]
+            self.escalated = len(fine)
+            self.escalated_total += len(fine)
+        if fine:
+            self._score_full(image, fine, full)
+        scores = self._scores[cells]   # a copy: safe to mask
+        best = scores.argmax(axis=1)
+        scores[range(len(cells)), best] = -np.inf
+        self._top[0][cells], self._top[1][cells] = best, scores.argmax(axis=1)
+        for cell, label in zip(cells, best.tolist()):
+            self._labels[cell] = board.LABELS[label]
+        return list(self._labels)
+
+    def _score_cells(self, image, cells, banks, size=None):
+        """Score ``cells`` against ``banks`` into ``_scores``.
+
+        Args:
+            image: A board image to recognise.
+            cells: Screen cells (``row * 8 + col``) to score.
+            banks: Banks from ``_build_banks``.
+            size: The side length ``banks`` were built at, or None.
+        """
+        features = (self.backend.features_all(image, cells) if size is None
+                    else self.backend.features_all(image, cells, size))
+        self._score_features(cells, features, banks)
+
+    def _score_features(self, cells, features, banks):
+        """Score the extracted features of ``cells`` into ``_scores``.
+
+        Args:
+            cells: Screen cells (``row * 8 + col``) the features are of.
+            features: Their stacked ``(shapes, means)``.
+            banks: Banks from ``_build_banks`` to score against.
+        """
+        import numpy as np
+        shapes, means = features
+        for light, (_, bank, columns) in banks.items():
+            rows = [i for i, cell in enumerate(cells)
+                    if self._lights[cell] == light]
+            if rows:
+                self._scores[np.ix_([cells[i] for i in rows], columns)] = (
+                    self.backend.similarity_matrix((shapes[rows], means[rows]),
+                                                   bank))
+
+    def _coarse_pass(self, image, cells):
+        """Score ``cells`` at ``coarse_size`` and rank their labels.
+
+        Args:
+            image: A board image to recognise.
+            cells: Screen cells (``row * 8 + col``) to score.
+
+        Returns:
+            ``(best, margin)`` arrays, one entry per cell: the best label's
+            ``board.LABELS`` index and its lead over the runner-up.
+        """
+        self._score_cells(image, cells, self._coarse_banks, self.coarse_size)
+        return self._rank(cells)
+
+    def _score_full(self, image, cells, full=False):
+        """Score ``cells`` at full size, in the projection if there is one.
+
+        Squares whose projected margin is below their label's threshold
+        are rescored in full dimension when ``project_fallback`` is set.
+
+        Args:
+            image: A board image to recognise.
+            cells: Screen cells (``row * 8 + col``) to score.
+            full: Score in full dimension, whatever the projection.
+        """
+        if self._basis is None or full:
+            self._score_cells(image, cells, self._banks)
+            return
+        shapes, means = self.backend.features_all(image, cells)
+        self._score_features(cells,
+                             self.backend.project((shapes, means), self._basis),
+                             self._projected_banks)
+        if not self.project_fallback or not self._fallback_below:
+            return
+        below = self._fallback_below
+        best, margin = self._rank(cells)
+        low = [i for i, (label, lead)
+               in enumerate(zip(best.tolist(), margin.tolist()))
+               if lead < below.get(label, float("inf"))]
+        self.fallbacks += len(low)
+        self.fallbacks_total += len(low)
+        if low:
+            self._score_features([cells[i] for i in low],
+                                 (shapes[low], means[low]), self._banks)
+
+    def _rank(self, cells):
+        """Rank the labels of ``cells`` by their current ``_scores``.
+
+        Args:
+            cells: Screen cells (``row * 8 + col``).
+
+        Returns:
+            ``(best, margin)`` arrays, one entry per cell: the best label's
+            ``board.LABELS`` index and its lead over the runner-up.
+        """
+        import numpy as np
+        scores = self._scores[cells]
+        best = scores.argmax(axis=1)
+        rows = np.arange(len(cells))
+        top = scores[rows, best]
+        scores[rows, best] = -np.inf
+        return best, top - scores.max(axis=1)
+
+    def _dirty_cells(self, image):
+        """List the screen cells that need classifying in this frame.
+
+        Every cell is dirty on the first read after calibration, when the
+        frame changes shape, or when change tracking is off or unsupported.
+        Otherwise a cell is dirty when its fingerprint has drifted from the
+        one taken when it was last classified; comparing against that
+        reference (not the previous frame) means slow, sub-threshold changes
+        still accumulate into a reclassification.
+
+        Args:
+            image: A board image to recognise.
+
+        Returns:
+            ``(cells, prints)``: a list of screen cells (``row * 8 + col``)
+            to classify, and the frame's fingerprints (None when change
+            tracking did not take them).
+        """
+        fingerprints = getattr(self.backend, "fingerprints", None)
+        if not self.track_changes or fingerprints is None:
+            return list(range(64)), None
+        prints = fingerprints(image)
+        shape = getattr(image, "shape", None)
+        if self._prints is None or shape != self._frame_shape:
+            self._prints, self._frame_shape = prints.copy(), shape
+            return list(range(64)), prints
+        cells = self.backend.changed(self._prints, prints)
+        if cells:
+            self._prints[cells] = prints[cells]
+        return cells, prints
+
+    def _features(self, image):
+        """Extract the features of all 64 squares in screen row-major order.
+
+        Args:
+            image: A board image to recognise.
+
+        Returns:
+            A list of 64 backend features, index ``row * 8 + col``.
+        """
+        features_all = getattr(self.backend, "features_all", None)
+        if features_all is not None:
+            shapes, means = features_all(image)
+            return list(zip(shapes, means))
+        return [self.backend.feature(self.backend.get_square(image, row, col))
+                for row in range(8) for col in range(8)]
+
+
+def _frame_size(image):
+    """Return the ``(H, W)`` of an image array or list of rows."""
+    shape = getattr(image, "shape", None)
+    if shape is not None:
+        return tuple(shape[:2])
+    return (len(image), len(image[0]) if image else 0)
+
+
+def _piece_margin(scored):
+    """Return the median margin of the squares read as pieces.
+
+    Empty squares are left out: a flat square is scored on brightness alone
+    and never wins by much, whatever the fit of the templates. A reading
+    with no pieces falls back to every square.
+
+    Args:
+        scored: A ``ScoredBoard``.
+
+    Returns:
+        The median margin, as a float.
+    """
+    margins = [margin for label, margin in zip(scored.labels, scored.margin)
+               if label != "."]
+    return float(statistics.median(margins or scored.margin))
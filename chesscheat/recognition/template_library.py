@@ -0,0 +1,241 @@
+"""The ``TemplateLibrary`` calibration store."""
+
+import glob
+import hashlib
+import itertools
+import json
+import os
+from collections import namedtuple
+
+from chesscheat.interfaces import CalibrationStore
+from chesscheat.recognition.npz_calibration_store import NpzCalibrationStore
+
+# One calibration in a ``TemplateLibrary``.
+_Entry = namedtuple("_Entry", "fingerprint snapshot frame_shape path")
+
+
+class TemplateLibrary(CalibrationStore):
+    """Calibrations for many board themes and piece sets, chosen per frame.
+
+    Every calibration saved is filed under its calibration frame's
+    ``fingerprint`` (see ``NumpyImageBackend.fingerprint``), indexed by four
+    grey levels: the light squares', the dark squares', and the light and
+    dark pieces' fill tones, each quantized to ``step``. ``load``
+    fingerprints the current frame and visits only the index cells within
+    ``tolerance`` of it on those four (at most 16 dictionary lookups,
+    usually one), so picking among hundreds of calibrations costs the same
+    as among two. Of the calibrations found there, the nearest one whose
+    whole fingerprint is within ``tolerance`` everywhere, made with the same
+    backend settings, is restored; one made at the same frame size is
+    preferred, and one made at another size is only taken if it saved a
+    ``margin`` for ``restore`` to verify the templates against.
+
+    Saving a calibration that matches an existing one that way replaces it.
+
+    With a ``directory``, each calibration is also kept there as an
+    ``NpzCalibrationStore`` file, and the library is filled from the files
+    when created, so every theme ever calibrated is recognised on later runs.
+
+    Attributes:
+        directory: Where calibrations are kept, or None for memory only.
+        tolerance: Largest per-value fingerprint difference, in grey levels,
+            for a calibration to match.
+        step: Index cell size, in grey levels; at least ``2 * tolerance``.
+        lookups: Number of ``load`` calls.
+        hits: Loads that restored a calibration.
+        last_miss: Why the last ``load`` did not restore (``"missing"``,
+            ``"size"`` if a calibration from another frame size did not fit,
+            or ``"position"``), or None after a restore.
+    """
+
+    def __init__(self, directory=None, tolerance=12.0, step=48.0):
+        """Initialise the library, reading any calibrations in ``directory``.
+
+        Args:
+            directory: Where calibrations are kept, or None for memory only.
+            tolerance: Largest per-value fingerprint difference, in grey
+                levels, for a calibration to match.
+            step: Index cell size, in grey levels.
+
+        Raises:
+            ValueError: If ``step`` is less than ``2 * tolerance``.
+        """
+        if step < 2 * tolerance:
+            raise ValueError(f"step {step} must be at least twice the "
+                             f"tolerance {tolerance}")
+        self.directory = directory
+        self.tolerance = tolerance
+        self.step = step
+        self.lookups = 0
+        self.hits = 0
+        self.last_miss = None
+        self._index = {}   # quantized key -> [_Entry]
+        if directory is not None:
+            for path in sorted(glob.glob(os.path.join(directory, "*.npz"))):
+                self._read(path)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._index.values())
+
+    def load(self, recognizer, image, playing_white, box):
+        """Restore the calibration matching the board in ``image``, if any.
+
+        Args:
+            recognizer: A recognizer with ``fingerprint``, ``snapshot`` and
+                ``restore``.
+            image: The current board image, in any position.
+            playing_white: True if white is at the bottom of the image.
+            box: The capture box, an ``(x1, y1, x2, y2)`` tuple (unused: the
+                frame size is compared instead).
+
+        Returns:
+            True if a calibration was found and restored.
+        """
+        import numpy as np
+        self.lookups += 1
+        fingerprint = recognizer.fingerprint(image)
+        entry = None
+        if fingerprint is not None:
+            entry = self._match(fingerprint, recognizer.snapshot()["backend"],
+                                np.asarray(image).shape[:2])
+        if entry is None:
+            self.last_miss = "missing"
+            return False
+        if not recognizer.restore(entry.snapshot, image, playing_white):
+            self.last_miss = ("position" if entry.frame_shape
+                              == tuple(np.asarray(image).shape[:2]) else "size")
+            return False
+        self.hits += 1
+        self.last_miss = None
+        return True
+
+    def save(self, recognizer, image, box):
+        """Add ``recognizer``'s calibration, replacing any it matches.
+
+        Args:
+            recognizer: A calibrated recognizer with ``snapshot``.
+            image: The image it was calibrated from.
+            box: The capture box, an ``(x1, y1, x2, y2)`` tuple.
+
+        Raises:
+            ValueError: If the recognizer's backend has no ``fingerprint``.
+        """
+        import numpy as np
+        snapshot = recognizer.snapshot()
+        fingerprint = snapshot.get("fingerprint")
+        if fingerprint is None:
+            raise ValueError("a TemplateLibrary needs a backend with "
+                             "fingerprint")
+        frame_shape = tuple(np.asarray(image).shape[:2])
+        stale = self._match(fingerprint, snapshot["backend"], frame_shape)
+        if stale is not None:
+            self._remove(stale)
+        path = None
+        if self.directory is not None:
+            path = os.path.join(self.directory,
+                                _file_name(fingerprint, snapshot, frame_shape))
+            NpzCalibrationStore(path).save(recognizer, image, box)
+        self._add(_Entry(np.asarray(fingerprint, dtype=np.float32), snapshot,
+                         frame_shape, path))
+
+    def invalidate(self):
+        """Forget every calibration, deleting the directory's files."""
+        for entries in list(self._index.values()):
+            for entry in list(entries):
+                self._remove(entry)
+
+    def _read(self, path):
+        """Add the calibration saved at ``path``, if it is a usable one.
+
+        Args:
+            path: An ``NpzCalibrationStore`` file.
+        """
+        import numpy as np
+        store = NpzCalibrationStore(path)
+        try:
+            saved = store.read()
+        except ValueError:
+            return
+        if (saved is None or saved["version"] != store.FORMAT_VERSION
+                or saved["snapshot"]["fingerprint"] is None):
+            return
+        snapshot = saved["snapshot"]
+        self._add(_Entry(np.asarray(snapshot["fingerprint"], dtype=np.float32),
+                         snapshot, saved["frame_shape"], path))
+
+    def _add(self, entry):
+        """File ``entry`` under its index cell."""
+        key = tuple(int(level // self.step)
+                    for level in _levels(entry.fingerprint))
+        self._index.setdefault(key, []).append(entry)
+
+    def _remove(self, entry):
+        """Drop ``entry`` from the index, and its file if it has one."""
+        key = tuple(int(level // self.step)
+                    for level in _levels(entry.fingerprint))
+        entries = self._index[key]
+        entries.remove(entry)
+        if not entries:
+            del self._index[key]
+        if entry.path is not None:
+            NpzCalibrationStore(entry.path).invalidate()
+
+    def _match(self, fingerprint, backend, frame_shape):
+        """Return the nearest matching calibration, or None.
+
+        Args:
+            fingerprint: The board's ``fingerprint``.
+            backend: The backend ``params`` the calibration must share.
+            frame_shape: The ``(H, W)`` the calibration must share.
+
+        Returns:
+            The ``_Entry`` whose fingerprint is nearest ``fingerprint``
+            (largest difference smallest), if within ``tolerance``,
+            preferring those made at ``frame_shape``; else None. Entries
+            made at another size without a ``margin`` are skipped.
+        """
+        import numpy as np
+        fingerprint = np.asarray(fingerprint, dtype=np.float32)
+        frame_shape = tuple(frame_shape)
+        cells = [{int((level - self.tolerance) // self.step),
+                  int((level + self.tolerance) // self.step)}
+                 for level in _levels(fingerprint)]
+        best, best_rank = None, (True, self.tolerance)
+        for key in itertools.product(*cells):
+            for entry in self._index.get(key, ()):
+                resized = entry.frame_shape != frame_shape
+                if ((resized and entry.snapshot.get("margin") is None)
+                        or entry.fingerprint.shape != fingerprint.shape
+                        or entry.snapshot["backend"] != backend):
+                    continue
+                rank = (resized,
+                        float(np.abs(entry.fingerprint - fingerprint).max()))
+                if rank[1] <= self.tolerance and rank <= best_rank:
+                    best, best_rank = entry, rank
+        return best
+
+
+def _levels(fingerprint):
+    """Return the four grey levels a fingerprint is indexed by.
+
+    Args:
+        fingerprint: A ``NumpyImageBackend.fingerprint`` vector: the light
+            and dark square colours (``C`` channels each), then the light
+            and dark piece tones.
+
+    Returns:
+        ``(light square, dark square, light pieces, dark pieces)`` grey
+        levels.
+    """
+    channels = (len(fingerprint) - 2) // 2
+    return (float(fingerprint[:channels].mean()),
+            float(fingerprint[channels:2 * channels].mean()),
+            float(fingerprint[-2]), float(fingerprint[-1]))
+
+
+def _file_name(fingerprint, snapshot, frame_shape):
+    """Name a calibration's file after its theme, frame size and settings."""
+    settings = json.dumps(snapshot["backend"], sort_keys=True).encode()
+    levels = "-".join(str(round(level)) for level in _levels(fingerprint))
+    return (f"{levels}-{frame_shape[1]}x{frame_shape[0]}-"
+            f"{hashlib.sha1(settings).hexdigest()[:8]}.npz")
@@ -0,0 +1,600 @@
+"""Performance benchmarks over the committed fixture boards.
+
+Unlike the unit tests these make no pass/fail assertions: each benchmark
+prints a small report comparing implementation choices (timings and
+accuracy) so they can be weighed per deployment. Needs numpy and Pillow.
+Run from the repo root:
+
+    python3 tests/benchmarks.py              # every benchmark
+    python3 tests/benchmarks.py resample     # just the named ones
+
+(or ``./bench.sh``, which does the same inside the venv).
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+from chesscheat import board
+from chesscheat.recognition import (TemplateBoardRecognizer, NumpyImageBackend,
+                                    FrameChangeGate, TemplateLibrary)
+
+BOARDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "fixtures", "boards")
+PIECE_SETS = ["wikipedia", "alpha", "merida"]
+SEQUENCE = ["start", "e4", "c5", "nf3"]
+EXPECTED_FEN = {
+    "start": "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR",
+    "e4": "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR",
+    "c5": "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR",
+    "nf3": "rnbqkbnr/pp1ppppp/8/2p5/4P3/5N2/PPPP1PPP/RNBQKB1R",
+}
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    """Register ``func`` as a benchmark under its name."""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def load(piece_set, name, scale=1):
+    """Load a board fixture as an RGB numpy array, optionally upscaled.
+
+    Args:
+        piece_set: Name of the piece set directory.
+        name: Frame name without extension (e.g. ``'start'``).
+        scale: Integer upscale factor, to approximate large captures.
+
+    Returns:
+        An ``(H, W, 3)`` uint8 numpy array.
+    """
+    path = os.path.join(BOARDS_DIR, piece_set, f"{name}.png")
+    image = np.array(Image.open(path).convert("RGB"))
+    if scale != 1:
+        image = image.repeat(scale, axis=0).repeat(scale, axis=1)
+    return image
+
+
+def shifted(image, dy, dx, pad=4):
+    """Return ``image`` as seen through a capture box moved by ``(dy, dx)``.
+
+    Args:
+        image: An ``(H, W, ...)`` numpy board image.
+        dy: Vertical shift, in pixels (``|dy| <= pad``).
+        dx: Horizontal shift, in pixels (``|dx| <= pad``).
+        pad: Edge padding used to fill pixels shifted in from outside.
+
+    Returns:
+        A same-shaped array.
+    """
+    h, w = image.shape[:2]
+    widths = [(pad, pad), (pad, pad)] + [(0, 0)] * (image.ndim - 2)
+    padded = np.pad(image, widths, mode="edge")
+    return padded[pad + dy:pad + dy + h, pad + dx:pad + dx + w]
+
+
+def time_per_call(func, *args, repeat=20):
+    """Return the mean wall time of ``func(*args)``, in milliseconds."""
+    func(*args)  # warm caches
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def squares_correct(read, name):
+    """Count the squares of ``read`` that agree with fixture ``name``."""
+    expected = board.from_fen(EXPECTED_FEN[name])
+    return sum(read.get(sq, ".") == label for sq, label in expected.items())
+
+
+def _fen_to_map(fen):
+    """Expand a placement FEN into a full map, a square at a time.
+
+    The decoder this file used before ``board.from_fen``; kept as the
+    baseline of the ``fen`` benchmark.
+    """
+    result = {}
+    for rank, row in zip(range(8, 0, -1), fen.split("/")):
+        file_idx = 0
+        for char in row:
+            if char.isdigit():
+                for _ in range(int(char)):
+                    result[(file_idx, rank)] = "."
+                    file_idx += 1
+            else:
+                result[(file_idx, rank)] = char
+                file_idx += 1
+    return result
+
+
+@benchmark
+def resample():
+    """Nearest-neighbour vs area-averaged square downsampling.
+
+    Reports read latency on 3x-upscaled fixtures (about a 1536 px board) and
+    per-square accuracy when the capture box is shifted by up to 2 px.
+    """
+    shifts = [(dy, dx) for dy in (-2, -1, 0, 1, 2) for dx in (-2, -1, 0, 1, 2)]
+    print(f"{'set':<10} {'mode':<8} {'read ms':>8} {'shifted acc':>12}")
+    for piece_set in PIECE_SETS:
+        for mode in NumpyImageBackend.RESAMPLE_MODES:
+            recognizer = TemplateBoardRecognizer(
+                NumpyImageBackend(resample=mode), track_changes=False)
+            big = load(piece_set, "start", scale=3)
+            recognizer.calibrate(big, True)
+            ms = time_per_call(recognizer.read, load(piece_set, "nf3", 3))
+
+            recognizer.calibrate(load(piece_set, "start"), True)
+            correct = total = 0
+            for name in SEQUENCE:
+                image = load(piece_set, name)
+                for dy, dx in shifts:
+                    correct += squares_correct(
+                        recognizer.read(shifted(image, dy, dx)), name)
+                    total += 64
+            print(f"{piece_set:<10} {mode:<8} {ms:>8.2f} "
+                  f"{correct / total:>11.2%}")
+
+
+@benchmark
+def grayscale():
+    """Feature extraction from uint8 BGRA captures vs float64 frames.
+
+    ``capture.screenshot`` returns BGRA ``uint8``; the backend's integer fast
+    path gathers straight from that buffer, while any other input is first
+    converted to a float64 grayscale frame.
+    """
+    image = load("alpha", "nf3", scale=3)
+    alpha = np.full(image.shape[:2] + (1,), 255, dtype=np.uint8)
+    bgra = np.ascontiguousarray(np.concatenate([image[..., ::-1], alpha], 2))
+    print(f"{'mode':<8} {'uint8 ms':>9} {'float64 ms':>11} {'max |diff|':>11}")
+    for mode in NumpyImageBackend.RESAMPLE_MODES:
+        backend = NumpyImageBackend(resample=mode)
+        fast = time_per_call(backend.features_all, bgra)
+        slow = time_per_call(backend.features_all, bgra.astype(np.float64))
+        diff = np.abs(backend.features_all(bgra)[0]
+                      - backend.features_all(bgra.astype(np.float64))[0]).max()
+        print(f"{mode:<8} {fast:>9.2f} {slow:>11.2f} {diff:>11.1e}")
+
+
+@benchmark
+def precision():
+    """Accuracy vs speed of float64, float32 and int8 matching.
+
+    For each fixture piece set: squares read correctly over the opening
+    (including 1-2 px capture-box shifts), the mean best-vs-runner-up score
+    margin (headroom before a misread), the time of one colour's
+    ``similarity_matrix`` and of a whole read on a ~1536 px board.
+    """
+    shifts = [(0, 0), (1, 0), (0, 1), (-1, -1), (2, 2)]
+    print(f"{'set':<10} {'precision':<9} {'accuracy':>9} {'margin':>7} "
+          f"{'match us':>9} {'read ms':>8}")
+    for piece_set in PIECE_SETS:
+        for prec in NumpyImageBackend.PRECISIONS:
+            backend = NumpyImageBackend(precision=prec)
+            recognizer = TemplateBoardRecognizer(backend, track_changes=False)
+            recognizer.calibrate(load(piece_set, "start"), True)
+            colours = {light: [cell for cell in range(64)
+                               if recognizer._lights[cell] == light]
+                       for light in recognizer._banks}
+            correct = total = 0
+            margins = []
+            for name in SEQUENCE:
+                for dy, dx in shifts:
+                    image = shifted(load(piece_set, name), dy, dx)
+                    correct += squares_correct(recognizer.read(image), name)
+                    total += 64
+                shapes, means = backend.features_all(load(piece_set, name))
+                for light, (_, bank, _) in recognizer._banks.items():
+                    cells = colours[light]
+                    scores = np.sort(backend.similarity_matrix(
+                        (shapes[cells], means[cells]), bank), axis=1)
+                    margins.extend(scores[:, -1] - scores[:, -2])
+
+            _, bank, _ = recognizer._banks[True]
+            cells = colours[True]
+            shapes, means = backend.features_all(load(piece_set, "nf3"))
+            match = time_per_call(backend.similarity_matrix,
+                                  (shapes[cells], means[cells]), bank,
+                                  repeat=200) * 1000
+            recognizer.calibrate(load(piece_set, "start", scale=3), True)
+            read = time_per_call(recognizer.read, load(piece_set, "nf3", 3))
+            print(f"{piece_set:<10} {prec:<9} {correct / total:>9.2%} "
+                  f"{np.mean(margins):>7.3f} {match:>9.1f} {read:>8.2f}")
+
+
+@benchmark
+def dirty_squares():
+    """Full reclassification vs reclassifying only changed squares.
+
+    Replays the opening on a ~1536 px board with each position held for
+    several frames, as a polling loop sees it, and reports the mean read
+    latency and squares classified per frame with change tracking off and on.
+    """
+    hold = 5
+    frames = [load("alpha", name, scale=3) for name in SEQUENCE
+              for _ in range(hold)]
+    print(f"{'tracking':<9} {'read ms':>8} {'squares/frame':>14} {'correct':>8}")
+    for track in (False, True):
+        recognizer = TemplateBoardRecognizer(NumpyImageBackend(),
+                                             track_changes=track)
+        recognizer.calibrate(frames[0], True)
+        start = time.perf_counter()
+        reads = [recognizer.read(frame) for frame in frames]
+        ms = (time.perf_counter() - start) / len(frames) * 1000
+        correct = all(squares_correct(read, name) == 64 for read, name in
+                      zip(reads, [n for n in SEQUENCE for _ in range(hold)]))
+        print(f"{str(track):<9} {ms:>8.2f} "
+              f"{recognizer.reclassified_total / recognizer.reads:>14.1f} "
+              f"{str(correct):>8}")
+
+
+@benchmark
+def pyramid():
+    """Full-size matching vs a 12x12 coarse pass with low-margin escalation.
+
+    Reads every square of every fixture frame (change tracking off), also
+    shifted by a pixel, with and without the coarse pass, and reports the
+    mean read latency, the fraction of squares escalated to full size, the
+    squares read correctly and the speed-up.
+    """
+    print(f"{'set':<10} {'resample':<8} {'full ms':>8} {'pyramid ms':>11} "
+          f"{'escalated':>10} {'correct':>12} {'speed-up':>9}")
+    for piece_set in PIECE_SETS:
+        frames = [(name, frame) for name in SEQUENCE
+                  for frame in (load(piece_set, name),
+                                shifted(load(piece_set, name), 1, -1))]
+        start = load(piece_set, "start")
+        for mode in NumpyImageBackend.RESAMPLE_MODES:
+            timings, correct = [], []
+            for coarse_size in (None, 12):
+                recognizer = TemplateBoardRecognizer(
+                    NumpyImageBackend(resample=mode), track_changes=False,
+                    coarse_size=coarse_size)
+                recognizer.calibrate(start, True)
+                timings.append(sum(time_per_call(recognizer.read, frame)
+                                   for _, frame in frames) / len(frames))
+                correct.append(sum(squares_correct(recognizer.read(frame), name)
+                                   for name, frame in frames))
+            print(f"{piece_set:<10} {mode:<8} {timings[0]:>8.2f} "
+                  f"{timings[1]:>11.2f} {recognizer.escalated_fraction:>10.0%} "
+                  f"{correct[0]:>5}/{correct[1]:<6} "
+                  f"{timings[0] / timings[1]:>8.1f}x")
+
+
+@benchmark
+def occupancy():
+    """Matching every square vs ruling out empty squares first.
+
+    Reads every fixture frame, also shifted by a pixel, with change
+    tracking off, with and without the occupancy test (and with the 12x12
+    coarse pass on top), and reports the mean read latency, the fraction of
+    squares matched against templates and the squares read correctly.
+    """
+    print(f"{'set':<10} {'coarse':>6} {'all ms':>7} {'occupied ms':>12} "
+          f"{'matched':>8} {'correct':>12}")
+    for piece_set in PIECE_SETS:
+        frames = [(name, frame) for name in SEQUENCE
+                  for frame in (load(piece_set, name),
+                                shifted(load(piece_set, name), 1, -1))]
+        start = load(piece_set, "start")
+        for coarse_size in (None, 12):
+            timings, correct = [], []
+            for occupancy in (False, True):
+                recognizer = TemplateBoardRecognizer(
+                    NumpyImageBackend(), track_changes=False,
+                    coarse_size=coarse_size, occupancy=occupancy)
+                recognizer.calibrate(start, True)
+                timings.append(sum(time_per_call(recognizer.read, frame)
+                                   for _, frame in frames) / len(frames))
+                correct.append(sum(squares_correct(recognizer.read(frame), name)
+                                   for name, frame in frames))
+            print(f"{piece_set:<10} {str(coarse_size):>6} {timings[0]:>7.2f} "
+                  f"{timings[1]:>12.2f} {recognizer.matched_fraction:>8.0%} "
+                  f"{correct[0]:>5}/{correct[1]:<6}")
+
+
+@benchmark
+def projection():
+    """Full-dimension matching vs matching in a few principal components.
+
+    Reads every fixture frame, also shifted by a pixel, with change tracking
+    off. "match us" is scoring the 64 extracted features alone (the
+    projection, the tiny products and any fallback), "read ms" the whole
+    read, which is mostly feature extraction.
+    """
+    print(f"{'set':<10} {'components':>10} {'fallback':>8} {'match us':>9} "
+          f"{'read ms':>8} {'rescored':>9} {'correct':>8}")
+    for piece_set in PIECE_SETS:
+        frames = [(name, frame) for name in SEQUENCE
+                  for frame in (load(piece_set, name),
+                                shifted(load(piece_set, name), 1, -1))]
+        start = load(piece_set, "start")
+        for components, fallback in ((None, False), (16, False), (16, True),
+                                     (32, False), (32, True)):
+            recognizer = TemplateBoardRecognizer(
+                NumpyImageBackend(), track_changes=False,
+                components=components, project_fallback=fallback)
+            recognizer.calibrate(start, True)
+            correct = sum(squares_correct(recognizer.read(frame), name)
+                          for name, frame in frames)
+            read = sum(time_per_call(recognizer.read, frame)
+                       for _, frame in frames) / len(frames)
+            rescored = recognizer.fallback_fraction
+            # Time the matching alone: serve the frame's features ready-made.
+            features = recognizer.backend.features_all(frames[-1][1])
+            recognizer.backend.features_all = lambda *args: features
+            match = time_per_call(recognizer._score_full, frames[-1][1],
+                                  list(range(64)), repeat=200)
+            print(f"{piece_set:<10} {str(components):>10} {str(fallback):>8} "
+                  f"{match * 1000:>9.0f} {read:>8.2f} "
+                  f"{rescored:>9.0%} {correct:>8}")
+
+
+@benchmark
+def frame_gate():
+    """Cost of the whole-frame change gate vs a full read.
+
+    On a ~1536 px BGRA capture, the time for the gate to reject an unchanged
+    frame against the time of a read with no change tracking.
+    """
+    image = load("alpha", "nf3", scale=3)
+    alpha = np.full(image.shape[:2] + (1,), 255, dtype=np.uint8)
+    bgra = np.ascontiguousarray(np.concatenate([image[..., ::-1], alpha], 2))
+    gate = FrameChangeGate()
+    gate.changed(bgra)
+    recognizer = TemplateBoardRecognizer(NumpyImageBackend(),
+                                         track_changes=False)
+    recognizer.calibrate(bgra, True)
+    print(f"{'gate us':>8} {'read us':>8}")
+    print(f"{time_per_call(gate.changed, bgra, repeat=200) * 1000:>8.1f} "
+          f"{time_per_call(recognizer.read, bgra) * 1000:>8.1f}")
+
+
+class _FixedReading:
+    """A stand-in inner recognizer that always reads the same board."""
+
+    def __init__(self, reading):
+        self.reading = reading
+
+    def calibrate(self, image, playing_white):
+        pass
+
+    def read(self, image):
+        return self.reading
+
+
+def _copy_push_match(chess_board, candidate):
+    """The filter's former exact-match search: copy, push and compare FENs."""
+    candidate_fen = board.to_fen(candidate)
+    for move in chess_board.legal_moves:
+        test = chess_board.copy()
+        test.push(move)
+        if test.board_fen() == candidate_fen:
+            return move
+    return None
+
+
+def _chess_placement(chess_board):
+    """Return a python-chess board's placement as a ``board.CompactBoard``."""
+    return board.from_fen(chess_board.board_fen())
+
+
+@benchmark
+def filter_reject():
+    """Legal-move filter latency per rejected frame, before and after diffing.
+
+    A rejected frame (a stray queen on d4) is the worst case for the exact
+    match: every legal move is tried. "copy+push" is the former search over
+    board copies and FENs; "diff" is the filter's search over the moves
+    touching the changed squares; "read" is a whole filter step.
+    """
+    import chess
+    from chesscheat.recognition import LegalMoveFilter
+    italian = ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "g8f6",
+               "d2d3", "f8c5", "c2c3", "d7d6", "b2b4", "c5b6"]
+    print(f"{'plies':>5} {'moves':>6} {'copy+push us':>13} {'diff us':>8} "
+          f"{'read us':>8}")
+    for plies in (0, 6, 12):
+        game = chess.Board()
+        inner = _FixedReading(_chess_placement(game))
+        filt = LegalMoveFilter(inner)
+        filt.calibrate(None, True)
+        for uci in italian[:plies]:
+            game.push_uci(uci)
+            inner.reading = _chess_placement(game)
+            filt.read(None)
+        reading = inner.reading = inner.reading.replace({27: "Q"})   # d4
+        before = time_per_call(_copy_push_match, filt._chess_board,
+                               dict(reading), repeat=200) * 1000
+        after = time_per_call(filt._matching_legal_move, reading,
+                              repeat=200) * 1000
+        step = time_per_call(filt.read, None, repeat=200) * 1000
+        print(f"{plies:>5} {game.legal_moves.count():>6} {before:>13.1f} "
+              f"{after:>8.1f} {step:>8.1f}")
+
+
+@benchmark
+def long_game():
+    """Legal-move filter latency per frame over a 300-ply game.
+
+    Plays a seeded random game through the filter; each ply is one accepted
+    frame plus one rejected (corrupted) frame. Per-frame cost should not
+    depend on how many plies were played before.
+    """
+    import random
+    import chess
+    from chesscheat.recognition import LegalMoveFilter
+    rng = random.Random(0)
+    game = chess.Board()
+    inner = _FixedReading(_chess_placement(game))
+    filt = LegalMoveFilter(inner)
+    filt.calibrate(None, True)
+    timings = []
+    while len(timings) < 300 and not game.is_game_over(claim_draw=False):
+        game.push(rng.choice(list(game.legal_moves)))
+        position = _chess_placement(game)
+        corrupted = position.replace(
+            {27: "q" if position[(3, 4)] == "Q" else "Q"})   # d4
+        start = time.perf_counter()
+        inner.reading = position
+        filt.read(None)
+        inner.reading = corrupted
+        filt.read(None)
+        timings.append(time.perf_counter() - start)
+    print(f"{'plies':>9} {'median us':>10}")
+    for first in range(0, len(timings), 50):
+        bucket = sorted(timings[first:first + 50])
+        print(f"{first:>4}-{first + len(bucket) - 1:<4} "
+              f"{bucket[len(bucket) // 2] * 1e6:>10.1f}")
+
+
+def _loop_to_fen(board_map):
+    """The former ``board.to_fen``: run-length counting square by square."""
+    def rank_to_fen(rank):
+        run, parts = 0, []
+        for file_idx in range(8):
+            label = board_map.get((file_idx, rank), ".")
+            if label == ".":
+                run += 1
+            else:
+                if run:
+                    parts.append(str(run))
+                    run = 0
+                parts.append(label)
+        if run:
+            parts.append(str(run))
+        return "".join(parts)
+
+    return "/".join(rank_to_fen(rank) for rank in range(8, 0, -1))
+
+
+@benchmark
+def fen():
+    """FEN encoding and decoding, square loops vs memoised per-rank tables.
+
+    Over every position of a seeded 200-ply random game: "loop" is the
+    former square-by-square encoder (on dicts) and decoder; "dict" is
+    ``board.to_fen`` on the same dicts, "compact" is it on fresh
+    ``CompactBoard`` objects (no cached FEN), "decode" is ``board.from_fen``.
+    """
+    import random
+    import chess
+    rng = random.Random(0)
+    game = chess.Board()
+    fens = []
+    while len(fens) < 200 and not game.is_game_over(claim_draw=False):
+        game.push(rng.choice(list(game.legal_moves)))
+        fens.append(game.board_fen())
+    maps = [_fen_to_map(placement) for placement in fens]
+    squares = [board.from_fen(placement).squares for placement in fens]
+    assert all(_loop_to_fen(m) == board.to_fen(m) == placement
+               for m, placement in zip(maps, fens))
+
+    def per_position(func, items):
+        return time_per_call(lambda: [func(item) for item in items],
+                             repeat=50) * 1000 / len(items)
+
+    rows = [
+        ("encode", per_position(_loop_to_fen, maps),
+         per_position(board.to_fen, maps),
+         per_position(lambda sq: board.CompactBoard(sq).fen, squares)),
+        ("decode", per_position(_fen_to_map, fens),
+         None, per_position(board.from_fen, fens)),
+    ]
+    print(f"{'':<7} {'loop us':>8} {'dict us':>8} {'compact us':>11}")
+    for name, loop, on_dict, compact in rows:
+        dict_cell = f"{on_dict:>8.2f}" if on_dict is not None else f"{'-':>8}"
+        print(f"{name:<7} {loop:>8.2f} {dict_cell} {compact:>11.2f}")
+
+
+@benchmark
+def template_library():
+    """Choosing a calibration out of many by fingerprint: index vs scan.
+
+    The library holds the three fixture themes plus N random ones. "index"
+    is ``TemplateLibrary``'s lookup, "scan" compares the fingerprint with
+    every calibration, and "load" is the whole of ``load`` (fingerprinting
+    the frame, the lookup and restoring the templates).
+    """
+    from chesscheat.recognition.template_library import _Entry
+    rng = np.random.default_rng(0)
+    image = load("merida", "nf3")
+    print(f"{'themes':>6} {'index us':>9} {'scan us':>8} {'load ms':>8}")
+    for extra in (0, 100, 1000):
+        library = TemplateLibrary()
+        for piece_set in PIECE_SETS:
+            recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+            start = load(piece_set, "start")
+            recognizer.calibrate(start, True)
+            library.save(recognizer, start, (0, 0, 512, 512))
+        params = NumpyImageBackend().params
+        for _ in range(extra):
+            library._add(_Entry(rng.uniform(0, 255, 8).astype(np.float32),
+                                {"backend": params}, (512, 512), None))
+        entries = [e for es in library._index.values() for e in es]
+        fingerprint = NumpyImageBackend().fingerprint(image)
+
+        def scan():
+            return min(entries, key=lambda e: float(
+                np.abs(e.fingerprint - fingerprint).max()))
+
+        index = time_per_call(library._match, fingerprint, params, (512, 512),
+                              repeat=200) * 1000
+        linear = time_per_call(scan, repeat=20) * 1000
+        recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+        whole = time_per_call(library.load, recognizer, image, True,
+                              (0, 0, 512, 512))
+        print(f"{len(library):>6} {index:>9.1f} {linear:>8.1f} {whole:>8.2f}")
+
+
+@benchmark
+def resize():
+    """A board resized mid-game: verified re-read vs full recalibration.
+
+    Each frame alternates between the fixture size and a rescaled one, so
+    every read is the first at its size: the backend rebuilds its crop
+    geometry and the recognizer verifies the templates on all 64 squares.
+    "calibrate" is what a resize used to cost instead.
+    """
+    print(f"{'set':<10} {'side':>5} {'resized read ms':>16} "
+          f"{'calibrate ms':>13} {'correct':>8} {'recalibrate?':>13}")
+    for piece_set in PIECE_SETS:
+        start = load(piece_set, "start")
+        recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+        recognizer.calibrate(start, True)
+        calibrate = time_per_call(recognizer.calibrate, start, True, repeat=5)
+        image = load(piece_set, "nf3")
+        for side in (640, 400, 256):
+            resized = np.array(Image.fromarray(image).resize((side, side),
+                                                             Image.BILINEAR))
+            frames = iter([image, resized] * 20)
+            read = time_per_call(lambda: recognizer.read(next(frames)))
+            correct = squares_correct(recognizer.read(resized), "nf3")
+            print(f"{piece_set:<10} {side:>5} {read:>16.2f} {calibrate:>13.2f} "
+                  f"{correct:>8} {str(recognizer.needs_recalibration):>13}")
+
+
+def main(argv):
+    """Run the benchmarks named in ``argv`` (all of them when empty)."""
+    names = argv or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"unknown benchmark(s): {', '.join(unknown)}; "
+                 f"choose from {', '.join(BENCHMARKS)}")
+    for name in names:
+        print(f"== {name}: {BENCHMARKS[name].__doc__.splitlines()[0]}")
+        BENCHMARKS[name]()
+        print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -23,6 +23,14 @@ class SquareCoordTests(unittest.TestCase):
             self.assertEqual(len(seen), 64)
 
 
+class SquareIndexTests(unittest.TestCase):
+    def test_python_chess_numbering(self):
+        self.assertEqual(board.square_index(0, 1), 0)    # a1
+        self.assertEqual(board.square_index(7, 1), 7)    # h1
+        self.assertEqual(board.square_index(4, 4), 28)   # e4
+        self.assertEqual(board.square_index(7, 8), 63)   # h8
+
+
 class StartLabelTests(unittest.TestCase):
     def test_back_ranks(self):
         self.assertEqual([board.start_label(f, 1) for f in range(8)],
@@ -65,6 +73,22 @@ class FenTests(unittest.TestCase):
     def test_single_piece_run_counts(self):
         self.assertEqual(board.to_fen({(4, 1): "K"}), "8/8/8/8/8/8/8/4K3")
 
+    def test_from_fen_round_trips(self):
+        for fen in (START_FEN, "8/8/8/8/8/8/8/8", "8/8/8/8/8/8/8/4K3",
+                    "r3k2r/1p3ppp/8/pPp5/8/8/P4PPP/R3K2R"):
+            self.assertEqual(board.to_fen(board.from_fen(fen)), fen)
+        self.assertEqual(board.from_fen(START_FEN), board.starting_board())
+
+    def test_from_fen_reads_the_placement_of_a_full_fen(self):
+        self.assertEqual(board.from_fen(START_FEN + " w KQkq - 0 1"),
+                         board.starting_board())
+
+    def test_from_fen_rejects_malformed_placements(self):
+        for fen in ("8/8/8", "9/8/8/8/8/8/8/8", "7/8/8/8/8/8/8/8",
+                    "x7/8/8/8/8/8/8/8", "8/8/8/8/8/8/8/8/8"):
+            with self.assertRaises(ValueError):
+                board.from_fen(fen)
+
 
 class RenderTests(unittest.TestCase):
     def test_white_perspective_layout(self):
@@ -85,5 +109,47 @@ class RenderTests(unittest.TestCase):
         self.assertEqual(len(out), 10)
 
 
+class CompactBoardTests(unittest.TestCase):
+    def setUp(self):
+        self.start = board.CompactBoard.from_map(board.starting_board())
+
+    def test_reads_like_the_dict_it_was_built_from(self):
+        self.assertEqual(self.start, board.starting_board())
+        self.assertEqual(board.starting_board(), self.start)
+        self.assertEqual(dict(self.start), board.starting_board())
+        self.assertEqual(self.start[(4, 1)], "K")
+        self.assertEqual(len(self.start), 64)
+        self.assertNotIn((8, 1), self.start)
+        self.assertIsNone(self.start.get((8, 1)))
+
+    def test_missing_squares_are_empty(self):
+        compact = board.CompactBoard.from_map({(4, 1): "K"})
+        self.assertEqual(compact[(0, 1)], ".")
+        self.assertEqual(compact.fen, "8/8/8/8/8/8/8/4K3")
+
+    def test_equal_boards_hash_alike(self):
+        copy = board.CompactBoard(self.start.squares)
+        self.assertEqual(hash(copy), hash(self.start))
+        self.assertEqual(len({copy, self.start}), 1)
+
+    def test_diff_and_replace(self):
+        e4 = self.start.replace({12: ".", 28: "P"})
+        self.assertEqual(self.start.diff(e4), {12: ".", 28: "P"})
+        self.assertEqual(e4.diff(self.start), {12: "P", 28: "."})
+        self.assertEqual(self.start.diff(self.start), {})
+        self.assertEqual(self.start[(4, 2)], "P")   # unchanged
+
+    def test_fen_and_render_match_the_dict_versions(self):
+        e4 = self.start.replace({12: ".", 28: "P"})
+        self.assertEqual(board.to_fen(e4), board.to_fen(dict(e4)))
+        for white in (True, False):
+            self.assertEqual(board.render(e4, white),
+                             board.render(dict(e4), white))
+
+    def test_rejects_wrong_length(self):
+        with self.assertRaises(ValueError):
+            board.CompactBoard(b"." * 63)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -18,9 +18,11 @@ try:
 except ImportError:
     _HAVE_DEPS = False
 
-from chesscheat import board
+from chesscheat import app, board
+from chesscheat.mocks import MockSetupProvider, MockFrameSource
 from chesscheat.recognition import (TemplateBoardRecognizer,
-                                    NumpyImageBackend, LegalMoveFilter)
+                                    NumpyImageBackend, LegalMoveFilter,
+                                    FrameChangeGate, TemplateLibrary)
 
 BOARDS_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "boards")
 
@@ -188,6 +190,49 @@ class FilterRealImagesTests(unittest.TestCase):
                     f"{piece_set}: highlight artifact was not rejected",
                 )
 
+    def test_move_under_cursor_accepted_first_frame(self):
+        """1.e4 is accepted from its first frame despite a cursor on d4."""
+        for piece_set in ["wikipedia", "alpha", "merida"]:
+            with self.subTest(piece_set=piece_set):
+                rec = self._make_and_calibrate(piece_set)
+                corrupted = _cursor_over_square(_load(piece_set, "e4"),
+                                                row=4, col=3)
+                result = rec.read(corrupted)
+                self.assertEqual(board.to_fen(result), EXPECTED_FEN["e4"])
+
+    def test_missed_frames_caught_up(self):
+        """Jumping from the start straight to 2.Nf3 recovers all three plies."""
+        for piece_set in ["wikipedia", "alpha", "merida"]:
+            with self.subTest(piece_set=piece_set):
+                rec = self._make_and_calibrate(piece_set)
+                result = rec.read(_load(piece_set, "nf3"))
+                self.assertEqual(board.to_fen(result), EXPECTED_FEN["nf3"])
+                # Any order of the white moves gives the same position.
+                self.assertEqual(sorted(m.uci() for m in rec.moves),
+                                 ["c7c5", "e2e4", "g1f3"])
+
+    def test_takeback_is_accepted(self):
+        """Going back from 1...c5 to the 1.e4 frame rewinds one ply."""
+        for piece_set in ["wikipedia", "alpha", "merida"]:
+            with self.subTest(piece_set=piece_set):
+                rec = self._make_and_calibrate(piece_set)
+                for name in ["e4", "c5", "e4", "c5", "nf3"]:
+                    result = rec.read(_load(piece_set, name))
+                    self.assertEqual(board.to_fen(result), EXPECTED_FEN[name])
+                self.assertEqual(rec.rewinds, 1)
+
+    def test_parked_cursor_never_forces_a_resync(self):
+        """A cursor resting on the board is not confident enough to adopt."""
+        for piece_set in ["wikipedia", "alpha", "merida"]:
+            with self.subTest(piece_set=piece_set):
+                rec = self._make_and_calibrate(piece_set)
+                parked = _cursor_over_square(_load(piece_set, "start"),
+                                             row=4, col=3)
+                for _ in range(3 * rec.resync_after):
+                    result = rec.read(parked)
+                self.assertEqual(board.to_fen(result), EXPECTED_FEN["start"])
+                self.assertEqual(rec.resyncs, 0)
+
     def test_multiple_artifacts_then_resume(self):
         """After several artifact frames, the game continues correctly."""
         piece_set = "wikipedia"
@@ -207,6 +252,78 @@ class FilterRealImagesTests(unittest.TestCase):
         r = rec.read(_load(piece_set, "c5"))
         self.assertEqual(board.to_fen(r), EXPECTED_FEN["c5"])
 
+    def test_resize_to_another_theme_recalibrates_in_place(self):
+        """A resize that breaks the templates relearns them mid-game."""
+        f = self._make_and_calibrate("alpha")
+        f.read(_load("alpha", "start"))
+        f.read(_load("alpha", "e4"))
+        for name in SEQUENCE[1:]:
+            image = np.array(Image.fromarray(_load("merida", name))
+                             .resize((420, 420), Image.BILINEAR))
+            self.assertEqual(board.to_fen(f.read(image)), EXPECTED_FEN[name])
+        self.assertEqual(f.recalibrations, 1)
+        self.assertEqual(f.rejected, 0)
+
+    def test_restore_adopts_the_position_on_screen(self):
+        """A restored calibration resumes tracking mid-game."""
+        snapshot = self._make_and_calibrate("wikipedia").snapshot()
+        rec = LegalMoveFilter(TemplateBoardRecognizer(NumpyImageBackend()))
+        self.assertTrue(rec.restore(snapshot, _load("wikipedia", "c5"), True))
+        self.assertTrue(rec._chess_board.turn)   # one ply each: white to move
+        r = rec.read(_load("wikipedia", "nf3"))
+        self.assertEqual(board.to_fen(r), EXPECTED_FEN["nf3"])
+        self.assertEqual([m.uci() for m in rec.moves], ["g1f3"])
+
+    def test_gate_rereads_frames_the_filter_only_partly_accepted(self):
+        """Behind a ``FrameChangeGate``, a held frame two plies on lands."""
+        rec = LegalMoveFilter(TemplateBoardRecognizer(NumpyImageBackend()),
+                              max_catch_up=1)
+        frames = [_load("alpha", "start")] + [_load("alpha", "c5")] * 30
+        gate = FrameChangeGate()
+        seen = []
+        app.run(MockSetupProvider(True, (0, 0, 8, 8)),
+                lambda box: MockFrameSource(frames), rec,
+                on_board=lambda board_map, _white: seen.append(
+                    board.to_fen(board_map)),
+                gate=gate)
+        self.assertEqual(seen[:2], [EXPECTED_FEN["e4"], EXPECTED_FEN["c5"]])
+        self.assertEqual(seen[-1], EXPECTED_FEN["c5"])
+        self.assertEqual(gate.skipped, 28)
+
+    def test_gate_skips_a_parked_cursor_the_filter_rejected(self):
+        """A rejected frame that stays on screen is not read again."""
+        rec = self._make_and_calibrate("alpha")
+        parked = _cursor_over_square(_load("alpha", "start"), row=4, col=3)
+        frames = [_load("alpha", "start")] + [parked] * 30
+        gate = FrameChangeGate()
+        app.run(MockSetupProvider(True, (0, 0, 8, 8)),
+                lambda box: MockFrameSource(frames), rec,
+                on_board=lambda board_map, _white: None, gate=gate)
+        self.assertEqual(rec.rejected, 1)
+        self.assertEqual(gate.skipped, 29)
+
+    def test_theme_switch_mid_session_loads_its_templates(self):
+        """Switching to a saved theme mid-game carries on in that theme."""
+        library = TemplateLibrary()
+        merida = TemplateBoardRecognizer(NumpyImageBackend())
+        merida.calibrate(_load("merida", "start"), True)
+        library.save(merida, _load("merida", "start"), (0, 0, 8, 8))
+        rec = LegalMoveFilter(TemplateBoardRecognizer(NumpyImageBackend()))
+        frames = [_load("alpha", "start"), _load("alpha", "start"),
+                  _load("alpha", "e4"), _load("merida", "c5"),
+                  _load("merida", "nf3")]
+        restores = []
+        seen = []
+        app.run(MockSetupProvider(True, (0, 0, 8, 8)),
+                lambda box: MockFrameSource(frames), rec,
+                on_board=lambda board_map, _white: seen.append(
+                    board.to_fen(board_map)),
+                store=library, on_restore=lambda: restores.append(True))
+        self.assertEqual(seen, [EXPECTED_FEN[name] for name in SEQUENCE[1:]])
+        self.assertEqual(len(restores), 1)
+        self.assertEqual((library.lookups, library.hits), (2, 1))
+        self.assertEqual(len(library), 2)   # alpha was calibrated and saved
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -10,7 +10,10 @@ These tests exercise ``LegalMoveFilter`` end-to-end through the mock pipeline
 The python-chess package is required; the suite is skipped when absent.
 """
 
+import random
+import time
 import unittest
+from unittest import mock
 
 try:
     import chess as _chess
@@ -18,9 +21,11 @@ try:
 except ImportError:
     _HAVE_CHESS = False
 
-from chesscheat import board
+from chesscheat import app, board
 from chesscheat.recognition import TemplateBoardRecognizer, LegalMoveFilter
-from chesscheat.mocks import MockImageBackend, render_mock_image
+from chesscheat.mocks import (MockImageBackend, MockFrameGate,
+                              MockFrameSource, MockSetupProvider,
+                              render_mock_image)
 
 
 # ---------------------------------------------------------------------------
@@ -99,6 +104,45 @@ def _sequence(uci_moves):
     return maps
 
 
+def _random_game(plies, seed=0):
+    """Return the moves of a seeded random legal game at least ``plies`` long.
+
+    Args:
+        plies: Number of half-moves wanted.
+        seed: First random seed to try; later seeds are tried in turn if a
+            game ends early.
+
+    Returns:
+        A list of ``plies`` ``chess.Move`` objects.
+    """
+    while True:
+        rng = random.Random(seed)
+        b = _chess.Board()
+        moves = []
+        while len(moves) < plies:
+            legal = list(b.legal_moves)
+            if not legal:
+                break
+            moves.append(rng.choice(legal))
+            b.push(moves[-1])
+        if len(moves) == plies:
+            return moves
+        seed += 1
+
+
+class _ScriptedRecognizer:
+    """Inner recognizer stub that reads whatever board it was last given."""
+
+    def __init__(self):
+        self.reading = None
+
+    def calibrate(self, image, playing_white):
+        self.reading = board.starting_board()
+
+    def read(self, image):
+        return self.reading
+
+
 # ---------------------------------------------------------------------------
 # Artifact rejection
 # ---------------------------------------------------------------------------
@@ -433,6 +477,398 @@ class CursorArtifactTests(unittest.TestCase):
         self.assertEqual(result, e4_map)  # misread rejected
 
 
+@unittest.skipUnless(_HAVE_CHESS, "requires python-chess")
+class DiffMatchingTests(unittest.TestCase):
+    """Exact matches are found from the square diff, without board copies."""
+
+    def test_special_moves_matched_without_copying(self):
+        """Castling, en passant and promotion land with Board.copy disabled."""
+        uci = ["e2e4", "d7d5", "e4e5", "f7f5", "e5f6", "b8c6", "g1f3",
+               "c8e6", "f1e2", "d8d6", "e1g1", "e8c8", "f6g7", "a7a6",
+               "g7h8q"]
+        positions = _sequence(uci)
+        rec = _make_recognizer()
+        rec.calibrate(render_mock_image(positions[0], True), True)
+        with mock.patch.object(_chess.Board, "copy",
+                               side_effect=AssertionError("board copied")):
+            for i, pos in enumerate(positions[1:], start=1):
+                with self.subTest(ply=i):
+                    self.assertEqual(_read(rec, pos), pos)
+        self.assertEqual(rec.exact_accepts, len(uci))
+
+
+@unittest.skipUnless(_HAVE_CHESS, "requires python-chess")
+class CatchUpTests(unittest.TestCase):
+    """Frames that skip several plies are explained by a short sequence."""
+
+    def _skip_to(self, uci, **kwargs):
+        """Calibrate, then read only the position after all of ``uci``."""
+        positions = _sequence(uci)
+        rec = LegalMoveFilter(TemplateBoardRecognizer(MockImageBackend()),
+                              **kwargs)
+        rec.calibrate(render_mock_image(positions[0], True), True)
+        return rec, positions, _read(rec, positions[-1])
+
+    def test_two_missed_plies_recovered(self):
+        rec, positions, result = self._skip_to(["e2e4", "c7c5"])
+        self.assertEqual(result, positions[-1])
+        self.assertEqual([m.uci() for m in rec.moves], ["e2e4", "c7c5"])
+        self.assertEqual(rec.catch_ups, 1)
+
+    def test_three_plies_including_castling_recovered(self):
+        uci = ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "g8f6"]
+        rec = _make_recognizer()
+        positions = _sequence(uci + ["e1g1", "f8c5", "d2d3"])
+        rec.calibrate(render_mock_image(positions[0], True), True)
+        for position in positions[1:len(uci) + 1]:
+            _read(rec, position)
+        self.assertEqual(_read(rec, positions[-1]), positions[-1])
+        self.assertEqual([m.uci() for m in rec.moves][-3:],
+                         ["e1g1", "f8c5", "d2d3"])
+        # The game continues from the caught-up position, side to move and all.
+        after = _sequence(uci + ["e1g1", "f8c5", "d2d3", "d7d6"])[-1]
+        self.assertEqual(_read(rec, after), after)
+
+    def test_deeper_than_max_catch_up_rejected(self):
+        uci = ["e2e4", "c7c5", "g1f3", "d7d6"]
+        rec, positions, result = self._skip_to(uci)
+        self.assertEqual(result, positions[0])
+        rec, positions, result = self._skip_to(uci, max_catch_up=4)
+        self.assertEqual(result, positions[-1])
+
+    def test_without_catch_up_one_ply_lands_per_frame(self):
+        """Disabled, only the likelihood step advances: one ply a frame."""
+        rec, positions, result = self._skip_to(["e2e4", "c7c5"],
+                                                max_catch_up=1)
+        self.assertEqual(result, positions[1])
+        self.assertEqual(_read(rec, positions[-1]), positions[-1])
+        self.assertEqual(rec.catch_ups, 0)
+
+    def test_artifacts_are_not_explained_as_several_plies(self):
+        rec = _make_recognizer()
+        start = _calibrate(rec)
+        for square, label in [((4, 4), 'Q'), ((4, 2), '.'), ((3, 5), 'p')]:
+            corrupted = dict(start)
+            corrupted[square] = label
+            self.assertEqual(_read(rec, corrupted), start)
+        self.assertEqual(rec.catch_ups, 0)
+
+
+class _FakeClock:
+    """A manually advanced clock for timing assertions."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@unittest.skipUnless(_HAVE_CHESS, "requires python-chess")
+class ResyncTests(unittest.TestCase):
+    """A persistent unexplained reading is eventually adopted."""
+
+    def _filter(self, **kwargs):
+        clock = _FakeClock()
+        rec = LegalMoveFilter(TemplateBoardRecognizer(MockImageBackend()),
+                              resync_after=3, clock=clock, **kwargs)
+        _calibrate(rec)
+        return rec, clock
+
+    def _hold(self, rec, clock, position, frames):
+        """Show ``position`` for ``frames`` frames, one second apart."""
+        for _ in range(frames):
+            result = _read(rec, position)
+            clock.now += 1.0
+        return result
+
+    def test_position_set_up_by_hand_is_adopted(self):
+        """An analysis-board position held for N frames replaces the game."""
+        rec, clock = self._filter()
+        setup = _chess_to_map(_chess.Board("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"))
+        self.assertEqual(self._hold(rec, clock, setup, 2),
+                         board.starting_board())
+        self.assertEqual(self._hold(rec, clock, setup, 1), setup)
+        self.assertEqual(rec.resyncs, 1)
+        self.assertEqual(rec.desync_seconds, 2.0)
+        self.assertEqual(rec.last_resync, ("4k3/8/8/8/8/8/4P3/4K3", 2.0))
+        # The game goes on from there with the inferred side to move: black
+        # only lost pieces, white only lost pieces -- no arrivals, so white
+        # (to move at the start) keeps the move.
+        after = _chess_to_map(_chess.Board("4k3/8/8/8/4P3/8/8/4K3 b - - 0 1"))
+        self.assertEqual(_read(rec, after), after)
+
+    def test_side_to_move_inferred_from_arrivals(self):
+        """The colour whose pieces arrived is taken to have just moved."""
+        rec, clock = self._filter()
+        edited = board.starting_board()
+        edited[(1, 8)], edited[(2, 6)] = '.', 'n'   # only black arrived
+        self._hold(rec, clock, edited, 3)
+        self.assertEqual(rec.resyncs, 1)
+        nf3 = dict(edited)
+        nf3[(6, 1)], nf3[(5, 3)] = '.', 'N'        # so white is to move
+        self.assertEqual(_read(rec, nf3), nf3)
+
+        rec, clock = self._filter()
+        edited = board.starting_board()
+        edited[(4, 2)], edited[(4, 5)] = '.', 'P'   # only white arrived
+        self._hold(rec, clock, edited, 3)
+        d6 = dict(edited)
+        d6[(3, 7)], d6[(3, 6)] = '.', 'p'          # so black is to move
+        self.assertEqual(_read(rec, d6), d6)
+
+    def test_configured_side_to_move(self):
+        rec, clock = self._filter(resync_turn=False)
+        shown = _chess_to_map(_apply(_chess.Board(), "e2e4"))
+        shown[(3, 2)], shown[(3, 4)] = '.', 'P'   # d4 too: not one move
+        self._hold(rec, clock, shown, 3)
+        self.assertFalse(rec._chess_board.turn)
+
+    def test_castling_rights_follow_the_position(self):
+        rec, clock = self._filter(resync_turn=True)
+        shown = board.starting_board()
+        for square in [(5, 1), (6, 1), (7, 1)]:
+            shown[square] = '.'
+        shown[(6, 1)], shown[(5, 1)] = 'K', 'R'   # already castled
+        shown[(4, 1)] = '.'
+        self._hold(rec, clock, shown, 3)
+        self.assertEqual(rec._chess_board.castling_xfen(), "kq")
+
+    def test_interrupted_streak_does_not_resync(self):
+        """The same reading must persist on consecutive frames."""
+        rec, clock = self._filter()
+        corrupted = dict(board.starting_board())
+        corrupted[(4, 4)] = 'Q'
+        for _ in range(5):
+            self._hold(rec, clock, corrupted, 2)
+            self._hold(rec, clock, board.starting_board(), 1)
+        self.assertEqual(rec.resyncs, 0)
+
+    def test_invalid_position_is_never_adopted(self):
+        rec, clock = self._filter()
+        corrupted = dict(board.starting_board())
+        corrupted[(4, 4)] = 'K'   # two white kings
+        self.assertEqual(self._hold(rec, clock, corrupted, 6),
+                         board.starting_board())
+        self.assertEqual(rec.resyncs, 0)
+
+    def test_resync_can_be_disabled(self):
+        rec, clock = self._filter()
+        rec.resync_after = 0
+        setup = _chess_to_map(_chess.Board("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"))
+        self._hold(rec, clock, setup, 10)
+        self.assertEqual(rec.resyncs, 0)
+
+    def test_resync_behind_a_frame_gate(self):
+        """The gate lets a held unexplained frame through until adopted."""
+        rec, _ = self._filter()
+        setup = _chess_to_map(_chess.Board("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"))
+        frames = [render_mock_image(board.starting_board(), True)]
+        frames += [render_mock_image(setup, True)] * 10
+        gate = MockFrameGate()
+        seen = []
+        app.run(MockSetupProvider(True, (0, 0, 8, 8)),
+                lambda box: MockFrameSource(frames), rec,
+                on_board=lambda board_map, _white: seen.append(board_map),
+                gate=gate)
+        self.assertEqual(rec.resyncs, 1)
+        self.assertEqual(seen[2:], [setup] * 8)
+        self.assertEqual(gate.skipped, 7)
+
+
+@unittest.skipUnless(_HAVE_CHESS, "requires python-chess")
+class RewindTests(unittest.TestCase):
+    """Readings of earlier positions are accepted as takebacks."""
+
+    def _play(self, uci):
+        rec = _make_recognizer()
+        positions = _sequence(uci)
+        rec.calibrate(render_mock_image(positions[0], True), True)
+        for position in positions[1:]:
+            _read(rec, position)
+        return rec, positions
+
+    def test_takeback_then_different_move(self):
+        rec, positions = self._play(["e2e4", "e7e5", "g1f3"])
+        self.assertEqual(_read(rec, positions[2]), positions[2])
+        self.assertEqual([m.uci() for m in rec.moves], ["e2e4", "e7e5"])
+        self.assertEqual((rec.rewinds, rec.plies_rewound), (1, 1))
+        nc3 = _sequence(["e2e4", "e7e5", "b1c3"])[-1]
+        self.assertEqual(_read(rec, nc3), nc3)
+        self.assertEqual(rec.moves[-1].uci(), "b1c3")
+
+    def test_browse_back_and_forward(self):
+        """Stepping back two plies, then replaying them, lands each time."""
+        uci = ["e2e4", "e7e5", "g1f3", "b8c6"]
+        rec, positions = self._play(uci)
+        for ply in (3, 2):
+            self.assertEqual(_read(rec, positions[ply]), positions[ply])
+        for ply in (3, 4):
+            self.assertEqual(_read(rec, positions[ply]), positions[ply])
+        self.assertEqual([m.uci() for m in rec.moves], uci)
+
+    def test_rewind_restores_castling_and_en_passant_rights(self):
+        uci = ["e2e4", "a7a6", "e4e5", "d7d5", "g1f3", "a6a5", "f1e2",
+               "a5a4", "e1g1"]
+        rec, positions = self._play(uci)
+        self.assertEqual(_read(rec, positions[4]), positions[4])
+        ep = _sequence(uci[:4] + ["e5d6"])[-1]    # en passant still legal
+        self.assertEqual(_read(rec, ep), ep)
+
+    def test_repeated_position_rewinds_to_latest_visit(self):
+        uci = ["e2e4", "g8f6", "g1f3", "f6g8", "f3g1", "d7d5"]
+        rec, positions = self._play(uci)
+        self.assertEqual(_read(rec, positions[1]), positions[1])
+        self.assertEqual(len(rec.moves), 5)
+        self.assertEqual(_read(rec, positions[3]), positions[3])
+        self.assertEqual(len(rec.moves), 3)
+
+
+@unittest.skipUnless(_HAVE_CHESS, "requires python-chess")
+class NewGameTests(unittest.TestCase):
+    """A reset to the starting position archives the game and starts anew."""
+
+    def test_reset_archives_game_and_tracks_the_next(self):
+        rec = _make_recognizer()
+        _calibrate(rec)
+        for position in _sequence(["e2e4", "e7e5", "g1f3"])[1:]:
+            _read(rec, position)
+        start = board.starting_board()
+        self.assertEqual(_read(rec, start), start)
+        self.assertEqual(rec.moves, [])
+        self.assertEqual(rec.games_played, 1)
+        game = rec.games[-1]
+        self.assertEqual([m.uci() for m in game.moves],
+                         ["e2e4", "e7e5", "g1f3"])
+        self.assertEqual(game.start_fen, _chess.STARTING_FEN)
+        d4 = _sequence(["d2d4"])[-1]
+        self.assertEqual(_read(rec, d4), d4)
+        self.assertEqual([m.uci() for m in rec.moves], ["d2d4"])
+
+    def test_next_game_from_the_other_side_turns_the_board(self):
+        rec = _make_recognizer()
+        start = _calibrate(rec)
+        for position in _sequence(["e2e4", "e7e5", "g1f3"])[1:]:
+            _read(rec, position)
+        self.assertEqual(rec.read(render_mock_image(start, False)), start)
+        self.assertEqual((rec.turns, rec.games_played), (1, 1))
+        self.assertFalse(rec.playing_white)
+        d4 = _sequence(["d2d4"])[-1]
+        self.assertEqual(rec.read(render_mock_image(d4, False)), d4)
+        self.assertEqual([m.uci() for m in rec.moves], ["d2d4"])
+
+    def test_knight_shuffle_back_to_start_is_a_move(self):
+        """The start placement reached by a legal move is not a new game."""
+        rec = _make_recognizer()
+        _calibrate(rec)
+        for position in _sequence(["g1f3", "g8f6", "f3g1", "f6g8"])[1:]:
+            _read(rec, position)
+        self.assertEqual(len(rec.moves), 4)
+        self.assertEqual(rec.games_played, 0)
+
+    def test_first_moves_taken_back_are_not_a_game(self):
+        """Back to the start after fewer than ``min_game_plies`` rewinds."""
+        rec = _make_recognizer()
+        start = _calibrate(rec)
+        for position in _sequence(["e2e4", "e7e5"])[1:]:
+            _read(rec, position)
+        self.assertEqual(_read(rec, start), start)
+        self.assertEqual(rec.moves, [])
+        self.assertEqual((rec.rewinds, rec.plies_rewound), (1, 2))
+        self.assertEqual((rec.games_played, len(rec.games)), (0, 0))
+        d4 = _sequence(["d2d4"])[-1]
+        self.assertEqual(_read(rec, d4), d4)
+        self.assertEqual([m.uci() for m in rec.moves], ["d2d4"])
+
+    def test_archive_is_bounded(self):
+        rec = LegalMoveFilter(TemplateBoardRecognizer(MockImageBackend()),
+                              archive_size=3, min_game_plies=1)
+        _calibrate(rec)
+        e4 = _sequence(["e2e4"])[-1]
+        for _ in range(10):
+            _read(rec, e4)
+            _read(rec, board.starting_board())
+        self.assertEqual(rec.games_played, 10)
+        self.assertEqual(len(rec.games), 3)
+        self.assertTrue(all(len(g.log) == 1 for g in rec.games))
+
+
+@unittest.skipUnless(_HAVE_CHESS, "requires python-chess")
+class SuccessorIndexTests(unittest.TestCase):
+    """Repeated noisy frames at one position are resolved by a lookup."""
+
+    def test_repeated_artifact_enumerates_successors_once(self):
+        rec = _make_recognizer()
+        _calibrate(rec)
+        _, e4_map, c5_map = _sequence(["e2e4", "c7c5"])
+        _read(rec, e4_map)
+        corrupted = dict(e4_map)
+        corrupted[(3, 4)] = 'Q'
+        _read(rec, corrupted)   # miss: builds the index
+        with mock.patch.object(rec, "_effects", wraps=rec._effects) as spy:
+            for _ in range(3):
+                self.assertEqual(_read(rec, corrupted), e4_map)
+            self.assertEqual(_read(rec, c5_map), c5_map)
+            self.assertEqual(spy.call_count, 1)   # only to apply 1...c5
+        self.assertEqual((rec.index_hits, rec.index_misses), (2, 4))
+
+    def test_index_is_rebuilt_after_each_accepted_move(self):
+        rec = _make_recognizer()
+        _calibrate(rec)
+        positions = _sequence(["e2e4", "c7c5", "g1f3"])
+        for position in positions[1:]:
+            corrupted = dict(rec._state)
+            corrupted[(0, 5)] = 'Q'
+            _read(rec, corrupted)
+            self.assertEqual(_read(rec, position), position)
+        self.assertEqual(rec.index_hits, 3)
+
+
+@unittest.skipUnless(_HAVE_CHESS, "requires python-chess")
+class LikelihoodAcceptanceTests(unittest.TestCase):
+    """A move whose frame is partly corrupted is accepted on that frame."""
+
+    def test_move_with_unrelated_artifact_accepted_first_poll(self):
+        """1…c5 with a fake queen on d4 is recognised as 1…c5 immediately."""
+        rec = _make_recognizer()
+        _calibrate(rec)
+        _, e4_map, c5_map = _sequence(["e2e4", "c7c5"])
+        _read(rec, e4_map)
+        corrupted = dict(c5_map)
+        corrupted[(3, 4)] = 'Q'
+        self.assertEqual(_read(rec, corrupted), c5_map)
+        self.assertEqual((rec.exact_accepts, rec.likely_accepts), (1, 1))
+
+    def test_move_with_destination_misread_accepted(self):
+        """A highlight misreading the arrived piece still lands the move."""
+        rec = _make_recognizer()
+        _calibrate(rec)
+        _, e4_map = _sequence(["e2e4"])
+        corrupted = dict(e4_map)
+        corrupted[(4, 4)] = 'B'   # the pawn on e4 reads as a bishop
+        self.assertEqual(_read(rec, corrupted), e4_map)
+
+    def test_ambiguous_successors_rejected(self):
+        """With the destination unreadable, e2-e3 and e2-e4 tie: reject."""
+        rec = _make_recognizer()
+        start = _calibrate(rec)
+        corrupted = dict(start)
+        corrupted[(4, 2)] = '.'
+        self.assertEqual(_read(rec, corrupted), start)
+        self.assertEqual(rec.rejected, 1)
+
+    def test_margin_is_configurable(self):
+        """An unreachable margin falls back to exact matching only."""
+        rec = LegalMoveFilter(TemplateBoardRecognizer(MockImageBackend()),
+                              margin=float("inf"))
+        start = _calibrate(rec)
+        _, e4_map = _sequence(["e2e4"])
+        corrupted = dict(e4_map)
+        corrupted[(3, 4)] = 'Q'
+        self.assertEqual(_read(rec, corrupted), start)
+        self.assertEqual(_read(rec, e4_map), e4_map)
+
+
 # ---------------------------------------------------------------------------
 # Long game: many moves, no false positives
 # ---------------------------------------------------------------------------
@@ -472,6 +908,35 @@ class LongGameTests(unittest.TestCase):
             self.assertEqual(artifact_result, pos,
                              f"artifact after move {i} was not rejected")
 
+    def test_per_frame_cost_is_flat_over_300_plies(self):
+        """A 300-ply game costs as much per frame at the end as at the start.
+
+        Each ply feeds the filter the new position and then a corrupted frame
+        (the worst case: every legal move is considered and rejected).
+        """
+        moves = _random_game(300)
+        inner = _ScriptedRecognizer()
+        rec = LegalMoveFilter(inner)
+        rec.calibrate(None, True)
+        b = _chess.Board()
+        timings = []
+        for move in moves:
+            b.push(move)
+            position = _chess_to_map(b)
+            corrupted = dict(position)
+            corrupted[(3, 4)] = 'q' if position[(3, 4)] == 'Q' else 'Q'
+            start = time.perf_counter()
+            inner.reading = position
+            self.assertEqual(rec.read(None), position)
+            inner.reading = corrupted
+            self.assertEqual(rec.read(None), position)
+            timings.append(time.perf_counter() - start)
+        self.assertEqual(rec.moves, moves)
+        # Medians resist scheduler noise; the bound is loose on purpose.
+        early = sorted(timings[:50])[25]
+        late = sorted(timings[-50:])[25]
+        self.assertLess(late, 3 * early + 1e-4)
+
 
 if __name__ == "__main__":
     unittest.main()
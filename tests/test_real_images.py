@@ -12,6 +12,7 @@ Skipped automatically when numpy or Pillow is unavailable.
 """
 
 import os
+import tempfile
 import unittest
 
 try:
@@ -22,7 +23,9 @@ except ImportError:
     _HAVE_DEPS = False
 
 from chesscheat import board, app
-from chesscheat.recognition import TemplateBoardRecognizer, NumpyImageBackend
+from chesscheat.recognition import (TemplateBoardRecognizer, NumpyImageBackend,
+                                    FrameChangeGate, NpzCalibrationStore,
+                                    TemplateLibrary, MISSING_SCORE)
 from chesscheat.mocks import MockSetupProvider, MockFrameSource
 
 BOARDS_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "boards")
@@ -46,6 +49,12 @@ def _load(piece_set, name):
     return np.array(Image.open(path).convert("RGB"))
 
 
+def _resize(image, side):
+    """Rescale a board image to ``side`` x ``side`` pixels."""
+    return np.array(Image.fromarray(image).resize((side, side),
+                                                  Image.BILINEAR))
+
+
 @unittest.skipUnless(_HAVE_DEPS, "requires numpy and Pillow")
 class RealImageRecognitionTests(unittest.TestCase):
     def test_starting_position_round_trips(self):
@@ -74,5 +83,510 @@ class RealImageRecognitionTests(unittest.TestCase):
                                  [EXPECTED_FEN[name] for name in SEQUENCE[1:]])
 
 
+@unittest.skipUnless(_HAVE_DEPS, "requires numpy and Pillow")
+class BatchedFeatureTests(unittest.TestCase):
+    def test_features_all_matches_per_square_features(self):
+        backend = NumpyImageBackend()
+        for piece_set in PIECE_SETS:
+            with self.subTest(piece_set=piece_set):
+                image = _load(piece_set, "nf3")
+                shapes, means = backend.features_all(image)
+                self.assertEqual(shapes.shape, (64, backend.size ** 2))
+                for row in range(8):
+                    for col in range(8):
+                        shape, mean = backend.feature(
+                            backend.get_square(image, row, col))
+                        np.testing.assert_allclose(shapes[row * 8 + col], shape,
+                                                   atol=1e-12)
+                        self.assertAlmostEqual(means[row * 8 + col], mean)
+
+    def test_uneven_frame_size_matches_per_square_features(self):
+        # Cell bounds are not whole pixels when the frame is not a multiple of 8.
+        backend = NumpyImageBackend()
+        image = _load("alpha", "c5")[:509, :502]
+        shapes, _ = backend.features_all(image)
+        shape, _ = backend.feature(backend.get_square(image, 7, 7))
+        np.testing.assert_allclose(shapes[63], shape, atol=1e-12)
+
+    def test_area_features_all_matches_per_square_features(self):
+        # 512 px with no margin tiles into whole 16 px bins (the reshape path);
+        # the default 48 px squares with a margin need summed-area tables.
+        for backend in (NumpyImageBackend(size=16, margin=0, resample="area"),
+                        NumpyImageBackend(resample="area")):
+            with self.subTest(size=backend.size, margin=backend.margin):
+                image = _load("merida", "c5")
+                shapes, means = backend.features_all(image)
+                for cell in (0, 27, 63):
+                    shape, mean = backend.feature(
+                        backend.get_square(image, *divmod(cell, 8)))
+                    np.testing.assert_allclose(shapes[cell], shape, atol=1e-9)
+                    self.assertAlmostEqual(means[cell], mean)
+
+    def test_area_resampling_reads_every_position(self):
+        for piece_set in PIECE_SETS:
+            with self.subTest(piece_set=piece_set):
+                recognizer = TemplateBoardRecognizer(
+                    NumpyImageBackend(resample="area"))
+                recognizer.calibrate(_load(piece_set, "start"), True)
+                for name in SEQUENCE:
+                    self.assertEqual(
+                        board.to_fen(recognizer.read(_load(piece_set, name))),
+                        EXPECTED_FEN[name])
+
+    def test_uint8_bgra_fast_path_matches_float64_path(self):
+        image = _load("wikipedia", "nf3")
+        alpha = np.full(image.shape[:2] + (1,), 255, dtype=np.uint8)
+        bgra = np.concatenate([image[..., ::-1], alpha], axis=2)
+        for mode in NumpyImageBackend.RESAMPLE_MODES:
+            with self.subTest(resample=mode):
+                backend = NumpyImageBackend(resample=mode)
+                shapes, means = backend.features_all(bgra)
+                ref_shapes, ref_means = backend.features_all(
+                    bgra.astype(np.float64))
+                np.testing.assert_allclose(shapes, ref_shapes, atol=1e-9)
+                np.testing.assert_allclose(means, ref_means, atol=1e-12)
+
+    def test_geometry_cache_follows_frame_shape(self):
+        backend = NumpyImageBackend()
+        image = _load("wikipedia", "e4")
+        first = backend._geometry(*image.shape[:2])
+        self.assertIs(backend._geometry(*image.shape[:2]), first)
+        # A resized capture box drops the old geometry and builds a new one.
+        cropped = image[:480, :496]
+        backend.features_all(cropped)
+        self.assertEqual(list(backend._geometries),
+                         [(480, 496, backend.size, backend.margin)])
+        shape, _ = backend.feature(backend.get_square(cropped, 3, 5))
+        np.testing.assert_allclose(backend.features_all(cropped)[0][29], shape,
+                                   atol=1e-12)
+
+    def test_similarity_matrix_matches_pairwise_similarity(self):
+        backend = NumpyImageBackend()
+        shapes, means = backend.features_all(_load("merida", "e4"))
+        features = list(zip(shapes, means))
+        bank = backend.stack(features[:13])
+        scores = backend.similarity_matrix((shapes, means), bank)
+        self.assertEqual(scores.shape, (64, 13))
+        for i in (0, 17, 63):
+            for j in (0, 6, 12):
+                self.assertAlmostEqual(
+                    scores[i, j], backend.similarity(features[i], features[j]))
+
+    def test_reduced_precision_scores_track_float64(self):
+        image = _load("alpha", "e4")
+        reference = NumpyImageBackend()
+        shapes, means = reference.features_all(image)
+        expected = reference.similarity_matrix(
+            (shapes, means), reference.stack(list(zip(shapes, means))[:13]))
+        for precision, tol in (("float32", 1e-5), ("int8", 0.02)):
+            with self.subTest(precision=precision):
+                backend = NumpyImageBackend(precision=precision)
+                shapes, means = backend.features_all(image)
+                bank = backend.stack(list(zip(shapes, means))[:13])
+                scores = backend.similarity_matrix((shapes, means), bank)
+                np.testing.assert_allclose(scores, expected, atol=tol)
+
+    def test_reduced_precision_reads_every_position(self):
+        for precision in ("float32", "int8"):
+            for piece_set in PIECE_SETS:
+                with self.subTest(precision=precision, piece_set=piece_set):
+                    recognizer = TemplateBoardRecognizer(
+                        NumpyImageBackend(precision=precision))
+                    recognizer.calibrate(_load(piece_set, "start"), True)
+                    self.assertEqual(
+                        board.to_fen(recognizer.read(_load(piece_set, "nf3"))),
+                        EXPECTED_FEN["nf3"])
+
+    def test_batched_read_matches_per_square_read(self):
+        for piece_set in PIECE_SETS:
+            with self.subTest(piece_set=piece_set):
+                recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+                recognizer.calibrate(_load(piece_set, "start"), True)
+                image = _load(piece_set, "nf3")
+                batched = recognizer.read(image)
+                recognizer._banks = {}   # force the per-square path
+                self.assertEqual(batched, recognizer.read(image))
+
+    def test_batched_read_scored_matches_per_square_scores(self):
+        for piece_set in PIECE_SETS:
+            with self.subTest(piece_set=piece_set):
+                recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+                recognizer.calibrate(_load(piece_set, "start"), True)
+                recognizer.read(_load(piece_set, "c5"))
+                image = _load(piece_set, "nf3")
+                batched = recognizer.read_scored(image)   # dirty squares only
+                self.assertEqual(board.to_fen(batched.board),
+                                 EXPECTED_FEN["nf3"])
+                recognizer._banks = {}   # force the per-square path
+                each = recognizer.read_scored(image)
+                self.assertEqual(batched.board, each.board)
+                self.assertEqual(batched.labels, each.labels)
+                np.testing.assert_allclose(batched.scores, each.scores,
+                                           atol=1e-9)
+                np.testing.assert_allclose(batched.margin, each.margin,
+                                           atol=1e-9)
+
+    def test_only_changed_squares_are_reclassified(self):
+        for piece_set in PIECE_SETS:
+            with self.subTest(piece_set=piece_set):
+                recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+                recognizer.calibrate(_load(piece_set, "start"), True)
+                recognizer.read(_load(piece_set, "start"))
+                self.assertEqual(recognizer.reclassified, 64)
+                recognizer.read(_load(piece_set, "start"))
+                self.assertEqual(recognizer.reclassified, 0)
+                for name in SEQUENCE[1:]:
+                    result = recognizer.read(_load(piece_set, name))
+                    self.assertEqual(board.to_fen(result), EXPECTED_FEN[name])
+                    self.assertLessEqual(recognizer.reclassified, 4)
+                self.assertEqual(recognizer.reads, 5)
+
+    def test_frame_shape_change_reclassifies_everything(self):
+        recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+        image = _load("alpha", "start")
+        recognizer.calibrate(image, True)
+        recognizer.read(image)
+        recognizer.read(image[:-3, :-3])
+        self.assertEqual(recognizer.reclassified, 64)
+
+
+@unittest.skipUnless(_HAVE_DEPS, "requires numpy and Pillow")
+class PyramidTests(unittest.TestCase):
+    def test_coarse_pass_reads_every_position(self):
+        for piece_set in PIECE_SETS:
+            with self.subTest(piece_set=piece_set):
+                recognizer = TemplateBoardRecognizer(
+                    NumpyImageBackend(), track_changes=False, coarse_size=12)
+                recognizer.calibrate(_load(piece_set, "start"), True)
+                for name in SEQUENCE:
+                    result = recognizer.read(_load(piece_set, name))
+                    self.assertEqual(board.to_fen(result), EXPECTED_FEN[name])
+                self.assertEqual(recognizer.reclassified_total, 4 * 64)
+                self.assertLess(recognizer.escalated_fraction, 0.5)
+
+    def test_escalated_squares_keep_full_size_scores(self):
+        full = TemplateBoardRecognizer(NumpyImageBackend(), track_changes=False)
+        pyramid = TemplateBoardRecognizer(NumpyImageBackend(),
+                                          track_changes=False, coarse_size=12,
+                                          escalate_ratio=float("inf"))
+        for recognizer in (full, pyramid):
+            recognizer.calibrate(_load("merida", "start"), True)
+        image = _load("merida", "nf3")
+        ours = pyramid.read_scored(image)
+        self.assertEqual(pyramid.escalated, 64)
+        np.testing.assert_allclose(ours.scores, full.read_scored(image).scores)
+
+    def test_coarsened_templates_match_coarse_features(self):
+        backend = NumpyImageBackend(resample="area")
+        image = _load("merida", "start")
+        shapes, means = backend.features_all(image)
+        coarse_shapes, coarse_means = backend.features_all(image, size=12)
+        self.assertEqual(coarse_shapes.shape, (64, 144))
+        for cell in (0, 9, 52, 60):   # squares with pieces
+            shape, mean = backend.coarsen((shapes[cell], means[cell]), 12)
+            self.assertEqual(mean, means[cell])
+            self.assertGreater(float(np.dot(shape, coarse_shapes[cell])), 0.98)
+
+
+@unittest.skipUnless(_HAVE_DEPS, "requires numpy and Pillow")
+class OccupancyTests(unittest.TestCase):
+    def test_empty_squares_are_not_matched(self):
+        for piece_set in PIECE_SETS:
+            with self.subTest(piece_set=piece_set):
+                recognizer = TemplateBoardRecognizer(
+                    NumpyImageBackend(), track_changes=False, occupancy=True)
+                recognizer.calibrate(_load(piece_set, "start"), True)
+                for name in SEQUENCE:
+                    scored = recognizer.read_scored(_load(piece_set, name))
+                    self.assertEqual(board.to_fen(scored.board),
+                                     EXPECTED_FEN[name])
+                    self.assertEqual(recognizer.matched, 32)
+                self.assertEqual(recognizer.matched_fraction, 0.5)
+                empty = recognizer.templates[(".", True)]
+                e4 = board.square_index(4, 4)   # light, empty after 1.e4
+                self.assertEqual(scored.score(e4 - 8 * 2, "."),
+                                 recognizer.backend.similarity(empty, empty))
+                self.assertEqual(scored.score(e4 - 8 * 2, "Q"), MISSING_SCORE)
+
+    def test_only_the_empty_squares_colour_is_ruled_empty(self):
+        recognizer = TemplateBoardRecognizer(NumpyImageBackend(),
+                                             occupancy=True)
+        image = _load("alpha", "start")
+        recognizer.calibrate(image, True)
+        recognizer.read(image)
+        self.assertEqual(recognizer.matched, 32)
+        for shade, matched in ((-8, 0), (-40, 1)):
+            with self.subTest(shade=shade):
+                shaded = image.astype(np.int16)
+                shaded[256:320, 256:320] += shade   # the empty e4
+                result = recognizer.read(shaded.astype(np.uint8))
+                self.assertEqual(recognizer.reclassified, 1)
+                self.assertEqual(recognizer.matched, matched)
+                if not matched:
+                    self.assertEqual(board.to_fen(result),
+                                     EXPECTED_FEN["start"])
+
+    def test_a_textured_board_turns_the_test_off(self):
+        rng = np.random.default_rng(0)
+        noise = rng.normal(0, 40, size=(512, 512, 1))
+        image = np.clip(_load("merida", "start") + noise, 0, 255)
+        recognizer = TemplateBoardRecognizer(NumpyImageBackend(),
+                                             occupancy=True)
+        recognizer.calibrate(image.astype(np.uint8), True)
+        recognizer.read(image.astype(np.uint8))
+        self.assertEqual(recognizer.matched, 64)
+
+
+@unittest.skipUnless(_HAVE_DEPS, "requires numpy and Pillow")
+class ProjectionTests(unittest.TestCase):
+    def test_projected_matching_reads_every_position(self):
+        for piece_set in PIECE_SETS:
+            with self.subTest(piece_set=piece_set):
+                recognizer = TemplateBoardRecognizer(
+                    NumpyImageBackend(), track_changes=False, components=16,
+                    project_fallback=False)
+                recognizer.calibrate(_load(piece_set, "start"), True)
+                for name in SEQUENCE:
+                    result = recognizer.read(_load(piece_set, name))
+                    self.assertEqual(board.to_fen(result), EXPECTED_FEN[name])
+                self.assertEqual(recognizer.fallbacks_total, 0)
+
+    def test_fallback_squares_keep_full_dimension_scores(self):
+        full = TemplateBoardRecognizer(NumpyImageBackend(), track_changes=False)
+        projected = TemplateBoardRecognizer(
+            NumpyImageBackend(), track_changes=False, components=16,
+            escalate_ratio=float("inf"))
+        for recognizer in (full, projected):
+            recognizer.calibrate(_load("alpha", "start"), True)
+        image = _load("alpha", "c5")
+        ours = projected.read_scored(image)
+        self.assertEqual(projected.fallbacks, 64)
+        np.testing.assert_allclose(ours.scores, full.read_scored(image).scores)
+
+    def test_projection_keeps_dot_products_in_its_subspace(self):
+        backend = NumpyImageBackend()
+        shapes, means = backend.features_all(_load("merida", "start"))
+        basis = backend.fit_projection((shapes, means), 64)
+        self.assertEqual(basis.shape, (backend.size ** 2, 64))
+        np.testing.assert_allclose(basis.T @ basis, np.eye(64), atol=1e-9)
+        projected, projected_means = backend.project((shapes, means), basis)
+        np.testing.assert_allclose(projected @ projected.T, shapes @ shapes.T,
+                                   atol=1e-9)
+        np.testing.assert_array_equal(projected_means, means)
+
+
+@unittest.skipUnless(_HAVE_DEPS, "requires numpy and Pillow")
+class ResizeTests(unittest.TestCase):
+    def test_resized_boards_keep_their_templates(self):
+        for piece_set in PIECE_SETS:
+            with self.subTest(piece_set=piece_set):
+                recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+                recognizer.calibrate(_load(piece_set, "start"), True)
+                templates = recognizer.templates
+                for name, side in zip(SEQUENCE, (440, 360, 256, 200)):
+                    result = recognizer.read(_resize(_load(piece_set, name),
+                                                     side))
+                    self.assertEqual(board.to_fen(result), EXPECTED_FEN[name])
+                    self.assertEqual(recognizer.reclassified, 64)
+                self.assertEqual(recognizer.resizes, 4)
+                self.assertFalse(recognizer.needs_recalibration)
+                self.assertIs(recognizer.templates, templates)
+
+    def test_another_theme_after_a_resize_needs_recalibration(self):
+        recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+        recognizer.calibrate(_load("alpha", "start"), True)
+        recognizer.read(_resize(_load("merida", "e4"), 420))
+        self.assertTrue(recognizer.needs_recalibration)
+
+    def test_recalibrating_from_a_known_position(self):
+        recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+        recognizer.calibrate(_load("alpha", "start"), True)
+        image = _resize(_load("merida", "e4"), 420)
+        recognizer.read(image)
+        recognizer.recalibrate(image, board.from_fen(EXPECTED_FEN["e4"]))
+        self.assertFalse(recognizer.needs_recalibration)
+        for name in SEQUENCE[1:]:
+            result = recognizer.read(_resize(_load("merida", name), 420))
+            self.assertEqual(board.to_fen(result), EXPECTED_FEN[name])
+
+
+@unittest.skipUnless(_HAVE_DEPS, "requires numpy and Pillow")
+class FrameChangeGateTests(unittest.TestCase):
+    def test_every_move_passes_and_repeats_are_skipped(self):
+        for piece_set in PIECE_SETS:
+            with self.subTest(piece_set=piece_set):
+                gate = FrameChangeGate()
+                for name in SEQUENCE:
+                    image = _load(piece_set, name)
+                    self.assertTrue(gate.changed(image))
+                    self.assertFalse(gate.changed(image.copy()))
+                self.assertEqual((gate.frames, gate.skipped), (8, 4))
+                self.assertEqual(gate.skip_rate, 0.5)
+
+    def test_bgra_capture_and_shape_change(self):
+        image = _load("alpha", "start").repeat(3, 0).repeat(3, 1)
+        alpha = np.full(image.shape[:2] + (1,), 255, dtype=np.uint8)
+        bgra = np.concatenate([image[..., ::-1], alpha], 2)
+        gate = FrameChangeGate()
+        self.assertTrue(gate.changed(bgra))
+        self.assertFalse(gate.changed(bgra))
+        self.assertTrue(gate.changed(bgra[:-40, :-40]))
+        gate.reset()
+        self.assertTrue(gate.changed(bgra[:-40, :-40]))
+
+
+@unittest.skipUnless(_HAVE_DEPS, "requires numpy and Pillow")
+class NpzCalibrationStoreTests(unittest.TestCase):
+    BOX = (0, 0, 512, 512)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = NpzCalibrationStore(
+            os.path.join(directory.name, "cache", "calibration.npz"))
+        recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+        start = _load("wikipedia", "start")
+        recognizer.calibrate(start, True)
+        self.store.save(recognizer, start, self.BOX)
+
+    def _load_into(self, image, backend=None, box=BOX):
+        recognizer = TemplateBoardRecognizer(backend or NumpyImageBackend())
+        return recognizer, self.store.load(recognizer, image, True, box)
+
+    def test_restores_mid_game_without_the_start_position(self):
+        for name in ("nf3", "start"):
+            with self.subTest(frame=name):
+                image = _load("wikipedia", name)
+                recognizer, loaded = self._load_into(image)
+                self.assertTrue(loaded)
+                self.assertIsNone(self.store.last_miss)
+                self.assertEqual(board.to_fen(recognizer.read(image)),
+                                 EXPECTED_FEN[name])
+
+    def test_restored_templates_read_like_calibrated_ones(self):
+        calibrated = TemplateBoardRecognizer(NumpyImageBackend())
+        calibrated.calibrate(_load("wikipedia", "start"), True)
+        image = _load("wikipedia", "c5")
+        restored, _ = self._load_into(image)
+        ours, theirs = calibrated.read_scored(image), restored.read_scored(image)
+        self.assertEqual(ours.labels, theirs.labels)
+        np.testing.assert_allclose(ours.scores, theirs.scores)
+
+    def test_restores_a_resized_board(self):
+        image = _resize(_load("wikipedia", "c5"), 400)
+        recognizer, loaded = self._load_into(image, box=(0, 0, 400, 400))
+        self.assertTrue(loaded)
+        self.assertEqual(board.to_fen(recognizer.read(image)),
+                         EXPECTED_FEN["c5"])
+
+    def test_stale_calibrations_are_invalidated(self):
+        nf3 = _load("wikipedia", "nf3")
+        cases = [
+            ("theme", dict(image=_load("alpha", "nf3"))),
+            ("backend", dict(image=nf3, backend=NumpyImageBackend(size=32))),
+            ("size", dict(image=nf3[:-8, :-8], box=(0, 0, 504, 504))),
+        ]
+        for reason, kwargs in cases:
+            with self.subTest(reason=reason):
+                self.setUp()
+                _, loaded = self._load_into(**kwargs)
+                self.assertFalse(loaded)
+                self.assertEqual(self.store.last_miss, reason)
+                self.assertFalse(os.path.exists(self.store.path))
+                self._load_into(nf3)
+                self.assertEqual(self.store.last_miss, "missing")
+
+    def test_other_format_versions_and_damaged_files_are_invalidated(self):
+        nf3 = _load("wikipedia", "nf3")
+        self.store.FORMAT_VERSION = 2
+        self.assertFalse(self._load_into(nf3)[1])
+        self.assertEqual(self.store.last_miss, "version")
+        with open(self.store.path, "wb") as f:
+            f.write(b"not a calibration")
+        self.assertFalse(self._load_into(nf3)[1])
+        self.assertEqual(self.store.last_miss, "unreadable")
+        self.assertFalse(os.path.exists(self.store.path))
+
+
+@unittest.skipUnless(_HAVE_DEPS, "requires numpy and Pillow")
+class TemplateLibraryTests(unittest.TestCase):
+    BOX = (0, 0, 512, 512)
+
+    def _fill(self, library):
+        for piece_set in PIECE_SETS:
+            recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+            start = _load(piece_set, "start")
+            recognizer.calibrate(start, True)
+            library.save(recognizer, start, self.BOX)
+
+    def _select(self, library, image):
+        recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+        return recognizer, library.load(recognizer, image, True, self.BOX)
+
+    def test_each_theme_selects_its_own_templates(self):
+        library = TemplateLibrary()
+        self._fill(library)
+        self.assertEqual(len(library), len(PIECE_SETS))
+        for piece_set in PIECE_SETS:
+            with self.subTest(piece_set=piece_set):
+                image = _load(piece_set, "nf3")
+                recognizer, loaded = self._select(library, image)
+                self.assertTrue(loaded)
+                np.testing.assert_array_equal(
+                    recognizer.board_fingerprint,
+                    NumpyImageBackend().fingerprint(_load(piece_set, "start")))
+                self.assertEqual(board.to_fen(recognizer.read(image)),
+                                 EXPECTED_FEN["nf3"])
+        self.assertEqual((library.lookups, library.hits), (3, 3))
+
+    def test_unknown_theme_or_misaligned_board_misses(self):
+        library = TemplateLibrary()
+        self._fill(library)
+        recolored = _load("alpha", "nf3") // 2 + 60
+        self.assertFalse(self._select(library, recolored)[1])
+        self.assertEqual(library.last_miss, "missing")
+        self.assertFalse(self._select(library, _load("alpha", "nf3")[:-8])[1])
+        self.assertEqual(library.last_miss, "size")
+        recognizer, loaded = self._select(library,
+                                          _resize(_load("alpha", "nf3"), 400))
+        self.assertTrue(loaded)
+        self.assertEqual(board.to_fen(recognizer.read(
+            _resize(_load("alpha", "nf3"), 400))), EXPECTED_FEN["nf3"])
+
+    def test_recalibrating_a_theme_replaces_it(self):
+        library = TemplateLibrary()
+        self._fill(library)
+        self._fill(library)
+        self.assertEqual(len(library), len(PIECE_SETS))
+
+    def test_theme_change_is_seen_whatever_the_position(self):
+        recognizer = TemplateBoardRecognizer(NumpyImageBackend())
+        recognizer.calibrate(_load("alpha", "start"), True)
+        for piece_set in PIECE_SETS:
+            with self.subTest(piece_set=piece_set):
+                self.assertEqual(
+                    recognizer.theme_changed(_load(piece_set, "nf3")),
+                    piece_set != "alpha")
+
+    def test_directory_persists_across_libraries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self._fill(TemplateLibrary(directory))
+            self._fill(TemplateLibrary(directory))
+            self.assertEqual(len(os.listdir(directory)), len(PIECE_SETS))
+            library = TemplateLibrary(directory)
+            self.assertEqual(len(library), len(PIECE_SETS))
+            image = _load("merida", "c5")
+            recognizer, loaded = self._select(library, image)
+            self.assertTrue(loaded)
+            self.assertEqual(board.to_fen(recognizer.read(image)),
+                             EXPECTED_FEN["c5"])
+            library.invalidate()
+            self.assertEqual((len(library), os.listdir(directory)), (0, []))
+
+    def test_step_must_cover_the_tolerance(self):
+        with self.assertRaises(ValueError):
+            TemplateLibrary(tolerance=12.0, step=20.0)
+
+
 if __name__ == "__main__":
     unittest.main()
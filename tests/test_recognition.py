@@ -10,10 +10,12 @@ import unittest
 
 from chesscheat import board
 from chesscheat import app
-from chesscheat.interfaces import (SetupProvider, FrameSource, ImageBackend,
-                                   BoardRecognizer)
+from chesscheat.interfaces import (SetupProvider, FrameSource, FrameGate,
+                                   ImageBackend, BoardRecognizer,
+                                   CalibrationStore)
 from chesscheat.recognition import TemplateBoardRecognizer
 from chesscheat.mocks import (MockSetupProvider, MockFrameSource,
+                              MockFrameGate, MockCalibrationStore,
                               MockImageBackend, render_mock_image)
 
 
@@ -75,10 +77,93 @@ class EvolvingPositionTests(unittest.TestCase):
         self.assertEqual(collect_reads([start, pushed], True)[0], pushed)
 
 
+class ScoredReadTests(unittest.TestCase):
+    def test_read_scored_agrees_with_read(self):
+        recognizer = TemplateBoardRecognizer(MockImageBackend())
+        recognizer.calibrate(render_mock_image(board.starting_board(), False),
+                             False)
+        image = render_mock_image(opening_sequence()[-1], False)
+        scored = recognizer.read_scored(image)
+        self.assertEqual(scored.board, recognizer.read(image))
+        for (file_idx, rank), label in scored.board.items():
+            square = board.square_index(file_idx, rank)
+            self.assertEqual(scored.labels[square], label)
+            self.assertEqual(scored.score(square, label), scored.best[square])
+            self.assertNotEqual(scored.runner_up[square], label)
+            self.assertAlmostEqual(
+                scored.margin[square],
+                scored.best[square]
+                - scored.score(square, scored.runner_up[square]))
+            self.assertGreater(scored.margin[square], 0)
+        self.assertEqual(len(scored.scores), 64 * len(board.LABELS))
+
+
+class FrameGateTests(unittest.TestCase):
+    def test_unchanged_frames_skip_recognition(self):
+        positions = opening_sequence()
+        held = [p for p in positions for _ in range(3)]
+        frames = [render_mock_image(p, True) for p in [positions[0]] + held]
+        recognizer = TemplateBoardRecognizer(MockImageBackend())
+        reads = []
+        original_read = recognizer.read
+        recognizer.read = lambda image: reads.append(image) or original_read(image)
+        gate = MockFrameGate()
+        seen = []
+        app.run(
+            MockSetupProvider(True, (0, 0, 8, 8)),
+            lambda box: MockFrameSource(frames),
+            recognizer,
+            on_board=lambda board_map, _white: seen.append(board_map),
+            gate=gate,
+        )
+        self.assertEqual(seen, held)
+        self.assertEqual(len(reads), len(positions))
+        self.assertEqual((gate.frames, gate.skipped), (len(held), 8))
+
+
+class CalibrationStoreTests(unittest.TestCase):
+    def _run(self, store, positions, box=(0, 0, 8, 8)):
+        recognizer = TemplateBoardRecognizer(MockImageBackend())
+        calibrations = []
+        seen = []
+        app.run(
+            MockSetupProvider(True, box),
+            lambda box: MockFrameSource([render_mock_image(p, True)
+                                         for p in positions]),
+            recognizer,
+            on_board=lambda board_map, _white: seen.append(board_map),
+            before_calibrate=lambda: calibrations.append(True),
+            store=store,
+        )
+        return seen, len(calibrations)
+
+    def test_second_run_restores_mid_game(self):
+        store = MockCalibrationStore()
+        positions = opening_sequence()
+        # Nothing saved yet: the first frame is offered to the store, then
+        # a fresh one is grabbed for calibration.
+        self.assertEqual(self._run(store, positions[:1] + positions),
+                         (positions[1:], 1))
+        self.assertEqual(store.saves, 1)
+        # Restarted two plies in: no starting position needed.
+        self.assertEqual(self._run(store, positions[2:]), (positions[3:], 0))
+        self.assertEqual(store.loads, 1)
+
+    def test_resized_box_recalibrates(self):
+        store = MockCalibrationStore()
+        positions = opening_sequence()
+        self._run(store, positions)
+        _, calibrations = self._run(store, positions, box=(0, 0, 16, 16))
+        self.assertEqual(calibrations, 1)
+        self.assertEqual((store.loads, store.saves), (0, 2))
+
+
 class InterfaceConformanceTests(unittest.TestCase):
     def test_mocks_implement_interfaces(self):
         self.assertIsInstance(MockSetupProvider(), SetupProvider)
         self.assertIsInstance(MockFrameSource([]), FrameSource)
+        self.assertIsInstance(MockFrameGate(), FrameGate)
+        self.assertIsInstance(MockCalibrationStore(), CalibrationStore)
         self.assertIsInstance(MockImageBackend(), ImageBackend)
         self.assertIsInstance(TemplateBoardRecognizer(MockImageBackend()),
                               BoardRecognizer)